@@ -1,5 +1,5 @@
 # app.py
-# PlaidLibs™ – Seven Workflow Streamlit App (single-file)
+# PlaidLibs™ – Seven Workflow Streamlit App (the view; the engine lives in plaidlibs/)
 # - Lib-Ate (Mad Libs mode, strict step-by-step)
 # - Create-Direct (instant story generation)
 # - Storyline (user concept → story)
@@ -11,242 +11,78 @@
 # No external APIs required. Runs offline. All state kept in st.session_state.
 
 import random
-import re
-import textwrap
-from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+import time
+from typing import Dict, Optional
 
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Everything below is imported once per process; this script only renders views.
+from plaidlibs.cache import shared_cache
+from plaidlibs.catalog import (
+    ABSURDITY_CHOICES, ALL_GENRES, IMAGE_TAGS, LIBATE_PROMPTS, LIBATE_STYLE_MAP, PLAIDEMONIUM_SEEDS, QUIPS,
+    REMIX_SEEDS, REMIX_STYLES, SURPRISE_WORDS, VISUAL_FORMATS, WILD_ABSURDITY, WORKFLOWS,
+)
+from plaidlibs.backends import shared_backend
+from plaidlibs.chat import persona_cache_key
+from plaidlibs.flow import Step, run_flow
+from plaidlibs.generators import (
+    fresh_seed, generate_visual_prompt, quip_greeting, random_story_seeds, seeds_from_concept,
+    simulate_ballots, simulate_submissions,
+)
+from plaidlibs.menus import draw_genres, draw_styles, menu_for, reshuffle
+from plaidlibs.metrics import shared_metrics
+from plaidlibs.remix import build_story, memo_stats
+from plaidlibs.export import KINDS, iter_archive
+from plaidlibs.sessions import REMIX_KEY, shared_sessions, story_log, story_text
+from plaidlibs.state import init_session, request_rng, reset_workflow, selected_quip, with_seed_note, workflow
+from plaidlibs.tally import LiveTally
+from plaidlibs.turns import history_hash, shared_executor
 
 # -----------------------
-# Utilities & State
+# Utilities & State (logic lives in plaidlibs.state; these bind it to st.session_state)
 # -----------------------
 
-WORKFLOWS = [
-    "Lib-Ate",
-    "Create Direct",
-    "Storyline",
-    "PlaidPic",
-    "PlaidMagGen",
-    "PlaidPlay",
-    "PlaidChat",
-]
-
-QUIPS = [
-    "MacQuip",      # default narrator/host
-    "DJ Q'Wip",
-    "SoQuip",
-    "DonQuip",
-    "ErrQuip",
-    "McQuip",
-]
-
-CORE_GENRES = [
-    ("Mystery", "Whodunnit, clues, reveals"),
-    ("Adventure", "Quests, journeys, tight escapes"),
-    ("Horror", "Dread, uncanny turns"),
-    ("Romance", "Hearts, pining, swoons"),
-    ("Sci-Fi", "Tech, futures, what-ifs"),
-    ("Fantasy", "Magic, prophecies, dragons"),
-]
-
-FLEX_GENRES = [
-    ("Fable", "Talking beasts with morals"),
-    ("Fairy Tale", "Once-upon-a-time with a twist"),
-    ("Comedy", "Jokes, timing, banter"),
-    ("Slice of Life", "Quiet moments, big feelings"),
-]
-
-PLAIDVERSE = [
-    ("Plaidverse Caper", "Tartan-powered shenanigans"),
-    ("Cosmic Plaid", "Interdimensional tartans collide"),
-]
-
-ABSURDITY_LEVELS = ["Mild", "Moderate", "Plaidemonium™", "Wild Card"]
-
-IMAGE_TAGS = [
-    "Focus on Emotion",
-    "Cinematic Lighting",
-    "Showcase Plaid Clothing",
-    "Add Hidden Detail/Easter Egg",
-    "Add Surreal Element",
-    "Zoomed Portrait / Close Crop",
-    "No Extra Tags",
-]
-
 def get_active_quip(mode: Optional[str] = None) -> str:
+    return selected_quip(st.session_state, mode)
+
+def session_seed() -> int:
     """
-    Return the selected quip for the given mode or for the current global mode.
+    Seed for a new session: ?seed=N in the URL replays a session, otherwise a fresh one.
     """
-    m = mode or st.session_state.GLOBAL.get("CURRENT_MODE")
-    if m == "Lib-Ate":
-        return st.session_state.LIBATE.get("QUIP_SELECTED", "MacQuip")
-    if m == "Create Direct":
-        return st.session_state.CREATEDIRECT.get("QUIP_SELECTED", "MacQuip")
-    if m == "Storyline":
-        return st.session_state.STORYLINE.get("QUIP_SELECTED", "MacQuip")
-    if m == "PlaidPic":
-        return st.session_state.PLAIDPIC.get("QUIP_SELECTED", "MacQuip")
-    if m == "PlaidMagGen":
-        return st.session_state.PLAIDMAG.get("QUIP_SELECTED", "MacQuip")
-    if m == "PlaidPlay":
-        return st.session_state.PLAIDPLAY.get("QUIP_SELECTED", "MacQuip")
-    if m == "PlaidChat":
-        return st.session_state.PLAIDCHAT.get("QUIP_SELECTED", "MacQuip")
-    return "MacQuip"
+    try:
+        return int(st.query_params.get("seed", ""))
+    except ValueError:
+        return fresh_seed()
 
 def init_state():
-    if "GLOBAL" not in st.session_state:
-        st.session_state.GLOBAL = {
-            "CURRENT_MODE": None,          # one of the 7 workflows
-            "CURRENT_STEP": 0,             # step counter per workflow
-            "WAITING_FOR": "",             # description of expected input
-        }
-    if "LIBATE" not in st.session_state:
-        st.session_state.LIBATE = {
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-            "PROMPTS_NEEDED": 0,
-            "PROMPTS_COLLECTED": 0,
-            "COLLECTED": {},
-            "teaser": "",
-        }
-    if "CREATEDIRECT" not in st.session_state:
-        st.session_state.CREATEDIRECT = {
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-        }
-    if "STORYLINE" not in st.session_state:
-        st.session_state.STORYLINE = {
-            "USER_STORYLINE": "",
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-        }
-    if "PLAIDPIC" not in st.session_state:
-        st.session_state.PLAIDPIC = {
-            "IMAGE_UPLOADED": False,
-            "IMAGE_ANALYSIS": {},
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-            "TEXT_DESC": "",
-        }
-    if "PLAIDMAG" not in st.session_state:
-        st.session_state.PLAIDMAG = {
-            "FORMAT_SELECTED": None,
-            "STYLE_SELECTED": None,
-            "PROMPT_COLLECTED": "",
-            "ENHANCEMENT_TAGS": [],
-            "QUIP_SELECTED": "MacQuip",
-        }
-    if "PLAIDPLAY" not in st.session_state:
-        st.session_state.PLAIDPLAY = {
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-            "PLAYER_EMAILS": [],
-            "SUBMISSIONS": [],
-            "VOTE_TALLY": {},
-            "SUBMISSIONS_RECEIVED": 0,
-            "MASTER_PROMPT": "",
-            "N_PLAYERS": 0,
-        }
-    if "PLAIDCHAT" not in st.session_state:
-        st.session_state.PLAIDCHAT = {
-            "QUIP_SELECTED": "MacQuip",
-            "messages": [
-                {"role": "assistant", "content": quip_greeting("MacQuip")}
-            ]
-        }
+    init_session(st.session_state, None if "GLOBAL" in st.session_state else session_seed())
+
+def session_handle():
+    """
+    This session's state as a mapping that stays valid off the script thread
+    (st.session_state resolves the session per call); the session registry may
+    evict an idle session from another session's run.
+    """
+    ctx = get_script_run_ctx()
+    return ctx.session_state if ctx is not None else st.session_state
+
+def session_alive():
+    """
+    A check the session registry can call from any thread: False once this
+    session's tab has disconnected. The registry then waits out its grace period
+    (as long as Streamlit keeps a disconnected session for a reconnect) before
+    deleting the session's files.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None or not Runtime.exists():
+        return None
+    session_id = ctx.session_id
+    return lambda: Runtime.instance().is_active_session(session_id)
 
 def reset_mode(mode: str):
-    # Reset GLOBAL + per-workflow minimal fields
-    st.session_state.GLOBAL.update({
-        "CURRENT_MODE": mode,
-        "CURRENT_STEP": 1,
-        "WAITING_FOR": "",  # set by first step renderer
-    })
-    if mode == "Lib-Ate":
-        st.session_state.LIBATE.update({
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-            "PROMPTS_NEEDED": 0,
-            "PROMPTS_COLLECTED": 0,
-            "COLLECTED": {},
-            "teaser": "",
-        })
-    elif mode == "Create Direct":
-        st.session_state.CREATEDIRECT.update({
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-        })
-    elif mode == "Storyline":
-        st.session_state.STORYLINE.update({
-            "USER_STORYLINE": "",
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-        })
-    elif mode == "PlaidPic":
-        st.session_state.PLAIDPIC.update({
-            "IMAGE_UPLOADED": False,
-            "IMAGE_ANALYSIS": {},
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-            "TEXT_DESC": "",
-        })
-    elif mode == "PlaidMagGen":
-        st.session_state.PLAIDMAG.update({
-            "FORMAT_SELECTED": None,
-            "STYLE_SELECTED": None,
-            "PROMPT_COLLECTED": "",
-            "ENHANCEMENT_TAGS": [],
-            "QUIP_SELECTED": "MacQuip",
-        })
-    elif mode == "PlaidPlay":
-        st.session_state.PLAIDPLAY.update({
-            "QUIP_SELECTED": "MacQuip",
-            "STYLE_SELECTED": None,
-            "GENRE_SELECTED": None,
-            "ABSURDITY_SELECTED": None,
-            "PLAYER_EMAILS": [],
-            "SUBMISSIONS": [],
-            "VOTE_TALLY": {},
-            "SUBMISSIONS_RECEIVED": 0,
-            "MASTER_PROMPT": "",
-            "N_PLAYERS": 0,
-        })
-    elif mode == "PlaidChat":
-        st.session_state.PLAIDCHAT.update({
-            "QUIP_SELECTED": "MacQuip",
-            "messages": [
-                {"role": "assistant", "content": quip_greeting("MacQuip")}
-            ]
-        })
-
-def quip_greeting(quip: str) -> str:
-    d = {
-        "MacQuip": "Oh hello. Another brilliant human. Chaos? Romance? Frogs in power suits?",
-        "DJ Q'Wip": "YO YO YO! DJ Q'Wip in the house! Ready to DROP some tales?",
-        "SoQuip": "Well now, darlin’, let’s ease in like a summer porch swing.",
-        "DonQuip": "Sit down. You came to the right guy. Let’s make a story deal.",
-        "ErrQuip": "Greetings. You smell like plot holes. Specify function: entertainment().",
-        "McQuip": "Aye! Am I greeting you or are you greeting me? Either way—hello!",
-    }
-    return d.get(quip, d["MacQuip"])
+    reset_workflow(st.session_state, mode)
 
 def macquip_aside(line: str, mode: Optional[str] = None) -> str:
     """
@@ -255,179 +91,97 @@ def macquip_aside(line: str, mode: Optional[str] = None) -> str:
     quip = get_active_quip(mode)
     return f"_{quip} aside:_ {line}"
 
-def pick_random_styles(n=5):
-    styles = [
-        ("Flash Fiction", "Short, complete narrative"),
-        ("Ballads", "Poetic, musical storytelling"),
-        ("Satire & Light Parody", "Humorous mockery"),
-        ("Breaking News", "Headline report format"),
-        ("Scriptlets", "Mini-play with dialogue"),
-        ("Epistolary", "Told via letters/messages"),
-        ("Mythic", "Grand, timeless cadence"),
-        ("Noir", "Moody, hardboiled narration"),
-        ("Magic Realism", "Subtle magic in the ordinary"),
-        ("Travelogue", "Journey told through stops"),
-    ]
-    random.shuffle(styles)
-    return styles[:n]
-
-def genre_menu_block():
-    # 3 core + 2 flexible + 1 plaidverse = 6 + Wild + Reshuffle
-    core = random.sample(CORE_GENRES, 3)
-    flex = random.sample(FLEX_GENRES, 2)
-    plaid = random.choice(PLAIDVERSE)
-    lines = []
-    idx = 1
-    mapping = {}
-    for g in core + flex + [plaid]:
-        lines.append(f"{idx}. {g[0]} - {g[1]}")
-        mapping[str(idx)] = g[0]
-        idx += 1
-    lines.append(f"{idx}. Wild Card - Surprise genre!")
-    mapping[str(idx)] = "Wild Card"
-    idx += 1
-    lines.append(f"{idx}. Reshuffle - Different options")
-    mapping[str(idx)] = "Reshuffle"
-    return "\n".join(lines), mapping
-
 def draw_rule_box(title: str, body: str):
     st.markdown(f"### {title}")
     st.info(body)
 
-def boldify_user_words(text: str, words: List[str]) -> str:
-    out = text
-    for w in sorted(set(words), key=lambda x: -len(x)):
-        if not w:
-            continue
-        out = re.sub(rf"\b{re.escape(w)}\b", f"**{w}**", out, flags=re.IGNORECASE)
-    return out
+def show_seed(seed: Optional[int]):
+    if seed is not None:
+        st.caption(f"Seed {seed}")
 
-# -----------------------
-# Generators (lightweight templates)
-# -----------------------
+def story_download(text: str) -> str:
+    return with_seed_note(text, st.session_state.get("generated_seed"))
 
-def story_intro_line(quip: str, style: str, genre: Optional[str] = None) -> str:
-    if quip == "MacQuip":
-        base = f"As your tartan-tongued narrator, I’ll spin a {style}"
-        if genre:
-            base += f" {genre}"
-        return base + " so tight it squeaks."
-    if quip == "DJ Q'Wip":
-        return f"Check it—{style} vibes incoming, genre on lock: {genre or 'Freestyle'}!"
-    if quip == "SoQuip":
-        return f"Hush now—let’s tell a {style} {genre or ''} story with a tender hand."
-    if quip == "DonQuip":
-        return f"Here’s the arrangement: a {style} {genre or ''}. We do it clean."
-    if quip == "ErrQuip":
-        return f"Loading {style}::{genre or 'Undefined'} … compiling feelings … OK-ish."
-    if quip == "McQuip":
-        return f"Right! A {style} {genre or ''}! Wait—what’s that? No, I’m ready."
-    return f"A {style} {genre or ''} begins."
-
-def assemble_story(style: str, genre: str, absurdity: str, narrator: str, seeds: Dict[str, str]) -> str:
-    # Simple template that responds to parameters and uses collected words
-    user_words = [v for k,v in seeds.items()]
-    # Absurdity label flair
-    abs_display = absurdity
-    if absurdity.startswith("Plaidemonium"):
-        flair = random.choice([
-            "Maximum Plaidemonium™", "Beyond Maximum Plaidemonium™",
-            "Abandon-All-Logic Plaidemonium™", "Logic.exe has crashed"
-        ])
-        abs_display = flair
-
-    paragraphs = []
-    lead = story_intro_line(narrator, style, genre)
-    paragraphs.append(lead)
-
-    p1 = (
-        f"In the town of {seeds.get('place','Somewhere')}, under a {seeds.get('adjective','restless')} sky, "
-        f"a {seeds.get('profession','person')} named {seeds.get('name','Alex')} discovered a {seeds.get('object','mystery')} "
-        f"that hummed like an argument about destiny."
-    )
-    if absurdity == "Mild":
-        p1 += " The logic behaved, mostly."
-    elif absurdity == "Moderate":
-        p1 += " The physics negotiated but charged a small fee."
-    else:
-        p1 += " The laws of reality put on plaid trousers and called it a casual Friday."
-    paragraphs.append(p1)
-
-    p2 = (
-        f"Rumors spread like marmalade—sticky, bright, and impossible to ignore. "
-        f"{seeds.get('name2','Riley')} whispered of a map folded into the {seeds.get('object2','dawn')}, "
-        f"while the old clock in {seeds.get('place2','East Gate')} kept time in polite disagreements."
-    )
-    if "Ballads" in style:
-        p2 += " The town sang rhymes soft as thistle-down."
-    if "Breaking News" in style:
-        p2 = "BREAKING: Local calm disrupted by anomalous plaid event; sources contradict sources."
-    paragraphs.append(p2)
-
-    p3 = (
-        f"At last, our {seeds.get('profession','hero')} chose: step through the {seeds.get('portal','ripple')} "
-        f"or stitch the day back together with {seeds.get('tool','courage')} and {seeds.get('trait','grace')}."
-    )
-    if "Plaidemonium" in absurdity:
-        p3 += " They stepped. The world cheered in tartan."
+def compose_story(style: str, genre: str, absurdity: str, narrator: str, seeds: Dict[str, str],
+                  rng: random.Random, remix: bool = False) -> str:
+    """
+    The story assemble_story() would write, built from memoized paragraphs
+    (plaidlibs.remix). A new story becomes the session's remix base; remix=True
+    starts from that base, so only the paragraphs the tweak changes are rendered.
+    """
+    base = st.session_state.get(REMIX_KEY) if remix else None
+    if base is None:
+        story = build_story(style, genre, absurdity, narrator, seeds, rng)
     else:
-        p3 += " They breathed. The page turned itself politely."
-    paragraphs.append(p3)
-
-    outro = {
-        "MacQuip": "There—we’ve tied the bow, probably around a hedgehog. Stylish, if prickly.",
-        "DJ Q'Wip": "And that’s a WRAP—bars, beats, and brave hearts!",
-        "SoQuip": "Sweet mercy, look at that: a little courage goes a long way, sugar.",
-        "DonQuip": "It’s done. Keep it between us, capisce?",
-        "ErrQuip": "Story terminated(0). Memory leak: emotions not freed.",
-        "McQuip": "We made it! I think? I think!",
-    }.get(narrator, "Fin.")
-    paragraphs.append(outro)
-
-    text = "\n\n".join(paragraphs)
-    return boldify_user_words(text, user_words)
-
-def generate_visual_prompt(format_name: str, style_name: str, desc: str, tags: List[str]) -> str:
-    base = f"[VISUAL CONFIGURATION]\nFormat: {format_name}\nStyle: {style_name}\n"
-    base += f'Description: "{desc.strip()}"\nEnhancements: {", ".join(tags) if tags else "None"}\n\n'
-    base += "Constraints: Bright white background; visible plaid elements where appropriate; match selected style.\n"
-    base += "\nShort creative blurb:\n"
-    base += random.choice([
-        "Crisp light cuts across tartan seams as motion freezes the moment before chaos.",
-        "A clean white field, plaid accents pulsing like a heartbeat in negative space.",
-        "Plaid lines anchor a surreal cascade of character and scene, luminous and bold.",
-    ])
-    return base
-
-def simulate_submissions(prompt: str, n_players: int) -> List[Dict[str, Any]]:
-    nouns = ["otter", "eclipse", "engine", "parka", "nebula", "plaid", "vending machine", "lighthouse", "accordion"]
-    adjs = ["sardonic", "luminous", "rickety", "whispering", "clockwork", "minty", "chaotic"]
-    wilds = ["time hiccup", "snack-based destiny", "gravity is optional", "confetti rain", "stage whisper"]
-    subs = []
-    for i in range(n_players):
-        sub = {
-            "player": f"Player {i+1}",
-            "nouns": random.sample(nouns, 3),
-            "adjs": random.sample(adjs, 2),
-            "wild": random.choice(wilds),
-        }
-        subs.append(sub)
-    return subs
-
-def tally_votes(submissions: List[Dict[str, Any]]) -> Dict[str, int]:
-    # Simple simulated voting: random points with slight bias toward higher variety
-    tally = {s["player"]: 0 for s in submissions}
-    players = list(tally.keys())
-    rounds = random.randint(6, 10)
-    for _ in range(rounds):
-        ranked = random.sample(players, k=min(4, len(players)))
-        if len(ranked) >= 1: tally[ranked[0]] += 2
-        if len(ranked) >= 2: tally[ranked[1]] += 1
-    return tally
-
+        story = base.remix(rng, style, genre, absurdity, seeds, narrator)
+    if not remix:
+        st.session_state[REMIX_KEY] = story
+    return story.text
 
+def keep_story(text: str, seed: int, title: str, kind: str = "story", current: bool = True):
+    """
+    Add a generated story to this session's history; current=True also makes it
+    the one Download Story saves.
+    """
+    if current:
+        st.session_state.generated_story, st.session_state.generated_seed = text, seed
+    STORIES.append(text, seed, kind=kind, workflow=st.session_state.GLOBAL["CURRENT_MODE"], title=title)
 
+def story_archive(kind: str):
+    """
+    Deferred download_button data: runs only when the button is clicked. The
+    archive is generated from the history file record by record, but Streamlit
+    serves downloads from memory, so the finished archive is returned as bytes
+    (and held in memory while it is served).
+    """
+    def build():
+        return b"".join(iter_archive(STORIES, kind))
+    return build
+
+def rerun():
+    RUN.finish("rerun")
+    st.rerun()
+
+def stop():
+    RUN.finish("stop")
+    st.stop()
+
+def show_flow(steps):
+    # Renders the current step; a valid submit renders the next step in this same run
+    run_flow(steps, st.session_state.GLOBAL, st.empty, st.error, rerun)
+
+def history_panel(slot):
+    with slot.container(), st.expander(f"Story history ({len(STORIES)})"):
+        if STORIES:
+            export_kind = st.radio("Export as", KINDS, horizontal=True, key="export_kind",
+                                   format_func=lambda k: {"zip": "ZIP (a file per story)", "jsonl": "JSONL"}[k])
+            st.download_button(
+                "📦 Export all", story_archive(export_kind), file_name=f"plaidlibs-stories.{export_kind}",
+                mime="application/zip" if export_kind == "zip" else "application/x-ndjson",
+            )
+            st.caption("Markdown, plain text and HTML renderings of every story and visual prompt so far.")
+        else:
+            st.caption("Stories you generate in any workflow are kept here for export.")
 
+def metrics_panel():
+    with st.sidebar.expander("Instrumentation"):
+        rows = METRICS.rows()
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("No reruns recorded yet.")
+        st.download_button("Prometheus metrics", METRICS.prometheus(), file_name="plaidlibs.prom",
+                           mime="text/plain")
+        memo = memo_stats()
+        st.caption(f"Remix paragraph memo: rendered {memo['render_misses']} (reused {memo['render_hits']}), "
+                   f"highlighted {memo['highlight_misses']} (reused {memo['highlight_hits']})")
+        g = st.session_state.GLOBAL
+        if g["STORIES"]:
+            st.caption(f"Script runs per completed story (this session): {g['RUNS'] / g['STORIES']:.1f}")
+        if METRICS.jsonl_path:
+            st.caption(f"Appending one JSON line per rerun to {METRICS.jsonl_path}")
+        if st.button("Reset counters"):
+            METRICS.reset()
 
 # -----------------------
 # Sidebar (Mode + Shared Controls)
@@ -435,6 +189,21 @@ def tally_votes(submissions: List[Dict[str, Any]]) -> Dict[str, int]:
 
 st.set_page_config(page_title="PlaidLibs – Seven Workflows", page_icon="🌀", layout="centered")
 init_state()
+st.session_state.GLOBAL["RUNS"] += 1
+
+# Trim this session back under its memory budget; evicts idle sessions now and then
+SESSIONS = shared_sessions()
+SESSION_BYTES = SESSIONS.touch(st.session_state.GLOBAL["SESSION_ID"], session_handle(), session_alive())
+STORIES = story_log(st.session_state, SESSIONS.budget.spill_dir)  # every story this session generated, on disk
+
+# Opt-in (PLAIDLIBS_METRICS=1): time this run per workflow step and every generator call.
+# Disabled, RUN is a shared no-op and wrap() hands back the same functions.
+METRICS = shared_metrics()
+RUN = METRICS.rerun(st.session_state.GLOBAL)
+(build_story, draw_genres, draw_styles, generate_visual_prompt, random_story_seeds,
+ seeds_from_concept, simulate_ballots, simulate_submissions) = map(METRICS.wrap, (
+    build_story, draw_genres, draw_styles, generate_visual_prompt, random_story_seeds,
+    seeds_from_concept, simulate_ballots, simulate_submissions))
 
 with st.sidebar:
     st.title("🌀 PlaidLibs")
@@ -448,10 +217,9 @@ with st.sidebar:
         key="workflow_select"
     )
 
-    # If workflow changed, reset and rerun once
+    # If workflow changed, reset; the new workflow renders below in this same run
     if selected_mode != st.session_state.GLOBAL["CURRENT_MODE"]:
         reset_mode(selected_mode)
-        st.rerun()
 
     st.markdown("---")
     st.caption("Narrator / Host (where applicable)")
@@ -460,52 +228,55 @@ with st.sidebar:
     quip_pick = st.selectbox(
         "Quip",
         QUIPS,
-        index=QUIPS.index(
-            st.session_state.PLAIDCHAT["QUIP_SELECTED"]
-            if selected_mode == "PlaidChat"
-            else st.session_state.LIBATE.get("QUIP_SELECTED", "MacQuip")
-        ),
+        index=QUIPS.index(get_active_quip(selected_mode)),
         key="quip_select"
     )
 
     # Save narrator choice back into the relevant workflow state
-    if selected_mode == "PlaidChat":
-        st.session_state.PLAIDCHAT["QUIP_SELECTED"] = quip_pick
-        if not st.session_state.PLAIDCHAT["messages"]:
-            st.session_state.PLAIDCHAT["messages"].append(
-                {"role": "assistant", "content": quip_greeting(quip_pick)}
-            )
-    elif selected_mode == "PlaidPlay":
-        st.session_state.PLAIDPLAY["QUIP_SELECTED"] = quip_pick
-    elif selected_mode == "Lib-Ate":
-        st.session_state.LIBATE["QUIP_SELECTED"] = quip_pick
-    elif selected_mode == "Create Direct":
-        st.session_state.CREATEDIRECT["QUIP_SELECTED"] = quip_pick
-    elif selected_mode == "Storyline":
-        st.session_state.STORYLINE["QUIP_SELECTED"] = quip_pick
-    elif selected_mode == "PlaidPic":
-        st.session_state.PLAIDPIC["QUIP_SELECTED"] = quip_pick
-    elif selected_mode == "PlaidMagGen":
-        st.session_state.PLAIDMAG["QUIP_SELECTED"] = quip_pick
+    workflow(st.session_state, selected_mode).QUIP_SELECTED = quip_pick
+    if selected_mode == "PlaidChat" and not st.session_state.PLAIDCHAT.messages:
+        st.session_state.PLAIDCHAT.messages.append(
+            {"role": "assistant", "content": quip_greeting(quip_pick)}
+        )
 
     st.markdown("---")
     if st.button("🔁 Reset This Mode"):
         reset_mode(selected_mode)
-        st.rerun()
+        workflow(st.session_state, selected_mode).QUIP_SELECTED = quip_pick
+    st.caption(f"Session seed: {st.session_state.GLOBAL['SEED']} (open with ?seed=N to replay)")
+    with st.expander("Session memory"):
+        registry = SESSIONS.snapshot()
+        st.caption(
+            f"This session {SESSION_BYTES / 1024:.1f} KB of {SESSIONS.budget.max_bytes / 1024:.0f} KB · "
+            f"{registry['sessions']} sessions, {registry['bytes'] / 2**20:.1f} MB total"
+        )
+        st.caption(
+            f"Chat messages trimmed {registry['trimmed_messages']} · stories spilled {registry['spilled_stories']} · "
+            f"idle sessions evicted {registry['evicted_idle']} · ended sessions released {registry['ended']}"
+        )
+    history_slot = st.empty()  # filled after the workflow runs, so it counts this run's stories
+
+if st.session_state.GLOBAL.pop("EVICTED", False):
+    st.info("This tab was idle for a while, so its workflow has started over.")
+
+if METRICS.enabled:
+    metrics_panel()
+RUN.enter("step")
 
 # -----------------------
 # Render per workflow
 # -----------------------
 
 mode = st.session_state.GLOBAL["CURRENT_MODE"]
-step = st.session_state.GLOBAL["CURRENT_STEP"]
+rng = st.session_state.GLOBAL["RNG"]  # session RNG; generated outputs use request_rng(st.session_state)
+MENUS = st.session_state.GLOBAL["MENUS"]  # drawn once per step entry: menu_for() / reshuffle()
 
 # 1) LIB-ATE (strict)
 if mode == "Lib-Ate":
-    L = st.session_state.LIBATE
+    L = workflow(st.session_state, "Lib-Ate")
     active_quip = get_active_quip("Lib-Ate")
 
-    if step == 1:
+    def libate_style():
         st.subheader("STEP 1: LITERARY STYLE SELECTION")
         st.code(
             "🧵 Welcome to Lib-Ate™ - Classic Mad Libs Mode!\n\n"
@@ -521,83 +292,61 @@ if mode == "Lib-Ate":
             language="text",
         )
         st.session_state.GLOBAL["WAITING_FOR"] = "Style selection"
-        style_map = {
-            "1": "Flash Fiction",
-            "2": "Ballads",
-            "3": "Satire & Light Parody",
-            "4": "Breaking News",
-            "5": "Scriptlets",
-            "6": "Wild Card",
-            "7": "Reshuffle",
-        }
         val = st.text_input("Your choice (1-7)", key="libate_style_pick")
         if st.button("Submit style"):
-            choice = val.strip()
-            if choice == "7":
-                # reshuffle: present 5 random styles
-                styles = pick_random_styles()
-                st.session_state.LIBATE["reshuffled_styles"] = styles
-                st.session_state.GLOBAL["CURRENT_STEP"] = 1.5
-                st.rerun()
-            elif choice in style_map:
-                sel = style_map[choice]
-                if sel == "Wild Card":
-                    sel = random.choice([v for k, v in style_map.items() if k in {"1","2","3","4","5"}])
-                L["STYLE_SELECTED"] = sel
-                # keep quip as selected in sidebar
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2
-                st.rerun()
-            else:
-                st.error("Invalid input. Please enter a number 1-7.")
-
-    elif step == 1.5:
-        styles = st.session_state.LIBATE.get("reshuffled_styles", pick_random_styles())
+            return val.strip()
+
+    def libate_style_apply(choice):
+        style_map = LIBATE_STYLE_MAP
+        if choice == "7":
+            return 1.5  # reshuffle: step 1.5 draws 5 random styles
+        sel = style_map[choice]
+        if sel == "Wild Card":
+            sel = rng.choice([v for k, v in style_map.items() if k in {"1","2","3","4","5"}])
+        L.STYLE_SELECTED = sel
+        # keep quip as selected in sidebar
+        return 2
+
+    def libate_reshuffled_style():
+        menu = menu_for(MENUS, "style", lambda: draw_styles(rng, extras=(("Wild Card", ""),)))
         st.subheader("STEP 1 (Reshuffled Styles)")
-        menu = "\n".join([f"{i+1}. {name} - {desc}" for i,(name,desc) in enumerate(styles)]) + "\n6. Wild Card\n"
-        st.code(menu + "\nType 1-6:", language="text")
+        st.code(menu.text + "\n\nType 1-6:", language="text")
         st.session_state.GLOBAL["WAITING_FOR"] = "Style selection"
         v = st.text_input("Your choice (1-6)", key="libate_style_pick2")
         if st.button("Use this style"):
-            c = v.strip()
-            if c in {"1","2","3","4","5"}:
-                L["STYLE_SELECTED"] = styles[int(c)-1][0]
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2
-                st.rerun()
-            elif c == "6":
-                L["STYLE_SELECTED"] = random.choice([s[0] for s in styles])
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2
-                st.rerun()
-            else:
-                st.error("Please enter 1-6.")
+            return v.strip(), menu
+
+    def libate_reshuffled_style_apply(picked):
+        c, menu = picked
+        sel = menu.pick(c)
+        L.STYLE_SELECTED = rng.choice(menu.names()) if sel == "Wild Card" else sel
+        return 2
 
-    elif step == 2:
+    def libate_genre():
         st.subheader("STEP 2: GENRE SELECTION")
-        menu, mapping = genre_menu_block()
-        preface = f"Perfect! We're doing a {L['STYLE_SELECTED']} story with {active_quip} narrating.\n\nChoose your genre:\n"
-        st.code(preface + menu + "\n\nPlease type the number (1-8) of your choice:", language="text")
+        menu = menu_for(MENUS, "genre", lambda: draw_genres(rng))
+        preface = f"Perfect! We're doing a {L.STYLE_SELECTED} story with {active_quip} narrating.\n\nChoose your genre:\n"
+        st.code(preface + menu.text + "\n\nPlease type the number (1-8) of your choice:", language="text")
         st.session_state.GLOBAL["WAITING_FOR"] = "Genre selection"
         x = st.text_input("Your choice", key="libate_genre_pick")
         if st.button("Submit genre"):
-            c = x.strip()
-            if c == "8":
-                # Reshuffle genres
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2  # same step, different options next rerun
-                st.rerun()
-            elif c in mapping:
-                g = mapping[c]
-                if g == "Wild Card":
-                    g = random.choice(CORE_GENRES + FLEX_GENRES + PLAIDVERSE)[0]
-                L["GENRE_SELECTED"] = g
-                st.session_state.GLOBAL["CURRENT_STEP"] = 3
-                st.rerun()
-            else:
-                st.error("Please pick one of the numbered options shown.")
-
-    elif step == 3:
-        active_quip = get_active_quip("Lib-Ate")
+            return x.strip(), menu
+
+    def libate_genre_apply(picked):
+        c, menu = picked
+        g = menu.pick(c)
+        if g == "Reshuffle":
+            reshuffle(MENUS, "genre")
+            return 2  # same step, new options on the rerun
+        if g == "Wild Card":
+            g = rng.choice(ALL_GENRES)[0]
+        L.GENRE_SELECTED = g
+        return 3
+
+    def libate_absurdity():
         st.subheader("STEP 3: ABSURDITY LEVEL")
         st.code(
-            f"Excellent! A {L['STYLE_SELECTED']} {L['GENRE_SELECTED']} story with {active_quip}.\n\n"
+            f"Excellent! A {L.STYLE_SELECTED} {L.GENRE_SELECTED} story with {active_quip}.\n\n"
             "Finally, set the absurdity level:\n"
             "1. Mild - Just a sprinkle of silly\n"
             "2. Moderate - Comfortably ridiculous\n"
@@ -609,30 +358,26 @@ if mode == "Lib-Ate":
         st.session_state.GLOBAL["WAITING_FOR"] = "Absurdity selection"
         v = st.text_input("Your choice (1-4)", key="libate_abs_pick")
         if st.button("Submit absurdity"):
-            m = {"1":"Mild","2":"Moderate","3":"Plaidemonium™","4":"Wild Card"}
-            c = v.strip()
-            if c in m:
-                sel = m[c]
-                if sel == "Wild Card":
-                    sel = random.choice(["Mild","Moderate","Plaidemonium™"])
-                L["ABSURDITY_SELECTED"] = sel
-                st.session_state.GLOBAL["CURRENT_STEP"] = 4
-                st.rerun()
-            else:
-                st.error("Please enter 1-4.")
+            return v.strip()
 
-    elif step == 4:
-        active_quip = get_active_quip("Lib-Ate")
+    def libate_absurdity_apply(c):
+        sel = ABSURDITY_CHOICES[c]
+        if sel == "Wild Card":
+            sel = rng.choice(WILD_ABSURDITY)
+        L.ABSURDITY_SELECTED = sel
+        return 4
+
+    def libate_teaser():
         st.subheader("STEP 4: TEASER AND PROMPT SETUP")
-        L["teaser"] = f'"Aye, a {L["STYLE_SELECTED"]} {L["GENRE_SELECTED"]} with {L["ABSURDITY_SELECTED"]}. What could possibly go tidy?"'
+        L.teaser = f'"Aye, a {L.STYLE_SELECTED} {L.GENRE_SELECTED} with {L.ABSURDITY_SELECTED}. What could possibly go tidy?"'
         st.code(
             f"🎯 Setup Complete!\n"
-            f"- Style: {L['STYLE_SELECTED']}\n"
-            f"- Genre: {L['GENRE_SELECTED']}\n"
-            f"- Absurdity: {L['ABSURDITY_SELECTED']}\n"
+            f"- Style: {L.STYLE_SELECTED}\n"
+            f"- Genre: {L.GENRE_SELECTED}\n"
+            f"- Absurdity: {L.ABSURDITY_SELECTED}\n"
             f"- Narrator: {active_quip}\n\n"
             f"{active_quip} delivers in-character teaser line based on the setup\n\n"
-            f"{L['teaser']}\n\n"
+            f"{L.teaser}\n\n"
             "I'll need 12 words/phrases from you to build this story. Each prompt will include helpful hints!\n\n"
             "Ready to start? Type 'yes' or 'let's go':",
             language="text",
@@ -640,34 +385,19 @@ if mode == "Lib-Ate":
         st.session_state.GLOBAL["WAITING_FOR"] = "Ready confirmation"
         v = st.text_input("Type here", key="libate_ready")
         if st.button("Confirm"):
-            if v.strip().lower() in {"yes","let's go","lets go","y"}:
-                L["PROMPTS_NEEDED"] = 12
-                L["PROMPTS_COLLECTED"] = 0
-                st.session_state.GLOBAL["CURRENT_STEP"] = 5
-                st.rerun()
-            else:
-                st.error("Please type 'yes' or 'let's go' to continue.")
+            return v.strip().lower()
+
+    def libate_teaser_apply(v):
+        L.PROMPTS_NEEDED = 12
+        L.PROMPTS_COLLECTED = 0
+        return 5
 
-    elif step == 5:
+    def libate_word():
         st.subheader("STEP 5: WORD COLLECTION")
-        prompts = [
-            ("name", "Name (proper noun)", "Think protagonist: e.g., ‘Rowan’"),
-            ("profession", "Profession (noun)", "Detective, baker, cartographer…"),
-            ("place", "Place (noun)", "City, valley, ship, café…"),
-            ("adjective", "Adjective", "Moody, iridescent, stubborn…"),
-            ("object", "Object (noun)", "Lantern, violin, ledger…"),
-            ("name2", "Second character name", "Rival or ally"),
-            ("object2", "Second object (noun)", "Key, coin, compass…"),
-            ("place2", "Second place (noun)", "Square, market, jetty…"),
-            ("portal", "Portal/threshold (noun)", "Doorway, ripple, curtain…"),
-            ("tool", "Tool/aid (abstract ok)", "Courage, compass, trick…"),
-            ("trait", "Virtue/trait", "Grace, grit, candor…"),
-            ("wild", "Wildcard word/phrase", "Anything at all"),
-        ]
-        idx = L["PROMPTS_COLLECTED"]
-        key_name, title, helptext = prompts[idx]
+        idx = L.PROMPTS_COLLECTED
+        key_name, title, helptext = LIBATE_PROMPTS[idx]
         st.code(
-            f"Prompt {idx+1} of {L['PROMPTS_NEEDED']}:\n\n"
+            f"Prompt {idx+1} of {L.PROMPTS_NEEDED}:\n\n"
             f"{title}\n{helptext}\n\n"
             f"{macquip_aside('If you draw a blank, type “surprise me”.', 'Lib-Ate')}\n\n"
             "Your answer (or type \"surprise me\"):",
@@ -675,55 +405,40 @@ if mode == "Lib-Ate":
         )
         st.session_state.GLOBAL["WAITING_FOR"] = "Word prompt response"
         v = st.text_input("Answer", key=f"libate_word_{idx}")
-        if st.button("Submit answer"):
-            ans = v.strip()
-            if not ans or ans.lower() == "surprise me":
-                # Auto-pick
-                auto = random.choice([
-                    "Rowan","Harper","Alex","Miri","Sable","Juno","Isla","Orion",
-                    "astronomer","baker","tinkerer","ranger","scribe",
-                    "Dockside","Northbridge","Glimmerfall","Moonmarket",
-                    "tattered","luminous","sardonic","restless",
-                    "compass","ledger","lantern","accordion","vending machine",
-                    "Riley","Kestrel","Nico","Vee",
-                    "map","coin","hourglass","key",
-                    "Rookery","East Gate","Sun Stairs","Old Yard",
-                    "ripple","threshold","curtain","vellum",
-                    "courage","wit","stubbornness","luck",
-                    "grace","grit","candor","pluck",
-                    "confetti rain","time hiccup","snack-based destiny",
-                ])
-                L["COLLECTED"][key_name] = auto
-                st.success(f'Surprise pick: "{auto}"')
-            else:
-                L["COLLECTED"][key_name] = ans
-                st.success("Saved.")
-            L["PROMPTS_COLLECTED"] += 1
-            if L["PROMPTS_COLLECTED"] >= L["PROMPTS_NEEDED"]:
-                st.session_state.GLOBAL["CURRENT_STEP"] = 6
-            st.rerun()
-
-    elif step == 6:
-        active_quip = get_active_quip("Lib-Ate")
+        if st.button("Submit answer", key=f"libate_word_submit_{idx}"):
+            return key_name, v.strip()
+
+    def libate_word_apply(answer):
+        key_name, ans = answer
+        if not ans or ans.lower() == "surprise me":
+            # Auto-pick
+            L.COLLECTED[key_name] = rng.choice(SURPRISE_WORDS)
+        else:
+            L.COLLECTED[key_name] = ans
+        L.PROMPTS_COLLECTED += 1
+        return 6 if L.PROMPTS_COLLECTED >= L.PROMPTS_NEEDED else 5
+
+    def libate_story():
         st.subheader("STEP 6: STORY GENERATION")
         st.code(
             "🎪 All prompts collected! {q} is weaving your words into magic...\n\n".format(q=active_quip) +
             f"🎭 FINAL CONFIGURATION 🎭\n"
-            f"Literary Style: {L['STYLE_SELECTED']}\n"
-            f"Genre: {L['GENRE_SELECTED']}\n"
-            f"Absurdity Level: {L['ABSURDITY_SELECTED']}\n"
+            f"Literary Style: {L.STYLE_SELECTED}\n"
+            f"Genre: {L.GENRE_SELECTED}\n"
+            f"Absurdity Level: {L.ABSURDITY_SELECTED}\n"
             f"Narrator: {active_quip}\n\n"
             f"{active_quip} delivers dramatic pre-story flair comment\n",
             language="text",
         )
-        story = assemble_story(L["STYLE_SELECTED"], L["GENRE_SELECTED"], L["ABSURDITY_SELECTED"], L["QUIP_SELECTED"], L["COLLECTED"])
+        seed, story_rng = request_rng(st.session_state)
+        story = compose_story(L.STYLE_SELECTED, L.GENRE_SELECTED, L.ABSURDITY_SELECTED, L.QUIP_SELECTED, L.COLLECTED, story_rng)
+        keep_story(story, seed, f"{L.STYLE_SELECTED} {L.GENRE_SELECTED}")
         st.markdown(story)
+        show_seed(seed)
         st.markdown(f"_{active_quip} outro:_ Curtain call with a wink.")
-        # Proceed to Remix
-        st.session_state.GLOBAL["CURRENT_STEP"] = 7
+        return story  # shown once; Remix renders below it
 
-    elif step == 7:
-        active_quip = get_active_quip("Lib-Ate")
+    def libate_remix():
         st.subheader("STEP 7: REMIX OPTIONS")
         st.code(
             "🔄 What would you like to do next?\n\n"
@@ -736,50 +451,67 @@ if mode == "Lib-Ate":
             "Please type the number (1-6):",
             language="text",
         )
-
         c = st.text_input("Remix choice", key="libate_remix")
         if st.button("Apply remix"):
-            if c.strip() in {"1", "2", "3", "4"}:
-                # simple remixes: regenerate story with tweaks
-                tweak = c.strip()
-                seeds = st.session_state.LIBATE["COLLECTED"].copy()
-                style = L["STYLE_SELECTED"]
-                genre = L["GENRE_SELECTED"]
-                absurd = L["ABSURDITY_SELECTED"]
-
-                if tweak == "1":
-                    style = "Magic Realism"
-                elif tweak == "2":
-                    seeds["trait"] = seeds.get("trait", "grit") + " (dialect spice)"
-                elif tweak == "3":
-                    style = random.choice(["Ballads", "Breaking News", "Scriptlets", "Flash Fiction"])
-                elif tweak == "4":
-                    absurd = "Plaidemonium™"
-
-                new_story = assemble_story(style, genre, absurd, L["QUIP_SELECTED"], seeds)
-                st.session_state.generated_story = new_story
-                st.markdown(f"### ✨ Remixed Story: Option {tweak}")
-                st.markdown(new_story)
-
-            elif c.strip() == "5":
-                st.markdown("**PlaidMagGen-It:** See _PlaidMagGen_ workflow to craft a 3-panel prompt from this story.")
-
-            elif c.strip() == "6":
-                reset_mode("Lib-Ate")
-                st.rerun()
-
-            else:
-                st.error("Please pick 1-6.")
+            return c.strip()
+
+    def libate_remix_apply(tweak):
+        if tweak in {"1", "2", "3", "4"}:
+            # simple remixes: regenerate story with tweaks
+            seed, story_rng = request_rng(st.session_state)
+            seeds = L.COLLECTED.copy()
+            style = L.STYLE_SELECTED
+            genre = L.GENRE_SELECTED
+            absurd = L.ABSURDITY_SELECTED
+
+            if tweak == "1":
+                style = "Magic Realism"
+            elif tweak == "2":
+                seeds["trait"] = seeds.get("trait", "grit") + " (dialect spice)"
+            elif tweak == "3":
+                style = story_rng.choice(REMIX_STYLES)
+            elif tweak == "4":
+                absurd = "Plaidemonium™"
+
+            new_story = compose_story(style, genre, absurd, L.QUIP_SELECTED, seeds, story_rng, remix=True)
+            keep_story(new_story, seed, f"{style} {genre} (remix {tweak})")
+            st.markdown(f"### ✨ Remixed Story: Option {tweak}")
+            st.markdown(new_story)
+            show_seed(seed)
+
+        elif tweak == "5":
+            st.markdown("**PlaidMagGen-It:** See _PlaidMagGen_ workflow to craft a 3-panel prompt from this story.")
+
+        elif tweak == "6":
+            reset_mode("Lib-Ate")
+            return 1
+
+    show_flow({
+        1: Step(libate_style, libate_style_apply,
+                lambda c: None if c in LIBATE_STYLE_MAP else "Invalid input. Please enter a number 1-7."),
+        1.5: Step(libate_reshuffled_style, libate_reshuffled_style_apply,
+                  lambda p: None if p[1].pick(p[0]) else "Please enter 1-6."),
+        2: Step(libate_genre, libate_genre_apply,
+                lambda p: None if p[1].pick(p[0]) else "Please pick one of the numbered options shown."),
+        3: Step(libate_absurdity, libate_absurdity_apply,
+                lambda c: None if c in ABSURDITY_CHOICES else "Please enter 1-4."),
+        4: Step(libate_teaser, libate_teaser_apply,
+                lambda v: None if v in {"yes","let's go","lets go","y"} else "Please type 'yes' or 'let's go' to continue."),
+        5: Step(libate_word, libate_word_apply, reentrant=True),
+        6: Step(libate_story, lambda story: 7, keep=True, completes=True),
+        7: Step(libate_remix, libate_remix_apply,
+                lambda c: None if c in {"1","2","3","4","5","6"} else "Please pick 1-6."),
+    })
 
     # Post-story options
     st.subheader("Post-Story Options")
     if "generated_story" not in st.session_state:
-        st.session_state.generated_story = story if "story" in locals() else ""
+        st.session_state.generated_story = ""
 
     # Download button
     st.download_button(
         label="📥 Download Story",
-        data=st.session_state.generated_story,
+        data=story_download(story_text(st.session_state)),
         file_name="libate_story.txt",
         mime="text/plain",
     )
@@ -788,68 +520,62 @@ if mode == "Lib-Ate":
     if st.button("Remix Story"):
         st.success("You can Proceed to Remix After Generating Story")
 
-
-
 # 2) CREATE-DIRECT
 elif mode == "Create Direct":
-    C = st.session_state.CREATEDIRECT
+    C = workflow(st.session_state, "Create Direct")
     active_quip = get_active_quip("Create Direct")
 
-    if step == 1:
+    def cd_style():
         st.subheader("STEP 1: LITERARY STYLE SELECTION")
-        styles = pick_random_styles()
-        menu = "\n".join([f"{i+1}. {n} - {d}" for i,(n,d) in enumerate(styles)])
+        menu = menu_for(MENUS, "style", lambda: draw_styles(
+            rng, extras=(("Wild Card", "Surprise style!"), ("Reshuffle", "Different options"))))
         st.code(
             "✍️ Create Mode (Direct) - Instant Story Generation!\n\n"
-            "Choose the literary style:\n" + menu +
-            "\n6. Wild Card - Surprise style!\n7. Reshuffle - Different options\n\nPlease type the number (1-7):",
+            "Choose the literary style:\n" + menu.text + "\n\nPlease type the number (1-7):",
             language="text",
         )
         st.session_state.GLOBAL["WAITING_FOR"] = "Style selection"
         v = st.text_input("Your choice", key="cd_style")
         if st.button("Submit style"):
-            c = v.strip()
-            if c == "7":
-                st.rerun()
-            elif c == "6":
-                C["STYLE_SELECTED"] = random.choice([s[0] for s in styles])
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2
-                st.rerun()
-            elif c in {"1","2","3","4","5"}:
-                C["STYLE_SELECTED"] = styles[int(c)-1][0]
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2
-                st.rerun()
-            else:
-                st.error("Pick 1-7.")
-
-    elif step == 2:
+            return v.strip(), menu
+
+    def cd_style_apply(picked):
+        c, menu = picked
+        sel = menu.pick(c)
+        if sel == "Reshuffle":
+            reshuffle(MENUS, "style")
+            return 1
+        C.STYLE_SELECTED = rng.choice(menu.names()) if sel == "Wild Card" else sel
+        return 2
+
+    def cd_genre():
         st.subheader("STEP 2: GENRE SELECTION")
-        menu, mapping = genre_menu_block()
+        menu = menu_for(MENUS, "genre", lambda: draw_genres(rng))
         st.code(
-            f"Excellent! A {C['STYLE_SELECTED']} story with {active_quip}.\n\n"
-            "Pick your genre:\n" + menu + "\n\nPlease type the number (1-8):",
+            f"Excellent! A {C.STYLE_SELECTED} story with {active_quip}.\n\n"
+            "Pick your genre:\n" + menu.text + "\n\nPlease type the number (1-8):",
             language="text",
         )
         st.session_state.GLOBAL["WAITING_FOR"] = "Genre selection"
         v = st.text_input("Your choice", key="cd_genre")
         if st.button("Submit genre"):
-            c = v.strip()
-            if c == "8":
-                st.rerun()
-            elif c in mapping:
-                g = mapping[c]
-                if g == "Wild Card":
-                    g = random.choice(CORE_GENRES + FLEX_GENRES + PLAIDVERSE)[0]
-                C["GENRE_SELECTED"] = g
-                st.session_state.GLOBAL["CURRENT_STEP"] = 3
-                st.rerun()
-            else:
-                st.error("Pick one of the visible numbers.")
-
-    elif step == 3:
+            return v.strip(), menu
+
+    def cd_genre_apply(picked):
+        c, menu = picked
+        g = menu.pick(c)
+        if g == "Reshuffle":
+            reshuffle(MENUS, "genre")
+            return 2
+        if g == "Wild Card":
+            g = rng.choice(ALL_GENRES)[0]
+        C.GENRE_SELECTED = g
+        return 3
+
+    def cd_absurdity():
         st.subheader("STEP 3: ABSURDITY LEVEL")
         st.code(
-            f"Great choice! {C['STYLE_SELECTED']} {C['GENRE_SELECTED']} with {active_quip}.\n\n"
+            f"Great choice! {C.STYLE_SELECTED} {C.GENRE_SELECTED} with {active_quip}.\n\n"
             "Set the chaos level:\n"
             "1. Mild - Just a sprinkle of silly\n"
             "2. Moderate - Comfortably ridiculous\n"
@@ -861,52 +587,36 @@ elif mode == "Create Direct":
         st.session_state.GLOBAL["WAITING_FOR"] = "Absurdity selection"
         v = st.text_input("Your choice", key="cd_abs")
         if st.button("Submit absurdity"):
-            c = v.strip()
-            if c in {"1","2","3","4"}:
-                mapping = {"1":"Mild","2":"Moderate","3":"Plaidemonium™","4":"Wild Card"}
-                sel = mapping[c]
-                if sel == "Wild Card":
-                    sel = random.choice(["Mild","Moderate","Plaidemonium™"])
-                C["ABSURDITY_SELECTED"] = sel
-                st.session_state.GLOBAL["CURRENT_STEP"] = 4
-                st.rerun()
-            else:
-                st.error("Pick 1-4.")
+            return v.strip()
+
+    def cd_absurdity_apply(c):
+        sel = ABSURDITY_CHOICES[c]
+        if sel == "Wild Card":
+            sel = rng.choice(WILD_ABSURDITY)
+        C.ABSURDITY_SELECTED = sel
+        return 4
 
-    elif step == 4:
+    def cd_confirm():
         st.subheader("STEP 4: CONFIRMATION & GENERATION")
         st.code(
             "🎯 Story Configuration Complete!\n\n"
-            f"- Storyteller: {active_quip}\n- Style: {C['STYLE_SELECTED']}\n- Genre: {C['GENRE_SELECTED']}\n- Absurdity: {C['ABSURDITY_SELECTED']}\n\n"
+            f"- Storyteller: {active_quip}\n- Style: {C.STYLE_SELECTED}\n- Genre: {C.GENRE_SELECTED}\n- Absurdity: {C.ABSURDITY_SELECTED}\n\n"
             f"{active_quip} delivers in-character teaser/intro line\n\n"
             "Ready for your instant story? Type 'Let's Go' or hit any key:",
             language="text",
         )
         v = st.text_input("Confirm", key="cd_go")
-
         if st.button("Generate"):
-            seeds = {
-                "name": random.choice(["Rowan","Alex","Miri","Jax"]),
-                "profession": random.choice(["astronomer","baker","tinkerer","ranger"]),
-                "place": random.choice(["Harborlight","Northbridge","Glimmerfall"]),
-                "adjective": random.choice(["restless","luminous","sardonic"]),
-                "object": random.choice(["lantern","ledger","compass"]),
-                "name2": random.choice(["Riley","Kestrel","Vee"]),
-                "object2": random.choice(["map","coin","hourglass"]),
-                "place2": random.choice(["East Gate","Sun Stairs","Old Yard"]),
-                "portal": random.choice(["ripple","curtain","threshold"]),
-                "tool": random.choice(["courage","wit","stubbornness"]),
-                "trait": random.choice(["grace","grit","candor"]),
-            }
-            st.session_state.generated_story = assemble_story(
-                C["STYLE_SELECTED"], C["GENRE_SELECTED"], C["ABSURDITY_SELECTED"], active_quip, seeds
-            )
+            return v
 
-            # Move to step 5 correctly
-            st.session_state.GLOBAL["CURRENT_STEP"] = 5
-            st.rerun()
+    def cd_generate(v):
+        seed, story_rng = request_rng(st.session_state)
+        seeds = random_story_seeds(story_rng)
+        story = compose_story(C.STYLE_SELECTED, C.GENRE_SELECTED, C.ABSURDITY_SELECTED, active_quip, seeds, story_rng)
+        keep_story(story, seed, f"{C.STYLE_SELECTED} {C.GENRE_SELECTED}")
+        return 5
 
-    elif step == 5:
+    def cd_remix():
         st.subheader("STEP 5: REMIX OPTIONS")
         st.code(
             "🔄 What would you like to do next?\n\n"
@@ -922,56 +632,70 @@ elif mode == "Create Direct":
 
         if "generated_story" in st.session_state:
             st.markdown("### 📖 Your Story")
-            st.markdown(st.session_state.generated_story)
+            st.markdown(story_text(st.session_state))
+            show_seed(st.session_state.get("generated_seed"))
 
         c = st.text_input("Remix choice", key="createdirect_remix")
         if st.button("Apply remix"):
-            if c.strip() in {"1", "2", "3", "4"}:
-                tweak = c.strip()
-                seeds = st.session_state.CREATEDIRECT.get("COLLECTED", {}).copy()
-                style, genre, absurd = C["STYLE_SELECTED"], C["GENRE_SELECTED"], C["ABSURDITY_SELECTED"]
-
-                if tweak == "1":
-                    style = "Magic Realism"
-                elif tweak == "2":
-                    seeds["trait"] = seeds.get("trait", "grit") + " (dialect spice)"
-                elif tweak == "3":
-                    style = random.choice(["Ballads", "Breaking News", "Scriptlets", "Flash Fiction"])
-                elif tweak == "4":
-                    absurd = "Plaidemonium™"
-
-                new_story = assemble_story(style, genre, absurd, active_quip, seeds)
-                st.session_state.generated_story = new_story
-                st.markdown(f"### ✨ Remixed Story: Option {tweak}")
-                st.markdown(new_story)
-
-            elif c.strip() == "5":
-                st.markdown("**PlaidMagGen-It:** See _PlaidMagGen_ workflow to craft a 3-panel prompt from this story.")
-
-            elif c.strip() == "6":
-                reset_mode("Create Direct")
-                st.rerun()
-            else:
-                st.error("Please pick 1-6.")
+            return c.strip()
+
+    def cd_remix_apply(tweak):
+        if tweak in {"1", "2", "3", "4"}:
+            seed, story_rng = request_rng(st.session_state)
+            seeds = {}  # Create Direct collects no words of its own
+            style, genre, absurd = C.STYLE_SELECTED, C.GENRE_SELECTED, C.ABSURDITY_SELECTED
+
+            if tweak == "1":
+                style = "Magic Realism"
+            elif tweak == "2":
+                seeds["trait"] = seeds.get("trait", "grit") + " (dialect spice)"
+            elif tweak == "3":
+                style = story_rng.choice(REMIX_STYLES)
+            elif tweak == "4":
+                absurd = "Plaidemonium™"
+
+            new_story = compose_story(style, genre, absurd, active_quip, seeds, story_rng, remix=True)
+            keep_story(new_story, seed, f"{style} {genre} (remix {tweak})")
+            st.markdown(f"### ✨ Remixed Story: Option {tweak}")
+            st.markdown(new_story)
+            show_seed(seed)
+
+        elif tweak == "5":
+            st.markdown("**PlaidMagGen-It:** See _PlaidMagGen_ workflow to craft a 3-panel prompt from this story.")
+
+        elif tweak == "6":
+            reset_mode("Create Direct")
+            return 1
+
+    show_flow({
+        1: Step(cd_style, cd_style_apply, lambda p: None if p[1].pick(p[0]) else "Pick 1-7."),
+        2: Step(cd_genre, cd_genre_apply,
+                lambda p: None if p[1].pick(p[0]) else "Pick one of the visible numbers."),
+        3: Step(cd_absurdity, cd_absurdity_apply,
+                lambda c: None if c in ABSURDITY_CHOICES else "Pick 1-4."),
+        4: Step(cd_confirm, cd_generate),
+        5: Step(cd_remix, cd_remix_apply,
+                lambda c: None if c in {"1","2","3","4","5","6"} else "Please pick 1-6.", completes=True),
+    })
 
-        # Always show Post-Story options
+    # Always show Post-Story options
+    if st.session_state.GLOBAL["CURRENT_STEP"] == 5:
         st.subheader("Post-Story Options")
         st.download_button(
             label="📥 Download Story",
-            data=st.session_state.generated_story,
+            data=story_download(story_text(st.session_state)),
             file_name="create_direct_story.txt",
             mime="text/plain",
         )
         if st.button("Post Story"):
             st.success("Story has been posted! (integration pending)")
 
-
 # 3) STORYLINE
 elif mode == "Storyline":
-    S = st.session_state.STORYLINE
+    S = workflow(st.session_state, "Storyline")
     active_quip = get_active_quip("Storyline")
 
-    if step == 1:
+    def sl_concept():
         st.subheader("STEP 1: YOUR STORY CONCEPT")
         st.code(
             "✍️ Create Mode (Storyline) - You Set The Scene!\n\n"
@@ -984,123 +708,76 @@ elif mode == "Storyline":
         st.session_state.GLOBAL["WAITING_FOR"] = "Story concept"
         concept = st.text_area("Describe your concept", key="sl_concept", height=140)
         if st.button("Save Concept"):
-            if concept.strip():
-                S["USER_STORYLINE"] = concept.strip()
-                st.success("Concept saved.")
-                st.session_state.GLOBAL["CURRENT_STEP"] = 2
-                st.rerun()
-            else:
-                st.error("Please enter a concept.")
+            return concept.strip()
+
+    def sl_concept_apply(concept):
+        S.USER_STORYLINE = concept
+        return 2
 
-    elif step == 2:
+    def sl_style():
         st.subheader("STEP 2: STYLE PICK")
-        styles = pick_random_styles()
-        menu = "\n".join([f"{i+1}. {n} - {d}" for i,(n,d) in enumerate(styles)])
+        menu = menu_for(MENUS, "style", lambda: draw_styles(rng, extras=(("Wild Card", ""), ("Reshuffle", ""))))
         st.code(
             "Choose a literary style for your concept:\n"
-            + menu + "\n6. Wild Card\n7. Reshuffle\n\nType 1-7:",
+            + menu.text + "\n\nType 1-7:",
             language="text",
         )
         v = st.text_input("Your choice", key="sl_style")
         if st.button("Submit style"):
-            c = v.strip()
-            if c == "7":
-                st.rerun()
-            elif c == "6":
-                S["STYLE_SELECTED"] = random.choice([s[0] for s in styles])
-                st.session_state.GLOBAL["CURRENT_STEP"] = 3
-                st.rerun()
-            elif c in {"1","2","3","4","5"}:
-                S["STYLE_SELECTED"] = styles[int(c)-1][0]
-                st.session_state.GLOBAL["CURRENT_STEP"] = 3
-                st.rerun()
-            else:
-                st.error("Pick 1-7.")
-
-    elif step == 3:
+            return v.strip(), menu
+
+    def sl_style_apply(picked):
+        c, menu = picked
+        sel = menu.pick(c)
+        if sel == "Reshuffle":
+            reshuffle(MENUS, "style")
+            return 2
+        S.STYLE_SELECTED = rng.choice(menu.names()) if sel == "Wild Card" else sel
+        return 3
+
+    def sl_absurdity():
         st.subheader("STEP 3: ABSURDITY LEVEL")
         st.code(
-            f"Style locked: {S['STYLE_SELECTED']}.\n"
+            f"Style locked: {S.STYLE_SELECTED}.\n"
             "Set the absurdity level:\n"
             "1. Mild\n2. Moderate\n3. Plaidemonium™\n4. Wild Card\n\nType 1-4:",
             language="text",
         )
         v = st.text_input("Your choice", key="sl_abs")
         if st.button("Submit absurdity"):
-            m = {"1":"Mild","2":"Moderate","3":"Plaidemonium™","4":"Wild Card"}
-            c = v.strip()
-            if c in m:
-                sel = m[c]
-                if sel == "Wild Card":
-                    sel = random.choice(["Mild","Moderate","Plaidemonium™"])
-                S["ABSURDITY_SELECTED"] = sel
-                st.session_state.GLOBAL["CURRENT_STEP"] = 4
-                st.rerun()
-            else:
-                st.error("Pick 1-4.")
+            return v.strip()
 
-    elif step == 4:
+    def sl_absurdity_apply(c):
+        sel = ABSURDITY_CHOICES[c]
+        if sel == "Wild Card":
+            sel = rng.choice(WILD_ABSURDITY)
+        S.ABSURDITY_SELECTED = sel
+        return 4
+
+    def sl_generate():
         st.subheader("STEP 4: GENERATE FROM CONCEPT")
         st.code(
             f"🎬 Translating your concept into a story seed and weaving it through {active_quip}.\n"
             "Press Generate when ready.",
             language="text",
         )
-
-        def seeds_from_concept(txt: str) -> Dict[str, str]:
-            words = re.findall(r"[A-Za-z']+", txt)
-            caps = re.findall(r"\b[A-Z][a-z']+\b", txt)
-            name = caps[0] if caps else random.choice(["Rowan","Alex","Miri","Jax"])
-            professions = ["baker","astronomer","detective","ranger","scribe","cartographer","librarian","sailor","pilot"]
-            prof = None
-            for w in words:
-                if w.lower() in professions:
-                    prof = w.lower()
-                    break
-                if w.endswith("er") and len(w) > 4:
-                    prof = w.lower()
-                    break
-            prof = prof or random.choice(professions)
-            place = None
-            m = re.search(r"\b(in|at|under|inside|near)\s+([A-Za-z][A-Za-z\s']{2,})", txt, flags=re.IGNORECASE)
-            if m:
-                place = m.group(2).strip().split()[0:2]
-                place = " ".join(place)
-            place = place or random.choice(["Harborlight","Northbridge","Glimmerfall","Dockside"])
-            adjectives = ["restless","luminous","sardonic","tattered","iridescent"]
-            adj = None
-            for w in words:
-                if w.lower() in adjectives:
-                    adj = w.lower(); break
-            adj = adj or random.choice(adjectives)
-            obj = random.choice(["lantern","ledger","compass","violin","coin","hourglass"])
-            name2 = random.choice(["Riley","Kestrel","Vee","Nico"])
-            obj2 = random.choice(["map","key","ticket","note"])
-            place2 = random.choice(["East Gate","Old Yard","Sun Stairs"])
-            portal = random.choice(["ripple","threshold","curtain"])
-            tool = random.choice(["courage","wit","stubbornness"])
-            trait = random.choice(["grace","grit","candor"])
-            return {
-                "name": name, "profession": prof, "place": place, "adjective": adj, "object": obj,
-                "name2": name2, "object2": obj2, "place2": place2, "portal": portal, "tool": tool, "trait": trait,
-                "wild": random.choice(["confetti rain","time hiccup","snack-based destiny"]),
-            }
-
         if st.button("Generate Story"):
-            seeds = seeds_from_concept(S["USER_STORYLINE"])
-            story = assemble_story(S["STYLE_SELECTED"], random.choice([g[0] for g in CORE_GENRES+FLEX_GENRES+PLAIDVERSE]),
-                                   S["ABSURDITY_SELECTED"], S["QUIP_SELECTED"], seeds)
-            st.session_state.generated_story = story
-            st.markdown("### ✨ Your Story")
-            st.markdown(story)
-            st.session_state.GLOBAL["CURRENT_STEP"] = 5
-            st.rerun()
+            return True
 
-    elif step == 5:
+    def sl_generate_apply(go):
+        seed, story_rng = request_rng(st.session_state)
+        seeds = seeds_from_concept(S.USER_STORYLINE, story_rng)
+        genre = story_rng.choice([g[0] for g in ALL_GENRES])
+        story = compose_story(S.STYLE_SELECTED, genre, S.ABSURDITY_SELECTED, S.QUIP_SELECTED, seeds, story_rng)
+        keep_story(story, seed, f"{S.STYLE_SELECTED} {genre}")
+        return 5
+
+    def sl_remix():
         # Show the story again if available
         if "generated_story" in st.session_state:
             st.markdown("### ✨ Your Story")
-            st.markdown(st.session_state.generated_story)
+            st.markdown(story_text(st.session_state))
+            show_seed(st.session_state.get("generated_seed"))
 
         # Post-Story options
         st.subheader("Post-Story Options")
@@ -1111,47 +788,58 @@ elif mode == "Storyline":
         )
         v = st.text_input("Pick 1-5", key="sl_remix")
         if st.button("Apply"):
-            if v.strip() in {"1","2","3","4"}:
-                seeds = {"name":"Remy","profession":"wanderer","place":"Plaidshire","adjective":"zany","object":"teacup",
-                         "name2":"Quinn","object2":"ticket","place2":"Clocktower","portal":"mirror","tool":"pluck","trait":"wit"}
-                style = S["STYLE_SELECTED"]
-                absurd = S["ABSURDITY_SELECTED"]
-                genre = random.choice([g[0] for g in CORE_GENRES+FLEX_GENRES+PLAIDVERSE])
-                if v.strip() == "1":
-                    style = "Magic Realism"
-                elif v.strip() == "2":
-                    seeds["trait"] += " (dialect spice)"
-                elif v.strip() == "3":
-                    style = random.choice(["Ballads","Flash Fiction","Scriptlets","Breaking News"])
-                elif v.strip() == "4":
-                    absurd = "Plaidemonium™"
-                remixed_story = assemble_story(style, genre, absurd, S["QUIP_SELECTED"], seeds)
-                st.session_state.generated_story = remixed_story
-                st.markdown("### ✨ Remixed Story")
-                st.markdown(remixed_story)
-            elif v.strip() == "5":
-                reset_mode("Storyline")
-                st.rerun()
-            else:
-                st.error("Pick 1-5.")
+            return v.strip()
+
+    def sl_remix_apply(v):
+        if v == "5":
+            reset_mode("Storyline")
+            return 1
+        seed, story_rng = request_rng(st.session_state)
+        seeds = dict(REMIX_SEEDS)
+        style = S.STYLE_SELECTED
+        absurd = S.ABSURDITY_SELECTED
+        genre = story_rng.choice([g[0] for g in ALL_GENRES])
+        if v == "1":
+            style = "Magic Realism"
+        elif v == "2":
+            seeds["trait"] += " (dialect spice)"
+        elif v == "3":
+            style = story_rng.choice(REMIX_STYLES)
+        elif v == "4":
+            absurd = "Plaidemonium™"
+        remixed_story = compose_story(style, genre, absurd, S.QUIP_SELECTED, seeds, story_rng, remix=True)
+        keep_story(remixed_story, seed, f"{style} {genre} (remix {v})")
+        st.markdown("### ✨ Remixed Story")
+        st.markdown(remixed_story)
+        show_seed(seed)
+
+    show_flow({
+        1: Step(sl_concept, sl_concept_apply, lambda concept: None if concept else "Please enter a concept."),
+        2: Step(sl_style, sl_style_apply, lambda p: None if p[1].pick(p[0]) else "Pick 1-7."),
+        3: Step(sl_absurdity, sl_absurdity_apply,
+                lambda c: None if c in ABSURDITY_CHOICES else "Pick 1-4."),
+        4: Step(sl_generate, sl_generate_apply),
+        5: Step(sl_remix, sl_remix_apply,
+                lambda v: None if v in {"1","2","3","4","5"} else "Pick 1-5.", completes=True),
+    })
 
-        # Download and Post buttons
+    # Download and Post buttons
+    if st.session_state.GLOBAL["CURRENT_STEP"] == 5:
         st.download_button(
             label="📥 Download Story",
-            data=st.session_state.generated_story,
+            data=story_download(story_text(st.session_state)),
             file_name="storyline_story.txt",
             mime="text/plain",
         )
         if st.button("Post Story"):
             st.success("Story has been posted! (integration pending)")
 
-
-
 # 4) PLAIDPIC
 elif mode == "PlaidPic":
-    P = st.session_state.PLAIDPIC
+    P = workflow(st.session_state, "PlaidPic")
     active_quip = get_active_quip("PlaidPic")
-    if step == 1:
+
+    def pic_input():
         st.subheader("STEP 1: IMAGE OR DESCRIPTION")
         st.code(
             "PlaidPic turns an image (or your description of it) into a story + visual prompt.\n"
@@ -1161,345 +849,572 @@ elif mode == "PlaidPic":
         uploaded = st.file_uploader("Upload image (optional)", type=["png","jpg","jpeg","webp"], key="pp_file")
         desc = st.text_area("Or describe the image", key="pp_desc", height=120, placeholder="e.g., A fox in a plaid scarf at a rainy bus stop...")
         if st.button("Proceed"):
-            P["IMAGE_UPLOADED"] = bool(uploaded)
-            P["TEXT_DESC"] = desc.strip()
-            P["IMAGE_ANALYSIS"] = {}
-            st.session_state.GLOBAL["CURRENT_STEP"] = 2
-            st.rerun()
+            return bool(uploaded), desc.strip()
+
+    def pic_input_apply(picked):
+        P.IMAGE_UPLOADED, P.TEXT_DESC = picked
+        P.IMAGE_ANALYSIS = {}
+        return 2
 
-    elif step == 2:
+    def pic_labels():
         st.subheader("STEP 2: QUICK ANALYSIS LABELS")
         cap = st.text_input("Short caption", key="pp_cap", placeholder="Rain waits in plaid")
         mood = st.text_input("Mood / Tone", key="pp_mood", placeholder="wistful, cozy")
         focal = st.text_input("Focal element", key="pp_focal", placeholder="plaid scarf / fox / umbrella")
         env = st.text_input("Environment", key="pp_env", placeholder="bus stop / rainy street / neon")
         if st.button("Save & Continue"):
-            P["IMAGE_ANALYSIS"] = {"caption":cap.strip(),"mood":mood.strip(),"focal":focal.strip(),"env":env.strip()}
-            st.session_state.GLOBAL["CURRENT_STEP"] = 3
-            st.rerun()
+            return {"caption":cap.strip(),"mood":mood.strip(),"focal":focal.strip(),"env":env.strip()}
 
-    elif step == 3:
+    def pic_labels_apply(analysis):
+        P.IMAGE_ANALYSIS = analysis
+        return 3
+
+    def pic_config():
         st.subheader("STEP 3: STYLE, GENRE, ABSURDITY")
-        styles = pick_random_styles()
-        st.code("\n".join([f"{i+1}. {n} - {d}" for i,(n,d) in enumerate(styles)]) + "\n6. Wild Card", language="text")
+        styles = menu_for(MENUS, "style", lambda: draw_styles(rng, extras=(("Wild Card", ""),)))
+        st.code(styles.text, language="text")
         s = st.text_input("Pick style 1-6", key="pp_style")
-        menu, mapping = genre_menu_block()
-        st.code("Genres:\n" + menu + "\n(type number)", language="text")
+        genres = menu_for(MENUS, "genre", lambda: draw_genres(rng))
+        st.code("Genres:\n" + genres.text + "\n(type number)", language="text")
         g = st.text_input("Pick genre", key="pp_genre")
         st.code("Absurdity: 1 Mild / 2 Moderate / 3 Plaidemonium™ / 4 Wild Card", language="text")
         a = st.text_input("Pick absurdity", key="pp_abs")
-
         if st.button("Lock Config"):
-            # style
-            if s.strip() == "6":
-                P["STYLE_SELECTED"] = random.choice([x[0] for x in styles])
-            elif s.strip() in {"1","2","3","4","5"}:
-                P["STYLE_SELECTED"] = styles[int(s.strip())-1][0]
-            else:
-                st.error("Pick a valid style."); st.stop()
-            # genre
-            if g.strip() == "8":
-                # reshuffle genres next rerun (we’ll accept current set)
-                pass
-            if g.strip() in mapping:
-                gg = mapping[g.strip()]
-                if gg == "Wild Card":
-                    gg = random.choice(CORE_GENRES + FLEX_GENRES + PLAIDVERSE)[0]
-                P["GENRE_SELECTED"] = gg
-            else:
-                st.error("Pick a visible genre number."); st.stop()
-            # absurdity
-            m = {"1":"Mild","2":"Moderate","3":"Plaidemonium™","4":"Wild Card"}
-            if a.strip() in m:
-                sel = m[a.strip()]
-                if sel == "Wild Card":
-                    sel = random.choice(["Mild","Moderate","Plaidemonium™"])
-                P["ABSURDITY_SELECTED"] = sel
-            else:
-                st.error("Pick 1-4 for absurdity."); st.stop()
-            st.session_state.GLOBAL["CURRENT_STEP"] = 4
-            st.rerun()
-
-    elif step == 4:
+            return s.strip(), styles, g.strip(), genres, a.strip()
+
+    def pic_config_check(picked):
+        s, styles, g, genres, a = picked
+        if not styles.pick(s):
+            return "Pick a valid style."
+        if not genres.pick(g):
+            return "Pick a visible genre number."
+        if a not in ABSURDITY_CHOICES:
+            return "Pick 1-4 for absurdity."
+
+    def pic_config_apply(picked):
+        s, styles, g, genres, a = picked
+        gg = genres.pick(g)
+        if gg == "Reshuffle":
+            reshuffle(MENUS, "genre")  # new genres; the style menu and the answers typed so far stay
+            return 3
+        # style
+        sel = styles.pick(s)
+        P.STYLE_SELECTED = rng.choice(styles.names()) if sel == "Wild Card" else sel
+        # genre
+        if gg == "Wild Card":
+            gg = rng.choice(ALL_GENRES)[0]
+        P.GENRE_SELECTED = gg
+        # absurdity
+        sel = ABSURDITY_CHOICES[a]
+        if sel == "Wild Card":
+            sel = rng.choice(WILD_ABSURDITY)
+        P.ABSURDITY_SELECTED = sel
+        return 4
+
+    def pic_story():
         st.subheader("STEP 4: STORY + VISUAL PROMPT")
+        seed, story_rng = request_rng(st.session_state)
         seeds = {
-            "name": random.choice(["Rowan","Miri","Ash"]),
-            "profession": random.choice(["watcher","barista","busker","detective"]),
-            "place": P["IMAGE_ANALYSIS"].get("env") or "Rainmarket",
-            "adjective": P["IMAGE_ANALYSIS"].get("mood","restless"),
-            "object": P["IMAGE_ANALYSIS"].get("focal","lantern"),
-            "name2": random.choice(["Riley","Vee","Nico"]),
-            "object2": random.choice(["ticket","map","umbrella"]),
+            "name": story_rng.choice(["Rowan","Miri","Ash"]),
+            "profession": story_rng.choice(["watcher","barista","busker","detective"]),
+            "place": P.IMAGE_ANALYSIS.get("env") or "Rainmarket",
+            "adjective": P.IMAGE_ANALYSIS.get("mood","restless"),
+            "object": P.IMAGE_ANALYSIS.get("focal","lantern"),
+            "name2": story_rng.choice(["Riley","Vee","Nico"]),
+            "object2": story_rng.choice(["ticket","map","umbrella"]),
             "place2": "East Gate",
             "portal": "ripple",
             "tool": "courage",
             "trait": "grace",
         }
-        story = assemble_story(P["STYLE_SELECTED"], P["GENRE_SELECTED"], P["ABSURDITY_SELECTED"], P["QUIP_SELECTED"], seeds)
+        story = compose_story(P.STYLE_SELECTED, P.GENRE_SELECTED, P.ABSURDITY_SELECTED, P.QUIP_SELECTED, seeds, story_rng)
+        keep_story(story, seed, f"{P.STYLE_SELECTED} {P.GENRE_SELECTED}", current=False)
         st.markdown(story)
         st.markdown(f"Right, the picture’s worth a thousand plaiditudes. (Narrator: {get_active_quip('PlaidPic')})")
 
         # Visual prompt spec
         fmt = "3-Panel Comic"
-        style_name = P["STYLE_SELECTED"]
-        desc = P["TEXT_DESC"] or (P["IMAGE_ANALYSIS"].get("caption","A moment in plaid") + f", mood {P['IMAGE_ANALYSIS'].get('mood','restless')}, focal {P['IMAGE_ANALYSIS'].get('focal','object')}")
+        style_name = P.STYLE_SELECTED
+        desc = P.TEXT_DESC or (P.IMAGE_ANALYSIS.get("caption","A moment in plaid") + f", mood {P.IMAGE_ANALYSIS.get('mood','restless')}, focal {P.IMAGE_ANALYSIS.get('focal','object')}")
         tags = ["Cinematic Lighting","Showcase Plaid Clothing"]
-        vp = generate_visual_prompt(fmt, style_name, desc, tags)
+        vp = generate_visual_prompt(fmt, style_name, desc, tags, story_rng)
+        keep_story(vp, seed, f"{fmt} visual prompt", kind="visual_prompt", current=False)
         st.code(vp, language="text")
-        st.session_state.GLOBAL["CURRENT_STEP"] = 5
+        show_seed(seed)
+        return vp  # shown once; Remix renders below it
 
-    elif step == 5:
+    def pic_remix():
         st.subheader("STEP 5: REMIX / RESTART")
         st.code("1) New Style\n2) Max Absurd\n3) New Input\n4) Restart PlaidPic", language="text")
         v = st.text_input("Pick 1-4", key="pp_remix")
         if st.button("Apply Remix"):
-            if v.strip() == "1":
-                st.markdown("**Remix:** Retelling in different style.")
-                st.markdown(assemble_story(random.choice(["Ballads","Flash Fiction","Scriptlets","Breaking News"]),
-                                           P["GENRE_SELECTED"], P["ABSURDITY_SELECTED"], P["QUIP_SELECTED"], {
-                                               "name":"Remy","profession":"wanderer","place":"Plaidshire","adjective":"zany",
-                                               "object":"teacup","name2":"Quinn","object2":"ticket","place2":"Clocktower",
-                                               "portal":"mirror","tool":"pluck","trait":"wit"
-                                           }))
-            elif v.strip() == "2":
-                st.markdown("**Remix:** Maximum Plaidemonium™ engaged.")
-                st.markdown(assemble_story(P["STYLE_SELECTED"], P["GENRE_SELECTED"], "Plaidemonium™", P["QUIP_SELECTED"], {
-                    "name":"Zee","profession":"chaos technician","place":"Tartanverse","adjective":"unruly","object":"plaid coil",
-                    "name2":"Kestrel","object2":"map","place2":"Sun Stairs","portal":"ripple","tool":"audacity","trait":"grit"
-                }))
-            elif v.strip() == "3":
-                st.session_state.GLOBAL["CURRENT_STEP"] = 1
-                st.rerun()
-            elif v.strip() == "4":
-                reset_mode("PlaidPic")
-                st.rerun()
-            else:
-                st.error("Pick 1-4.")
+            return v.strip()
+
+    def pic_remix_apply(v):
+        seed, story_rng = request_rng(st.session_state)
+        if v == "1":
+            st.markdown("**Remix:** Retelling in different style.")
+            style = story_rng.choice(REMIX_STYLES)
+            story = compose_story(style, P.GENRE_SELECTED, P.ABSURDITY_SELECTED, P.QUIP_SELECTED, REMIX_SEEDS, story_rng,
+                                  remix=True)
+            keep_story(story, seed, f"{style} {P.GENRE_SELECTED} (remix 1)", current=False)
+            st.markdown(story)
+            show_seed(seed)
+        elif v == "2":
+            st.markdown("**Remix:** Maximum Plaidemonium™ engaged.")
+            story = compose_story(P.STYLE_SELECTED, P.GENRE_SELECTED, "Plaidemonium™", P.QUIP_SELECTED,
+                                  PLAIDEMONIUM_SEEDS, story_rng, remix=True)
+            keep_story(story, seed, f"{P.STYLE_SELECTED} {P.GENRE_SELECTED} (remix 2)", current=False)
+            st.markdown(story)
+            show_seed(seed)
+        elif v == "3":
+            return 1
+        elif v == "4":
+            reset_mode("PlaidPic")
+            return 1
+
+    show_flow({
+        1: Step(pic_input, pic_input_apply),
+        2: Step(pic_labels, pic_labels_apply),
+        3: Step(pic_config, pic_config_apply, pic_config_check),
+        4: Step(pic_story, lambda vp: 5, keep=True, completes=True),
+        5: Step(pic_remix, pic_remix_apply, lambda v: None if v in {"1","2","3","4"} else "Pick 1-4."),
+    })
 
 # 5) PLAIDMAGGEN
 elif mode == "PlaidMagGen":
-    M = st.session_state.PLAIDMAG
+    M = workflow(st.session_state, "PlaidMagGen")
     active_quip = get_active_quip("PlaidMagGen")
-    if step == 1:
+
+    def mag_format():
         st.subheader("STEP 1: CHOOSE FORMAT")
-        formats = ["Poster","3-Panel Comic","Magazine Cover","Storyboard (3 frames)","Trading Card"]
-        st.code("\n".join([f"{i+1}. {f}" for i,f in enumerate(formats)]) + "\n6. Wild Card", language="text")
+        st.code("\n".join([f"{i+1}. {f}" for i,f in enumerate(VISUAL_FORMATS)]) + "\n6. Wild Card", language="text")
         v = st.text_input("Pick 1-6", key="pm_format")
         if st.button("Set Format"):
-            if v.strip() == "6":
-                M["FORMAT_SELECTED"] = random.choice(formats)
-            elif v.strip() in {"1","2","3","4","5"}:
-                M["FORMAT_SELECTED"] = formats[int(v.strip())-1]
-            else:
-                st.error("Pick 1-6."); st.stop()
-            st.session_state.GLOBAL["CURRENT_STEP"] = 2
-            st.rerun()
+            return v.strip()
 
-    elif step == 2:
+    def mag_format_apply(v):
+        formats = VISUAL_FORMATS
+        if v == "6":
+            M.FORMAT_SELECTED = rng.choice(formats)
+        else:
+            M.FORMAT_SELECTED = formats[int(v)-1]
+        return 2
+
+    def mag_style():
         st.subheader("STEP 2: CHOOSE STYLE")
-        styles = pick_random_styles()
-        st.code("\n".join([f"{i+1}. {n} - {d}" for i,(n,d) in enumerate(styles)]) + "\n6. Wild Card", language="text")
+        menu = menu_for(MENUS, "style", lambda: draw_styles(rng, extras=(("Wild Card", ""),)))
+        st.code(menu.text, language="text")
         v = st.text_input("Pick 1-6", key="pm_style")
         if st.button("Set Style"):
-            if v.strip() == "6":
-                M["STYLE_SELECTED"] = random.choice([s[0] for s in styles])
-            elif v.strip() in {"1","2","3","4","5"}:
-                M["STYLE_SELECTED"] = styles[int(v.strip())-1][0]
-            else:
-                st.error("Pick 1-6."); st.stop()
-            st.session_state.GLOBAL["CURRENT_STEP"] = 3
-            st.rerun()
+            return v.strip(), menu
 
-    elif step == 3:
+    def mag_style_apply(picked):
+        v, menu = picked
+        sel = menu.pick(v)
+        M.STYLE_SELECTED = rng.choice(menu.names()) if sel == "Wild Card" else sel
+        return 3
+
+    def mag_description():
         st.subheader("STEP 3: CORE DESCRIPTION")
         prompt = st.text_area("Describe the scene/subject you'd like to visualize:", key="pm_desc", height=140)
         if st.button("Save Description"):
-            if prompt.strip():
-                M["PROMPT_COLLECTED"] = prompt.strip()
-                st.session_state.GLOBAL["CURRENT_STEP"] = 4
-                st.rerun()
-            else:
-                st.error("Please enter a description.")
+            return prompt.strip()
+
+    def mag_description_apply(prompt):
+        M.PROMPT_COLLECTED = prompt
+        return 4
 
-    elif step == 4:
+    def mag_tags():
         st.subheader("STEP 4: ENHANCEMENT TAGS")
         tags = st.multiselect("Optional tags", IMAGE_TAGS, default=["Cinematic Lighting"])
         if st.button("Generate Visual Spec"):
-            M["ENHANCEMENT_TAGS"] = tags
-            spec = generate_visual_prompt(M["FORMAT_SELECTED"], M["STYLE_SELECTED"], M["PROMPT_COLLECTED"], tags)
-            st.code(spec, language="text")
-            st.session_state.GLOBAL["CURRENT_STEP"] = 5
-
-    elif step == 5:
+            return tags
+
+    def mag_generate(tags):
+        M.ENHANCEMENT_TAGS = tags
+        seed, spec_rng = request_rng(st.session_state)
+        spec = generate_visual_prompt(M.FORMAT_SELECTED, M.STYLE_SELECTED, M.PROMPT_COLLECTED, tags, spec_rng)
+        keep_story(spec, seed, f"{M.FORMAT_SELECTED} {M.STYLE_SELECTED}", kind="visual_prompt", current=False)
+        st.code(spec, language="text")
+        show_seed(seed)
+        return 5
+
+    def mag_remix():
         st.subheader("STEP 5: REMIX / RESTART")
         st.code("1) Randomize Tags\n2) New Style\n3) Start Over", language="text")
         v = st.text_input("Pick 1-3", key="pm_remix")
         if st.button("Apply"):
-            if v.strip() == "1":
-                tags = random.sample(IMAGE_TAGS, k=min(3, len(IMAGE_TAGS)))
-                st.code(generate_visual_prompt(M["FORMAT_SELECTED"], M["STYLE_SELECTED"], M["PROMPT_COLLECTED"], tags), language="text")
-            elif v.strip() == "2":
-                new_style = random.choice(["Ballads","Magic Realism","Scriptlets","Flash Fiction","Breaking News"])
-                st.code(generate_visual_prompt(M["FORMAT_SELECTED"], new_style, M["PROMPT_COLLECTED"], M["ENHANCEMENT_TAGS"]), language="text")
-            elif v.strip() == "3":
-                reset_mode("PlaidMagGen")
-                st.rerun()
-            else:
-                st.error("Pick 1-3.")
+            return v.strip()
+
+    def mag_remix_apply(v):
+        seed, spec_rng = request_rng(st.session_state)
+        if v == "1":
+            tags = spec_rng.sample(IMAGE_TAGS, k=min(3, len(IMAGE_TAGS)))
+            spec = generate_visual_prompt(M.FORMAT_SELECTED, M.STYLE_SELECTED, M.PROMPT_COLLECTED, tags, spec_rng)
+            keep_story(spec, seed, f"{M.FORMAT_SELECTED} {M.STYLE_SELECTED} (remix 1)", kind="visual_prompt", current=False)
+            st.code(spec, language="text")
+            show_seed(seed)
+        elif v == "2":
+            new_style = spec_rng.choice(["Ballads","Magic Realism","Scriptlets","Flash Fiction","Breaking News"])
+            spec = generate_visual_prompt(M.FORMAT_SELECTED, new_style, M.PROMPT_COLLECTED, M.ENHANCEMENT_TAGS, spec_rng)
+            keep_story(spec, seed, f"{M.FORMAT_SELECTED} {new_style} (remix 2)", kind="visual_prompt", current=False)
+            st.code(spec, language="text")
+            show_seed(seed)
+        elif v == "3":
+            reset_mode("PlaidMagGen")
+            return 1
+
+    show_flow({
+        1: Step(mag_format, mag_format_apply, lambda v: None if v in {"1","2","3","4","5","6"} else "Pick 1-6."),
+        2: Step(mag_style, mag_style_apply, lambda p: None if p[1].pick(p[0]) else "Pick 1-6."),
+        3: Step(mag_description, mag_description_apply,
+                lambda prompt: None if prompt else "Please enter a description."),
+        4: Step(mag_tags, mag_generate, keep=True),  # the spec stays above the remix menu
+        5: Step(mag_remix, mag_remix_apply, lambda v: None if v in {"1","2","3"} else "Pick 1-3.", completes=True),
+    })
 
 # 6) PLAIDPLAY
 elif mode == "PlaidPlay":
-    PLY = st.session_state.PLAIDPLAY
+    PLY = workflow(st.session_state, "PlaidPlay")
     active_quip = get_active_quip("PlaidPlay")
-    if step == 1:
+    LOBBY_MAX = 1_000_000
+    LOBBY_SHOWN = 20  # submissions listed (and half as many leaderboard rows) in a large lobby
+    LOBBY_REFRESH = 1.0  # seconds between live leaderboard updates
+
+    def play_setup():
         st.subheader("STEP 1: SET PLAYERS & PROMPT")
         emails = st.text_input("Player emails (comma-separated, optional)", key="pp_emails")
-        n_players = st.number_input("Number of players (2-8)", min_value=2, max_value=8, value=4, step=1, key="pp_n")
+        online = st.checkbox("Play online (multiplayer hub)", key="pp_online")
+        hub = None
+        if online:
+            st.caption("Run `python -m plaidlibs.hub` first. Other players join from their own tab with the "
+                       "round code; with player emails set, only those names may join.")
+            hub = (st.text_input("Hub URL", value="ws://127.0.0.1:8765", key="pp_hub_url"),
+                   st.text_input("Round code (leave blank to host a new round)", key="pp_code"),
+                   st.text_input("Your player name", key="pp_player", placeholder="e.g. your email"))
+        large = not online and st.checkbox("Large lobby (classrooms, stream events)", key="pp_large")
+        if large:
+            n_players = st.number_input(f"Number of players (9-{LOBBY_MAX:,})", min_value=9, max_value=LOBBY_MAX,
+                                        value=1000, step=100, key="pp_n_large")
+        else:
+            n_players = st.number_input("Number of players (2-8)", min_value=2, max_value=8, value=4, step=1, key="pp_n")
         prompt = st.text_area("Master prompt / theme", key="pp_master", height=120, placeholder="e.g., 'A heist involving plaid luggage at a moonlit train station'")
         if st.button("Start Round"):
-            PLY["PLAYER_EMAILS"] = [e.strip() for e in emails.split(",") if e.strip()]
-            PLY["N_PLAYERS"] = int(n_players)
-            PLY["MASTER_PROMPT"] = prompt.strip() or "Plaid heist at dawn"
-            st.session_state.GLOBAL["CURRENT_STEP"] = 2
-            st.rerun()
-
-    elif step == 2:
+            return emails, n_players, prompt, large, hub
+
+    def play_setup_apply(picked):
+        emails, n_players, prompt, large, hub = picked
+        PLY.PLAYER_EMAILS = [e.strip() for e in emails.split(",") if e.strip()]
+        PLY.N_PLAYERS = int(n_players)
+        PLY.LARGE_LOBBY = bool(large)
+        PLY.MASTER_PROMPT = prompt.strip() or "Plaid heist at dawn"
+        PLY.ROUND_SEED = rng.getrandbits(32)
+        PLY.ONLINE = hub is not None
+        if PLY.ONLINE:
+            from plaidlibs.hub import HubClient  # websockets; only online rounds pay for it
+            url, code, player = (v.strip() for v in hub)
+            player = player or (PLY.PLAYER_EMAILS[0] if PLY.PLAYER_EMAILS else "Host")
+            try:
+                with HubClient(url) as client:
+                    round_id = code.upper() or client.open(player, PLY.MASTER_PROMPT, PLY.N_PLAYERS, PLY.PLAYER_EMAILS)
+                    client.act("join", round_id, player)
+            except (OSError, ValueError) as e:
+                st.error(f"Could not {'join' if code else 'open'} the round: {e}")
+                return None
+            PLY.HUB_URL, PLY.ROUND_ID, PLY.PLAYER, PLY.EVENTS = url, round_id, player, ()
+        return 2
+
+    # Online rounds: the hub holds the round as an event log; each run (and each
+    # LOBBY_REFRESH tick of the live boards) fetches the events this session has
+    # not seen yet and replays the log into a Round.
+    def hub_round():
+        from plaidlibs.hub import HubClient
+        from plaidlibs.rounds import Round
+        try:
+            with HubClient(PLY.HUB_URL, timeout=2.0) as client:
+                PLY.EVENTS = tuple(PLY.EVENTS) + tuple(client.follow(PLY.ROUND_ID, since=len(PLY.EVENTS)))
+        except (OSError, ValueError) as e:
+            st.warning(f"Hub unavailable ({e}); showing the round as last seen.")
+        r = Round.replay(PLY.ROUND_ID, PLY.EVENTS)
+        PLY.MASTER_PROMPT = r.prompt or PLY.MASTER_PROMPT
+        return r
+
+    def hub_act(op, data=None):
+        from plaidlibs.hub import HubClient
+        try:
+            with HubClient(PLY.HUB_URL) as client:
+                return client.act(op, PLY.ROUND_ID, PLY.PLAYER, data)
+        except (OSError, ValueError) as e:
+            st.error(f"The hub refused that: {e}")
+            return None
+
+    def entry_line(s):
+        return f"nouns: {', '.join(s['nouns'])}; adjs: {', '.join(s['adjs'])}; wildcard: _{s['wild']}_"
+
+    def hub_entry():
+        from plaidlibs.hub import random_entry
+        st.subheader(f"STEP 2: ROUND {PLY.ROUND_ID} — SUBMISSIONS")
+        st.caption(f"Round code **{PLY.ROUND_ID}** at {PLY.HUB_URL} · you are **{PLY.PLAYER}**")
+
+        @st.fragment(run_every=LOBBY_REFRESH)
+        def lobby_board():
+            r = hub_round()
+            st.markdown(f"_{r.prompt}_ · {len(r.players)}/{r.max_players} players · {len(r.submissions)} entries")
+            for p in r.players:
+                st.markdown(f"- **{p}** — " + (entry_line(r.submissions[p]) if p in r.submissions else "_writing…_"))
+
+        lobby_board()
+        entry = random_entry(random.Random(f"{PLY.ROUND_SEED}:{PLY.PLAYER}"))
+        st.markdown(f"Your entry — {entry_line(entry)}")
+        if st.button("Submit Entry"):
+            return entry
+
+    def hub_entry_apply(entry):
+        return 3 if hub_act("submit", entry) is not None else None
+
+    def hub_vote():
+        st.subheader(f"STEP 3: ROUND {PLY.ROUND_ID} — VOTING & RESULTS")
+        r = hub_round()
+        if r.closed:
+            results = r.results()
+            PLY.SUBMISSIONS = [dict(player=p, **e) for p, e in r.submissions.items()]
+            PLY.VOTE_TALLY = dict(results)
+            st.markdown("### Vote Tally")
+            for name, points in results:
+                st.markdown(f"- **{name}**: {points} points")
+            st.success(f"🏆 Winner: {results[0][0] if results else 'No one'}")
+            if st.button("Show Encore Snippets"):
+                return ("encore",)
+            return
+
+        @st.fragment(run_every=LOBBY_REFRESH)
+        def ballot_board():
+            live = hub_round()
+            if live.closed:
+                rerun()  # the host closed the round: redraw the step with the results
+            st.markdown(f"{len(live.ballots)}/{len(live.players)} ballots in")
+            for p, e in live.submissions.items():
+                st.markdown(f"- **{p}** — {entry_line(e)}")
+
+        ballot_board()
+        others = [p for p in r.submissions if p != PLY.PLAYER]
+        if PLY.PLAYER not in r.ballots and others:
+            first = st.selectbox("Your favourite entry", others, key="pp_vote_first")
+            second = st.selectbox("Runner-up", ["(none)"] + [p for p in others if p != first], key="pp_vote_second")
+            if st.button("Cast Vote"):
+                return ("vote", {"first": first, "second": None if second == "(none)" else second})
+        elif PLY.PLAYER in r.ballots:
+            st.caption("Vote cast. Waiting for the others" + (" — close the round when ready." if r.host == PLY.PLAYER else "…"))
+        if r.host == PLY.PLAYER and st.button("Close Round"):
+            return ("close", None)
+
+    def hub_vote_apply(choice):
+        if choice[0] == "encore":
+            return 4
+        return 3 if hub_act(*choice) is not None else None  # 3 again: redraw with the new event
+
+    def when_online(offline, online):
+        # step 1 picks the mode and the next step renders in that same run, so decide per call
+        return lambda *args: (online if PLY.ONLINE else offline)(*args)
+
+    def play_submissions():
         st.subheader("STEP 2: FAUX SUBMISSIONS")
-        subs = simulate_submissions(PLY["MASTER_PROMPT"], PLY["N_PLAYERS"])
-        PLY["SUBMISSIONS"] = subs
-        PLY["SUBMISSIONS_RECEIVED"] = len(subs)
+        # Seeded per round, so reruns of this step show the same submissions
+        if PLY.LARGE_LOBBY:
+            from plaidlibs.lobby import lobby_rng, simulate_lobby  # NumPy; only large lobbies pay for it
+            lobby = simulate_lobby(PLY.N_PLAYERS, lobby_rng(PLY.ROUND_SEED))
+            subs = lobby.submissions(0, LOBBY_SHOWN)  # only what is shown is kept in the session
+            PLY.SUBMISSIONS_RECEIVED = lobby.n
+        else:
+            subs = simulate_submissions(PLY.MASTER_PROMPT, PLY.N_PLAYERS, random.Random(PLY.ROUND_SEED))
+            PLY.SUBMISSIONS_RECEIVED = len(subs)
+        PLY.SUBMISSIONS = subs
         for s in subs:
             st.markdown(f"**{s['player']}** — nouns: {', '.join(s['nouns'])}; adjs: {', '.join(s['adjs'])}; wildcard: _{s['wild']}_")
+        if PLY.SUBMISSIONS_RECEIVED > len(subs):
+            st.caption(f"…and {PLY.SUBMISSIONS_RECEIVED - len(subs):,} more submissions.")
         if st.button("Run Voting Simulation"):
-            st.session_state.GLOBAL["CURRENT_STEP"] = 3
-            st.rerun()
+            return True
+
+    def play_votes_apply(go):
+        # Votes are drawn once, as voting opens; step 3 reruns only read the tally
+        if PLY.LARGE_LOBBY:
+            from plaidlibs.lobby import lobby_rng, lobby_rounds  # NumPy; only large lobbies pay for it
+            PLY.VOTE_RNG = lobby_rng(PLY.ROUND_SEED, 1)
+            PLY.VOTE_ROUNDS = lobby_rounds(PLY.VOTE_RNG)
+            PLY.TALLY = LiveTally(PLY.N_PLAYERS, k=LOBBY_SHOWN // 2)
+            PLY.VOTES_OPENED = time.monotonic()
+        else:
+            PLY.TALLY = LiveTally(PLY.N_PLAYERS, k=PLY.N_PLAYERS)
+            PLY.TALLY.add_ballots(simulate_ballots(PLY.N_PLAYERS, random.Random(f"{PLY.ROUND_SEED}:votes")))
+        return 3
 
-    elif step == 3:
+    def play_results():
         st.subheader("STEP 3: VOTING & RESULTS")
-        tally = tally_votes(PLY["SUBMISSIONS"])
-        PLY["VOTE_TALLY"] = tally
-        winner = max(tally.items(), key=lambda kv: kv[1])[0] if tally else "No one"
-        st.markdown("### Vote Tally")
-        for k,v in tally.items():
-            st.markdown(f"- **{k}**: {v} points")
-        st.success(f"🏆 Winner: {winner}")
+        tally = PLY.TALLY
+        counting = PLY.LARGE_LOBBY and tally.ballots < PLY.VOTE_ROUNDS * len(tally)
+
+        # A large lobby's voting rounds come in live, one per LOBBY_REFRESH seconds;
+        # each refresh adds the rounds that are due and redraws the top k only.
+        @st.fragment(run_every=LOBBY_REFRESH if counting else None)
+        def vote_board():
+            if PLY.LARGE_LOBBY:
+                from plaidlibs.lobby import lobby_round
+                due = min(PLY.VOTE_ROUNDS, 1 + int((time.monotonic() - PLY.VOTES_OPENED) / LOBBY_REFRESH))
+                while tally.ballots < due * len(tally):
+                    tally.add_counts(lobby_round(len(tally), PLY.VOTE_RNG), ballots=len(tally))
+                if counting and due == PLY.VOTE_ROUNDS:
+                    rerun()  # last round is in: redraw the step without the refresh timer
+                st.markdown(f"### Leaderboard (top {tally.k} of {len(tally):,})")
+                st.caption(f"Voting round {due} of {PLY.VOTE_ROUNDS} · {tally.ballots:,} ballots counted")
+            else:
+                st.markdown("### Vote Tally")
+            for name, points in tally.snapshot():
+                st.markdown(f"- **{name}**: {points} points")
+
+        vote_board()
+        if counting:
+            st.info("Votes are still coming in…")
+        else:
+            PLY.VOTE_TALLY = dict(tally.snapshot())
+            st.success(f"🏆 Winner: {tally.leader() or 'No one'}")
+            show_seed(PLY.ROUND_SEED)
         if st.button("Show Encore Snippets"):
-            st.session_state.GLOBAL["CURRENT_STEP"] = 4
-            st.rerun()
+            return True
 
-    elif step == 4:
+    def play_encore():
         st.subheader("STEP 4: ENCORE SNIPPETS (SCRIPTLETS)")
-        for s in PLY["SUBMISSIONS"]:
+        for s in PLY.SUBMISSIONS[:8]:
             snippet = f"[{s['player']}] ({', '.join(s['adjs'])}) — 'We trade the {s['nouns'][0]} for a {s['nouns'][1]}; if the {s['nouns'][2]} sings, we run.'"
             st.write(snippet)
         st.markdown(f"_{active_quip} aside:_ Democracy by giggle. I approve.")
         st.code("1) New Round\n2) Restart PlaidPlay", language="text")
         v = st.text_input("Pick 1-2", key="ply_remix")
         if st.button("Apply"):
-            if v.strip() == "1":
-                st.session_state.GLOBAL["CURRENT_STEP"] = 1
-                st.rerun()
-            elif v.strip() == "2":
-                reset_mode("PlaidPlay")
-                st.rerun()
-            else:
-                st.error("Pick 1-2.")
-
+            return v.strip()
+
+    def play_encore_apply(v):
+        if v == "2":
+            reset_mode("PlaidPlay")
+        return 1
+
+    show_flow({
+        1: Step(play_setup, play_setup_apply),
+        2: Step(when_online(play_submissions, hub_entry), when_online(play_votes_apply, hub_entry_apply)),
+        3: Step(when_online(play_results, hub_vote), when_online(lambda go: 4, hub_vote_apply), completes=True),
+        4: Step(play_encore, play_encore_apply, lambda v: None if v in {"1","2"} else "Pick 1-2."),
+    })
 
 
 # 7) PLAIDCHAT
 elif mode == "PlaidChat":
-    PC = st.session_state.PLAIDCHAT
+    PC = workflow(st.session_state, "PlaidChat")
     active_quip = get_active_quip("PlaidChat")
     st.subheader("PlaidChat™ — Quip-fueled conversation")
-
-    from openai import OpenAI
-    client = OpenAI()
-
-    def persona_reply(quip, history):
-        """
-        Generate a persona-style reply using conversation history + narrator quip.
-        """
-        messages = [
-            {
-                "role": "system",
-                "content": f"You are {quip}, a playful narrator with a unique personality. "
-                           f"Stay in character and respond in a conversational way, like ChatGPT, "
-                           f"but flavored with the humor and quirks of {quip}. "
-                           f"Keep responses concise, engaging, and context-aware."
-            }
-        ]
-
-        # Add prior conversation
-        for m in history:
-            role = "assistant" if m["role"] == "assistant" else "user"
-            messages.append({"role": role, "content": m["content"]})
-
-        # Call OpenAI
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # can switch to "gpt-4o" for stronger replies
-            messages=messages,
-            max_tokens=300,
-            temperature=0.9
+    CHAT_POLL = 0.1  # seconds between repaints of an in-flight reply
+
+    backend = shared_backend()  # resolved once per process (PLAIDLIBS_CHAT_BACKEND)
+    persona_reply, stream_persona_reply = map(METRICS.wrap, (backend.reply, backend.stream))
+    executor = shared_executor()
+    session_id = st.session_state.GLOBAL["SESSION_ID"]
+    with st.sidebar.expander("Chat backend"):
+        st.caption(f"Backend {backend.name}" + (f" · model {backend.model}" if backend.model != backend.name else ""))
+        for line in backend.status():
+            st.caption(line)
+        turn_stats = executor.stats
+        st.caption(
+            f"Turns in flight {executor.pending()} · submitted {turn_stats['submitted']} · "
+            f"coalesced {turn_stats['coalesced']} · failed {turn_stats['failed']}"
+        )
+    cache = shared_cache()
+    with st.sidebar.expander("Response cache"):
+        cache_stats = cache.snapshot()
+        st.caption(
+            f"Entries {cache_stats['entries']} · hits {cache_stats['hits']} ({cache_stats['disk_hits']} from disk) · "
+            f"misses {cache_stats['misses']} · evictions {cache_stats['evictions']} · "
+            f"expired {cache_stats['expired']} · hit rate {cache_stats['hit_rate_pct']}%"
         )
+        if st.button("Clear response cache"):
+            cache.clear()
 
-        return response.choices[0].message.content.strip()
+    # Streaming paints tokens as they arrive instead of waiting for the whole reply
+    stream_replies = st.toggle("Stream replies", value=True, key="pc_stream")
 
     # Assign narrator name based on role
     def display_message(msg):
         if msg["role"] == "user":
             name = "You"
         else:
-            name = PC.get("QUIP_SELECTED", "Narrator")
+            name = PC.QUIP_SELECTED
         st.markdown(f"**{name}:** {msg['content']}")
 
     # Render history
-    for msg in PC["messages"]:
+    for msg in PC.messages:
         with st.chat_message(msg["role"]):
             display_message(msg)
+    if PC.FAILED:
+        st.error(f"{PC.QUIP_SELECTED} lost the thread: {PC.FAILED}")
+        PC.FAILED = None
 
     # Handle new input
     user_input = st.chat_input("Say something to your Quip guide…")
-    if user_input:
+    if user_input and PC.PENDING:
+        # Double-submit while a reply is still coming: don't fire a second upstream call
+        st.toast("Still waiting on the last reply…")
+    elif user_input:
         # User message
-        PC["messages"].append({"role": "user", "content": user_input})
+        PC.messages.append({"role": "user", "content": user_input})
         with st.chat_message("user"):
             st.markdown(f"**You:** {user_input}")
 
-        # Persona reply (always returns string now)
-        reply = persona_reply(PC["QUIP_SELECTED"], PC["messages"])
-        PC["messages"].append({"role": "assistant", "content": reply})
-        with st.chat_message("assistant"):
-            st.markdown(f"**{PC.get('QUIP_SELECTED','Narrator')}:** {reply}")
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        # Persona reply (always returns string now); only the bounded window goes upstream
+        quip = PC.QUIP_SELECTED
+        window = PC.HISTORY.window(PC.messages)
+        cache_key = persona_cache_key(quip, window, model=backend.model)
+        reply = cache.get(cache_key)
+        if reply is not None:
+            with st.chat_message("assistant"):
+                st.markdown(f"**{quip}:** {reply}")
+            PC.messages.append({"role": "assistant", "content": reply})
+        else:
+            if stream_replies:
+                make_stream = lambda: stream_persona_reply(quip, window)
+            else:
+                make_stream = lambda: [persona_reply(quip, window)]
+            turn = history_hash(PC.messages)
+            executor.submit(session_id, turn, make_stream)
+            PC.PENDING = {"turn": turn, "cache_key": cache_key}
+
+    # Poll the in-flight reply from a fragment that repaints it every CHAT_POLL
+    # seconds, so the script run itself ends at once and a Stop or new input is
+    # handled right away. A full rerun lands back here and keeps polling the same
+    # job instead of re-issuing the request; once the job is done, a full rerun
+    # shows the reply in the history and stops the polling.
+    @st.fragment(run_every=CHAT_POLL)
+    def pending_reply():
+        pending = PC.PENDING
+        job = executor.get(session_id, pending["turn"]) if pending else None
+        if job is not None and not job.done:
+            job.wait(len(job.parts), timeout=CHAT_POLL)
+            if not job.done:
+                with st.chat_message("assistant"):
+                    st.markdown(f"**{PC.QUIP_SELECTED}:** {job.text()}▌")
+                return
+        PC.PENDING = None  # done, or expired unclaimed (the user can simply resend)
+        if job is not None:
+            executor.discard(session_id, pending["turn"])
+            if job.error is not None:
+                PC.FAILED = str(job.error)
+            else:
+                reply = job.text().strip()
+                if backend.cacheable(pending["cache_key"]):
+                    cache.set(pending["cache_key"], reply)
+                PC.messages.append({"role": "assistant", "content": reply})
+        rerun()
 
+    if PC.PENDING:
+        pending_reply()
 
+history_panel(history_slot)
+RUN.finish()
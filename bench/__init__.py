@@ -0,0 +1,3 @@
+# bench/__init__.py
+# Local load/latency tools for PlaidLibs. Run from the repo root, e.g.:
+#   python -m bench.ttft
@@ -0,0 +1,70 @@
+# bench/cache.py
+# ResponseCache hit latency (memory tier and SQLite tier) and a zipf-ish opener
+# workload to show hit rate / evictions.
+#
+#   python -m bench.cache --lookups 20000
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from plaidlibs.cache import ResponseCache
+from plaidlibs.chat import persona_cache_key
+
+OPENERS = ["hi", "Hi!", "hello", "tell me a story", "Tell me a story.", "who are you?", "make me laugh",
+           "write a poem about plaid", "what's up", "help"]
+QUIPS = ["MacQuip", "DJ Q'Wip", "SoQuip", "DonQuip", "ErrQuip", "McQuip"]
+
+
+def pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def run(cache: ResponseCache, lookups: int, rng: random.Random):
+    lat = []
+    for _ in range(lookups):
+        quip = rng.choice(QUIPS)
+        opener = OPENERS[min(len(OPENERS) - 1, int(rng.paretovariate(1.2)) - 1)]
+        if rng.random() < 0.2:
+            opener = f"{opener} {rng.randint(0, 10_000)}"  # long tail of unique messages
+        history = [{"role": "assistant", "content": "greeting"}, {"role": "user", "content": opener}]
+        t0 = time.perf_counter()
+        key = persona_cache_key(quip, history)
+        hit = cache.get(key)
+        lat.append((time.perf_counter() - t0) * 1000)
+        if hit is None:
+            cache.set(key, f"reply to {opener}")
+    return lat
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PlaidChat response cache")
+    ap.add_argument("--lookups", type=int, default=20000)
+    ap.add_argument("--max-entries", type=int, default=512)
+    args = ap.parse_args()
+
+    rng = random.Random(3)
+    mem = ResponseCache(max_entries=args.max_entries)
+    lat = run(mem, args.lookups, rng)
+    s = mem.snapshot()
+    print(f"memory : p50 {statistics.median(lat):.4f} ms  p99 {pct(lat, 0.99):.4f} ms  "
+          f"hit rate {s['hit_rate_pct']}%  evictions {s['evictions']}")
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "responses.sqlite3")
+        writer = ResponseCache(max_entries=args.max_entries, sqlite_path=path)
+        run(writer, args.lookups, random.Random(3))
+        # A second "worker process" with a cold memory tier reading the shared file
+        reader = ResponseCache(max_entries=args.max_entries, sqlite_path=path)
+        lat = run(reader, args.lookups, random.Random(3))
+        s = reader.snapshot()
+        print(f"sqlite : p50 {statistics.median(lat):.4f} ms  p99 {pct(lat, 0.99):.4f} ms  "
+              f"hit rate {s['hit_rate_pct']}%  disk hits {s['disk_hits']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# bench/cold_start.py
+# Import-time budget for the non-chat workflows. Each workflow is opened in a fresh
+# interpreter, i.e. the first script run of a new server process. The check fails
+# if app.py's own imports take longer than --import-budget-ms, if that first run
+# (imports included) takes longer than --budget-ms, or if it pulls in a chat-only
+# dependency (openai, httpx). PlaidChat is reported for reference but not
+# budgeted. Exit status 1 on any violation, so CI can run it.
+#
+#   python -m bench.cold_start
+#   python -m bench.cold_start --budget-ms 200 --import-budget-ms 40 --repeat 5
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from bench.rerun import APP, WORKFLOWS, WRAPPER
+
+CHAT_ONLY = ("openai", "httpx")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def app_imports() -> List[str]:
+    """
+    Modules app.py imports at the top level, Streamlit excluded.
+    """
+    with open(APP, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return [n for n in names if n.split(".")[0] != "streamlit"]
+
+
+def child(mode: str):
+    # Streamlit itself (and AppTest) is loaded before timing starts: a server
+    # pays for it once at boot, whatever the app imports.
+    from streamlit.testing.v1 import AppTest
+
+    from bench import rerun
+
+    sys.path.insert(0, ROOT)
+    names = app_imports()
+    t0 = time.perf_counter()
+    for name in names:
+        importlib.import_module(name)
+    import_ms = (time.perf_counter() - t0) * 1000
+
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(WRAPPER.format(root=ROOT, app=APP))
+    try:
+        at = AppTest.from_file(f.name, default_timeout=30).run()
+        if mode != "Lib-Ate":
+            at.sidebar.selectbox(key="workflow_select").set_value(mode).run()
+        assert not at.exception, at.exception
+    finally:
+        os.unlink(f.name)
+    print(json.dumps({
+        "import_ms": import_ms,
+        "ms": import_ms + sum(rerun.TIMES),
+        "runs": len(rerun.TIMES),
+        "chat_only": [m for m in CHAT_ONLY if m in sys.modules],
+    }))
+
+
+def measure(mode: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-m", "bench.cold_start", "--child", mode], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    best = dict(runs[-1])
+    best["import_ms"] = min(r["import_ms"] for r in runs)
+    best["ms"] = min(r["ms"] for r in runs)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold-start budget for the non-chat workflows")
+    ap.add_argument("--budget-ms", type=float, default=250.0, help="first script run, imports included")
+    ap.add_argument("--import-budget-ms", type=float, default=50.0, help="app.py's top-level imports")
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per workflow (best is kept)")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    failures = []
+    print(f"{'workflow':<18} {'imports ms':>10} {'cold ms':>9} {'runs':>5}  chat-only imports")
+    for mode in WORKFLOWS + ["PlaidChat"]:
+        r = measure(mode, args.repeat)
+        budgeted = mode != "PlaidChat"
+        flag = ""
+        if budgeted and r["import_ms"] > args.import_budget_ms:
+            flag += f"  imports over budget ({args.import_budget_ms:.0f} ms)"
+        if budgeted and r["ms"] > args.budget_ms:
+            flag += f"  over budget ({args.budget_ms:.0f} ms)"
+        if budgeted and r["chat_only"]:
+            flag += "  imports chat-only modules"
+        if flag:
+            failures.append(mode)
+        note = "" if budgeted else "  (not budgeted)"
+        print(f"{mode:<18} {r['import_ms']:>10.1f} {r['ms']:>9.1f} {r['runs']:>5}  {', '.join(r['chat_only']) or '-'}{flag}{note}")
+    if failures:
+        print(f"\nFAIL: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\nOK: imports under {args.import_budget_ms:.0f} ms, every non-chat workflow cold-starts under "
+          f"{args.budget_ms:.0f} ms without chat-only imports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# bench/export.py
+# Story export throughput and memory (plaidlibs.export): fills a StoryLog with
+# --stories generated stories, then streams it through iter_archive() as a ZIP
+# (deflated and stored) and as JSONL, and runs the headless batch path
+# (plaidlibs.batch.export_batch) on the same number of stories. Reports MB/s of
+# archive written and the peak traced memory of each export, against a 5-story
+# history (app exports) or plain batch generation of the same stories (the
+# story generators' caches fill up either way). Exits 1 if an export's peak
+# exceeds its reference by more than --flat-mb.
+#
+#   python -m bench.export
+#   python -m bench.export --stories 50000 --workers 4
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from plaidlibs.batch import export_batch, run_batch
+from plaidlibs.catalog import ALL_GENRES, STYLES
+from plaidlibs.export import StoryLog, iter_archive
+from plaidlibs.generators import assemble_story, random_story_seeds
+
+CASES = (("zip", 6), ("zip", 0), ("jsonl", 6))  # (kind, compresslevel)
+
+
+def fill(log: StoryLog, stories: int, rng: random.Random):
+    for n in range(stories):
+        style, genre = rng.choice(STYLES)[0], rng.choice(ALL_GENRES)[0]
+        text = assemble_story(style, genre, "Mild", "MacQuip", random_story_seeds(rng), rng)
+        log.append(text, rng.getrandbits(32), kind="story", workflow="Create Direct", title=f"{style} {genre}")
+
+
+def run(export: Callable[[str], None], path: str, trace: bool) -> Tuple[float, float]:
+    """
+    (seconds, peak traced MB) for one export into path.
+    """
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    export(path)
+    seconds = time.perf_counter() - t0
+    peak = 0.0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def to_file(log: StoryLog, kind: str, level: int) -> Callable[[str], None]:
+    def export(path: str):
+        with open(path, "wb") as f:
+            for chunk in iter_archive(log, kind, compresslevel=level):
+                f.write(chunk)
+    return export
+
+
+def batch_file(stories: int, kind: str, workers: int, chunk_size: int) -> Callable[[str], None]:
+    """
+    kind "raw" is run_batch's own JSONL (no renderings).
+    """
+    def export(path: str):
+        spec = {"kind": "story", "style": "Noir", "genre": "Mystery", "count": stories, "seed": 1}
+        if kind == "raw":
+            with open(path, "w", encoding="utf-8") as f:
+                run_batch([spec], f, workers=workers, chunk_size=chunk_size)
+            return
+        with open(path, "wb") as f:
+            export_batch([spec], f, kind, workers=workers, chunk_size=chunk_size)
+    return export
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Throughput and memory of the story exporter")
+    ap.add_argument("--stories", type=int, default=50_000)
+    ap.add_argument("--workers", type=int, default=1, help="batch export processes")
+    ap.add_argument("--chunk-size", type=int, default=500, help="batch outputs per worker task")
+    ap.add_argument("--flat-mb", type=float, default=4.0,
+                    help="allowed peak-memory growth from 5 stories to --stories")
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    failed = False
+    with tempfile.TemporaryDirectory() as d:
+        small, big = StoryLog(os.path.join(d, "small.jsonl")), StoryLog(os.path.join(d, "big.jsonl"))
+        fill(small, 5, rng)
+        t0 = time.perf_counter()
+        fill(big, args.stories, rng)
+        print(f"{args.stories:,} stories, {os.path.getsize(big.path) / 1e6:.1f} MB history "
+              f"(generated and logged in {time.perf_counter() - t0:.1f}s)")
+
+        out = os.path.join(d, "out")
+        cases = [(f"{kind} level {level}" if kind == "zip" else kind, to_file(small, kind, level),
+                  to_file(big, kind, level), "5 stories") for kind, level in CASES]
+        batch = [batch_file(args.stories, kind, args.workers, args.chunk_size) for kind in ("raw", "zip", "jsonl")]
+        cases += [(f"batch {kind} ({args.workers} worker)", batch[0], export, "raw batch")
+                  for kind, export in (("zip", batch[1]), ("jsonl", batch[2]))]
+        for name, reference, export, ref_name in cases:
+            _, ref_peak = run(reference, out, trace=True)
+            seconds, _ = run(export, out, trace=False)
+            size = os.path.getsize(out) / 1e6
+            _, peak = run(export, out, trace=True)
+            print(f"{name:<22} {size:6.1f} MB in {seconds:6.2f}s {size / seconds:6.1f} MB/s "
+                  f"{args.stories / seconds:7,.0f} stories/s  peak {peak:5.2f} MB ({ref_name}: {ref_peak:5.2f} MB)")
+            if peak - ref_peak > args.flat_mb:
+                print(f"FAIL: {name} peak exceeds {ref_name} by more than {args.flat_mb} MB")
+                failed = True
+    if failed:
+        sys.exit(1)
+    print(f"OK: export memory flat within {args.flat_mb} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# bench/generators.py
+# Benchmark suite for the pure generators behind the seven workflows: ops/s,
+# p50/p99 latency and peak allocation per call, for realistic and adversarial
+# inputs, checked against a JSON baseline.
+#
+#   python -m bench.generators                 # compare with bench/baselines/generators.json
+#   python -m bench.generators --save          # record a new baseline (per machine)
+#   python -m bench.generators -k concept --threshold 0.3
+#
+# Exits 1 when a case regresses beyond the threshold.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from bench.highlight import HOSTILE, SEEDS, STORY
+from plaidlibs.generators import (
+    assemble_story, generate_visual_prompt, genre_menu_block, pick_random_styles, random_story_seeds,
+    seeds_from_concept, simulate_submissions, tally_votes,
+)
+from plaidlibs.highlight import boldify_user_words
+from plaidlibs.menus import draw_genres, draw_styles, menu_for
+from plaidlibs.remix import build_story
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "generators.json")
+SAMPLE_SECONDS = 0.0005  # batch calls so one timed sample is well above timer resolution
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def _story_seeds(rng: random.Random) -> Dict[str, str]:
+    seeds = random_story_seeds(rng)
+    seeds["wild"] = "confetti rain"
+    return seeds
+
+
+def build_cases() -> List[Case]:
+    rng = random.Random(2024)
+    story_seeds = _story_seeds(rng)
+    # More distinct seed sets than the highlighter cache holds: every call is a first use
+    fresh_sets = [_story_seeds(rng) for _ in range(6000)]
+    fresh = iter(())
+    hostile_seeds = {f"k{i}": w for i, w in enumerate(HOSTILE)}
+    long_seeds = {k: (v + " ") * 100 for k, v in story_seeds.items()}  # ~1 KB per seed word
+
+    def story_fresh_seeds():
+        nonlocal fresh
+        seeds = next(fresh, None)
+        if seeds is None:
+            fresh = iter(fresh_sets)
+            seeds = next(fresh)
+        return assemble_story("Noir", "Mystery", "Moderate", "MacQuip", seeds, rng)
+
+    long_story = "\n\n".join([STORY] * 60)  # ~40 KB
+    hostile_text = " ".join(random.Random(1).choice(HOSTILE + ["plaid", "otter"]) for _ in range(400))
+    unicode_seeds = ["Äpfel", "café", "naïve", "Straße", "ſtar", "ıt", "Kelvin"]
+    unicode_text = (" ".join(unicode_seeds) + " — the ÄPFEL of CAFÉ fame. ") * 40
+
+    concept = "A retired astronomer in Glimmerfall finds a luminous violin that plays tomorrow's weather."
+    words = ["plaid", "marmalade", "quietly", "over", "the", "hill", "whispering", "clock"]
+    filler = random.Random(7)
+    big_concept = " ".join(filler.choice(words) for _ in range(1500))[:10_240]  # ~10 KB, no early hits
+    hostile_concept = ("(in)" + "[at]*" + "\\b under+ " + "O'" * 20 + " ") * 300  # ~10 KB of regex bait
+
+    subs8 = simulate_submissions("Plaid heist at dawn", 8, random.Random(1))
+    subs1k = simulate_submissions("Plaid heist at dawn", 1000, random.Random(1))
+    big_desc = "A fox in a plaid scarf at a rainy bus stop, " * 250  # ~11 KB
+    kept: Dict[str, Any] = {}  # a step's GLOBAL["MENUS"] on every rerun after the first
+
+    # Remix step: the story on screen, then a tweak (as in the app's remix handlers)
+    base = build_story("Noir", "Mystery", "Mild", "MacQuip", story_seeds, rng)
+    spiced = dict(story_seeds, trait=story_seeds["trait"] + " (dialect spice)")
+    remix_styles = ["Magic Realism", "Ballads", "Breaking News", "Flash Fiction"]
+    # Stories past the paragraph memo, remixed once each: the cold delta
+    cold_bases = [build_story("Noir", "Mystery", "Mild", "MacQuip", s) for s in fresh_sets[:3000]]
+    cold = iter(())
+
+    def remix_cold_story():
+        nonlocal cold
+        story = next(cold, None)
+        if story is None:
+            cold = iter(cold_bases)
+            story = next(cold)
+        return story.remix(rng, style=rng.choice(remix_styles))
+
+    return [
+        ("assemble_story/realistic", lambda: assemble_story("Noir", "Mystery", "Mild", "MacQuip", story_seeds, rng)),
+        ("assemble_story/plaidemonium", lambda: assemble_story("Ballads", "Cosmic Plaid", "Plaidemonium™", "ErrQuip",
+                                                               story_seeds, rng)),
+        ("assemble_story/fresh_seed_sets", story_fresh_seeds),
+        ("assemble_story/regex_metachar_seeds", lambda: assemble_story("Noir", "Mystery", "Mild", "MacQuip",
+                                                                       hostile_seeds, rng)),
+        ("assemble_story/1kb_seed_words", lambda: assemble_story("Noir", "Mystery", "Mild", "MacQuip", long_seeds, rng)),
+        ("remix/style", lambda: base.remix(rng, style=rng.choice(remix_styles))),
+        ("remix/dialect_spice", lambda: base.remix(rng, seeds=spiced)),
+        ("remix/plaidemonium", lambda: base.remix(rng, absurdity="Plaidemonium™")),
+        ("remix/cold_story_style", remix_cold_story),
+        ("boldify/story_12_seeds", lambda: boldify_user_words(STORY, SEEDS)),
+        ("boldify/40kb_text", lambda: boldify_user_words(long_story, SEEDS)),
+        ("boldify/regex_metachar_seeds", lambda: boldify_user_words(hostile_text, HOSTILE)),
+        ("boldify/unicode_seeds", lambda: boldify_user_words(unicode_text, unicode_seeds)),
+        ("genre_menu_block", lambda: genre_menu_block(rng)),
+        ("pick_random_styles", lambda: pick_random_styles(rng=rng)),
+        ("menus/draw_genres", lambda: draw_genres(rng)),
+        ("menus/draw_styles", lambda: draw_styles(rng, extras=(("Wild Card", ""), ("Reshuffle", "")))),
+        ("menus/kept_menu", lambda: menu_for(kept, "genre", lambda: draw_genres(rng)).pick("3")),
+        ("generate_visual_prompt/realistic", lambda: generate_visual_prompt("Poster", "Noir", "an otter in a parka",
+                                                                            ["Cinematic Lighting"], rng)),
+        ("generate_visual_prompt/10kb_desc", lambda: generate_visual_prompt("3-Panel Comic", "Noir", big_desc,
+                                                                            ["Focus on Emotion"] * 50, rng)),
+        ("simulate_submissions/8_players", lambda: simulate_submissions("Plaid heist", 8, rng)),
+        ("simulate_submissions/1k_players", lambda: simulate_submissions("Plaid heist", 1000, rng)),
+        ("tally_votes/8_players", lambda: tally_votes(subs8, rng)),
+        ("tally_votes/1k_players", lambda: tally_votes(subs1k, rng)),
+        ("seeds_from_concept/realistic", lambda: seeds_from_concept(concept, rng)),
+        ("seeds_from_concept/10kb_concept", lambda: seeds_from_concept(big_concept, rng)),
+        ("seeds_from_concept/10kb_regex_bait", lambda: seeds_from_concept(hostile_concept, rng)),
+    ]
+
+
+def measure(fn: Callable[[], Any], seconds: float) -> Dict[str, float]:
+    fn()  # warm caches (compiled plans, highlighters) the way a live process would
+    t0 = time.perf_counter()
+    fn()
+    one = max(time.perf_counter() - t0, 1e-7)
+    inner = max(1, int(SAMPLE_SECONDS / one))
+
+    samples: List[float] = []
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds or len(samples) < 20:
+        t0 = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        samples.append((time.perf_counter() - t0) / inner)
+        calls += inner
+    total = sum(s * inner for s in samples)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "ops_per_sec": round(calls / total, 1),
+        "p50_us": round(statistics.median(samples) * 1e6, 3),
+        "p99_us": round(samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1e6, 3),
+        "alloc_peak_kib": round(max(0, peak - before) / 1024, 2),
+    }
+
+
+def regressions(name: str, new: Dict[str, float], old: Dict[str, float], threshold: float,
+                p99_threshold: float) -> List[str]:
+    found = []
+    if new["ops_per_sec"] < old["ops_per_sec"] * (1 - threshold):
+        found.append(f"ops/s {old['ops_per_sec']:.0f} -> {new['ops_per_sec']:.0f}")
+    if new["p99_us"] > old["p99_us"] * (1 + p99_threshold):
+        found.append(f"p99 {old['p99_us']:.1f} -> {new['p99_us']:.1f} µs")
+    # Small absolute slack so a handful of bytes from interpreter noise can't fail a run
+    if new["alloc_peak_kib"] > old["alloc_peak_kib"] * (1 + threshold) + 1:
+        found.append(f"alloc {old['alloc_peak_kib']:.1f} -> {new['alloc_peak_kib']:.1f} KiB")
+    return [f"{name}: {r}" for r in found]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generator benchmark suite")
+    ap.add_argument("-k", "--filter", default="", help="only cases whose name contains this")
+    ap.add_argument("--seconds", type=float, default=0.5, help="timed budget per case")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed ops/s and allocation regression")
+    ap.add_argument("--p99-threshold", type=float, default=0.75, help="allowed p99 regression (noisier)")
+    args = ap.parse_args()
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    old_cases = baseline.get("cases", {})
+
+    results: Dict[str, Dict[str, float]] = {}
+    failures: List[str] = []
+    print(f"{'case':<40} {'ops/s':>12} {'p50 µs':>10} {'p99 µs':>10} {'alloc KiB':>10}  vs baseline")
+    for name, fn in build_cases():
+        if args.filter not in name:
+            continue
+        r = results[name] = measure(fn, args.seconds)
+        old = old_cases.get(name)
+        delta = f"{r['ops_per_sec'] / old['ops_per_sec'] - 1:+7.1%}" if old else "    new"
+        print(f"{name:<40} {r['ops_per_sec']:>12,.0f} {r['p50_us']:>10.2f} {r['p99_us']:>10.2f} "
+              f"{r['alloc_peak_kib']:>10.1f}  {delta}")
+        if old and not args.save:
+            failures += regressions(name, r, old, args.threshold, args.p99_threshold)
+
+    if args.save:
+        merged = dict(old_cases) if args.filter else {}
+        merged.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "processor": platform.machine()},
+                "cases": dict(sorted(merged.items())),
+            }, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if not old_cases:
+        print(f"no baseline at {args.baseline}; run with --save to record one")
+    elif baseline.get("machine", {}).get("python") != platform.python_version():
+        print(f"note: baseline recorded on Python {baseline['machine'].get('python')}, "
+              f"this is {platform.python_version()}")
+    if failures:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench/highlight.py
+# Microbenchmark: the old per-word re.sub loop vs. the compiled single-pass
+# highlighter, on a normal story, a long text and regex-hostile seeds.
+#
+#   python -m bench.highlight
+
+import argparse
+import random
+import re
+import timeit
+from typing import List
+
+from plaidlibs.highlight import boldify_user_words
+
+
+def legacy_boldify_user_words(text: str, words: List[str]) -> str:
+    # Verbatim copy of the pre-compiled implementation, kept for comparison.
+    out = text
+    for w in sorted(set(words), key=lambda x: -len(x)):
+        if not w:
+            continue
+        out = re.sub(rf"\b{re.escape(w)}\b", f"**{w}**", out, flags=re.IGNORECASE)
+    return out
+
+
+SEEDS = ["Rowan", "astronomer", "Glimmerfall", "luminous", "lantern", "Riley", "map", "East Gate",
+         "ripple", "courage", "grace", "confetti rain"]
+STORY = (
+    "As your tartan-tongued narrator, I’ll spin a Noir Mystery so tight it squeaks.\n\n"
+    "In the town of Glimmerfall, under a luminous sky, a astronomer named Rowan discovered a lantern "
+    "that hummed like an argument about destiny. The logic behaved, mostly.\n\n"
+    "Rumors spread like marmalade—sticky, bright, and impossible to ignore. Riley whispered of a map "
+    "folded into the dawn, while the old clock in East Gate kept time in polite disagreements.\n\n"
+    "At last, our astronomer chose: step through the ripple or stitch the day back together with "
+    "courage and grace. They breathed. The page turned itself politely.\n\n"
+    "There—we’ve tied the bow, probably around a hedgehog. Stylish, if prickly."
+)
+HOSTILE = ["a.b", "(x)", "c++", "[z]", "*star*", "q?", "^caret", "dollar$", "a|b", "{1,2}", "back\\slash", "dot."]
+
+
+def case(name: str, text: str, words: List[str], number: int):
+    t_old = min(timeit.repeat(lambda: legacy_boldify_user_words(text, words), number=number, repeat=3))
+    t_new = min(timeit.repeat(lambda: boldify_user_words(text, words), number=number, repeat=3))
+    print(f"{name:<28} old {t_old / number * 1e6:10.1f} µs  new {t_new / number * 1e6:10.1f} µs  "
+          f"x{t_old / t_new:5.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="boldify_user_words microbenchmark")
+    ap.add_argument("--number", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    long_text = "\n\n".join([STORY] * 60)  # ~40 KB
+    many = sorted({w for w in re.findall(r"[A-Za-z]+", STORY)}, key=len)[-40:]
+
+    case("story, 12 seeds", STORY, SEEDS, args.number)
+    case("40 KB text, 12 seeds", long_text, SEEDS, max(1, args.number // 100))
+    case("story, 40 seeds", STORY, many, args.number)
+    hostile = [w for w in HOSTILE if "\\" not in w]  # the old version raises on backslashes
+    hostile_text = " ".join(rng.choice(hostile + ["plaid", "otter"]) for _ in range(400))
+    case("regex metachar seeds", hostile_text, hostile, args.number // 10)
+    t_old = timeit.timeit(lambda: [legacy_boldify_user_words(STORY, SEEDS[:i % 12 + 1]) for i in range(1000)], number=1)
+    t_new = timeit.timeit(lambda: [boldify_user_words(STORY, SEEDS[:i % 12 + 1]) for i in range(1000)], number=1)
+    print(f"{'1k stories, mixed seed sets':<28} old {t_old * 1000:10.1f} ms  new {t_new * 1000:10.1f} ms  "
+          f"x{t_old / t_new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench/history.py
+# 500-turn synthetic PlaidChat conversation: request size and round-trip latency
+# per turn with the full history (old behaviour) vs. HistoryWindow.
+#
+#   python -m bench.history --turns 500
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from bench.openai_stub import serve
+from plaidlibs.chat import persona_messages, persona_reply
+from plaidlibs.history import HistoryWindow
+
+WORDS = ("plaid otter lighthouse accordion nebula kilt teacup ripple compass heist "
+         "marmalade tartan clocktower ledger whisper moonlit station parade").split()
+
+
+def synthetic_line(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))).capitalize() + "."
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PlaidChat history size/latency over a long chat")
+    ap.add_argument("--turns", type=int, default=500)
+    ap.add_argument("--every", type=int, default=50, help="report every N turns")
+    args = ap.parse_args()
+
+    from openai import OpenAI
+
+    server = serve()
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="stub")
+    rng = random.Random(7)
+    messages = [{"role": "assistant", "content": "Oh hello. Another brilliant human."}]
+    hw = HistoryWindow()
+
+    rows = []
+    for turn in range(1, args.turns + 1):
+        messages.append({"role": "user", "content": synthetic_line(rng)})
+        full_bytes = len(json.dumps(persona_messages("MacQuip", messages)))
+        t0 = time.perf_counter()
+        persona_reply(client, "MacQuip", messages)
+        full_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        window = hw.window(messages)
+        reply = persona_reply(client, "MacQuip", window)
+        win_ms = (time.perf_counter() - t0) * 1000
+        win_bytes = len(json.dumps(persona_messages("MacQuip", window)))
+
+        messages.append({"role": "assistant", "content": reply + " " + synthetic_line(rng)})
+        rows.append((turn, full_bytes, full_ms, win_bytes, win_ms))
+
+    server.shutdown()
+    print(f"{'turn':>5} {'full bytes':>11} {'full ms':>8} {'window bytes':>13} {'window ms':>10}")
+    for turn, fb, fm, wb, wm in rows:
+        if turn == 1 or turn % args.every == 0:
+            print(f"{turn:>5} {fb:>11} {fm:>8.2f} {wb:>13} {wm:>10.2f}")
+    tail = rows[len(rows) // 2:]
+    print(f"window bytes over 2nd half: min {min(r[3] for r in tail)} max {max(r[3] for r in tail)}; "
+          f"p50 latency {statistics.median(r[4] for r in tail):.2f} ms "
+          f"(full history p50 {statistics.median(r[2] for r in tail):.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
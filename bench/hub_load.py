@@ -0,0 +1,132 @@
+# bench/hub_load.py
+# Load generator for the multiplayer hub (plaidlibs.hub): opens --rounds rounds
+# with --players headless bots each. Every bot connects and follows its round
+# first (spread over --ramp seconds); then all rounds play at once (join, submit,
+# vote, host closes), each bot thinking up to --think seconds before a move.
+# Reports throughput and fan-out latency (hub append to bot receive) against
+# --budget-ms at p99. Starts its own hub in a subprocess (with --db, one that
+# persists every event) unless --url points at a running one. Exits 1 over budget.
+#
+#   python -m bench.hub_load
+#   python -m bench.hub_load --rounds 2000 --players 4 --ramp 10 --think 20
+#   python -m bench.hub_load --db /tmp/rounds.sqlite3
+#   python -m bench.hub_load --url ws://127.0.0.1:8765
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from websockets.asyncio.client import connect
+
+from plaidlibs.hub import run_bot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_hub(db: Optional[str] = None) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, "-m", "plaidlibs.hub", "--port", "0"] + (["--db", db] if db else []),
+                            cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    while line.startswith("recovered"):  # a --db that already holds rounds
+        line = proc.stdout.readline()
+    if "ws://" not in line:
+        proc.kill()
+        raise RuntimeError(f"hub did not start: {line!r}")
+    proc.url = line.split()[-1]
+    return proc
+
+
+async def open_rounds(url: str, n: int, players: int) -> List[str]:
+    ids = []
+    async with connect(url, compression=None, proxy=None) as conn:  # the opener follows its rounds until it disconnects
+        for ref in range(n):
+            data = {"prompt": f"load round {ref}", "max_players": players}
+            await conn.send(json.dumps({"op": "open", "player": "p0", "data": data, "ref": ref}))
+        while len(ids) < n:
+            msg = json.loads(await conn.recv())
+            if "error" in msg:
+                raise RuntimeError(msg["error"])
+            if msg.get("ok"):
+                ids.append(msg["round"])
+    return ids
+
+
+async def play(url: str, rounds: int, players: int, ramp: float, think: float, timeout: float) -> dict:
+    ids = await open_rounds(url, rounds, players)
+    latencies: List[float] = []
+    rng = random.Random(1)
+    start = asyncio.Event()
+    connected = 0
+
+    def ready():
+        nonlocal connected
+        connected += 1
+        if connected == rounds * players:
+            # keep this process's own collector pauses out of the hub's latencies
+            gc.collect()
+            gc.freeze()
+            gc.disable()
+            start.set()
+
+    async def round_bots(i: int, round_id: str):
+        await asyncio.sleep(ramp * i / rounds)
+        await asyncio.gather(*(run_bot(url, round_id, f"p{j}", random.Random(rng.random()), players, latencies,
+                                       host=j == 0, think=think, start=start, ready=ready, timeout=timeout)
+                               for j in range(players)))
+
+    bots = asyncio.gather(*(round_bots(i, round_id) for i, round_id in enumerate(ids)))
+    await start.wait()
+    t0 = time.perf_counter()
+    try:
+        await bots
+    finally:
+        gc.enable()
+        gc.unfreeze()
+    return {"seconds": time.perf_counter() - t0, "latencies": latencies}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Drive the PlaidPlay hub with synthetic players")
+    ap.add_argument("--url", help="running hub (default: start one)")
+    ap.add_argument("--db", help="SQLite file for the hub it starts (default: memory only)")
+    ap.add_argument("--rounds", type=int, default=1000)
+    ap.add_argument("--players", type=int, default=4, help="bots per round")
+    ap.add_argument("--ramp", type=float, default=5.0, help="seconds over which the bots connect")
+    ap.add_argument("--think", type=float, default=10.0, help="max seconds a bot waits before each move")
+    ap.add_argument("--timeout", type=float, default=120.0, help="per bot")
+    ap.add_argument("--budget-ms", type=float, default=50.0, help="p99 fan-out latency")
+    args = ap.parse_args()
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    hub = None if args.url else start_hub(args.db)
+    url = args.url or hub.url
+    try:
+        r = asyncio.run(play(url, args.rounds, args.players, args.ramp, args.think, args.timeout))
+    finally:
+        if hub:
+            hub.terminate()
+            hub.wait()
+    ms = sorted(x * 1000 for x in r["latencies"])
+    p99 = ms[min(len(ms) - 1, int(0.99 * len(ms)))]
+    print(f"{args.rounds:,} rounds x {args.players} bots ({args.rounds * args.players:,} connections) "
+          f"against {url}, think time up to {args.think:.1f}s")
+    print(f"all rounds played in {r['seconds']:.1f}s, {len(ms):,} deliveries ({len(ms) / r['seconds']:,.0f}/s)")
+    print(f"fan-out latency ms: p50 {statistics.median(ms):.1f} · p99 {p99:.1f} · max {ms[-1]:.1f}")
+    if p99 > args.budget_ms:
+        print(f"FAIL: p99 over {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"OK: p99 under {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench/lobby.py
+# Large-lobby PlaidPlay: one round (submissions + 8 ranked voting rounds) per
+# lobby size with the NumPy path in plaidlibs.lobby, against the same round done
+# per player in pure Python (simulate_submissions plus one ballot per voter) for
+# the sizes where that finishes. Fails when 100k players take longer than --budget-ms.
+#
+#   python -m bench.lobby
+#   python -m bench.lobby --sizes 10 1000 100000 1000000 --python-max 10000 --repeat 5
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict
+
+from plaidlibs.generators import simulate_submissions
+from plaidlibs.lobby import FIRST_POINTS, SECOND_POINTS, leaderboard, lobby_rng, lobby_scores, simulate_lobby
+
+ROUNDS = 8
+BUDGETED = 100_000
+
+
+def python_round(n: int, seed: int) -> Dict[str, int]:
+    rng = random.Random(seed)
+    subs = simulate_submissions("bench", n, rng)
+    tally = {s["player"]: 0 for s in subs}
+    players = list(tally)
+    for _ in range(ROUNDS):
+        for voter in players:
+            ballot = [p for p in rng.sample(players, min(3, n)) if p != voter][:2]
+            tally[ballot[0]] += FIRST_POINTS
+            if len(ballot) > 1:
+                tally[ballot[1]] += SECOND_POINTS
+    return tally
+
+
+def numpy_round(n: int, seed: int):
+    lobby = simulate_lobby(n, lobby_rng(seed))
+    lobby.submissions(0, 20)
+    return leaderboard(lobby_scores(n, lobby_rng(seed, 1), rounds=ROUNDS))
+
+
+def best_ms(fn: Callable[[int, int], object], n: int, repeat: int) -> float:
+    times = []
+    for seed in range(repeat):
+        t0 = time.perf_counter()
+        fn(n, seed)
+        times.append((time.perf_counter() - t0) * 1000)
+    return min(times)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Large-lobby PlaidPlay round time")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000, 1_000_000])
+    ap.add_argument("--python-max", type=int, default=100_000, help="largest lobby timed in pure Python")
+    ap.add_argument("--repeat", type=int, default=3, help="rounds per size (best is kept)")
+    ap.add_argument("--budget-ms", type=float, default=1000.0, help=f"budget at {BUDGETED:,} players")
+    args = ap.parse_args()
+
+    print(f"One round: submissions + {ROUNDS} voting rounds, best of {args.repeat}")
+    print(f"{'players':>10} {'numpy ms':>10} {'python ms':>10} {'speedup':>8}")
+    failed = False
+    for n in args.sizes:
+        fast = best_ms(numpy_round, n, args.repeat)
+        if n <= args.python_max:
+            slow = best_ms(python_round, n, 1)
+            py = f"{slow:>10.1f} {slow / fast:>7.1f}x"
+        else:
+            py = f"{'-':>10} {'-':>8}"
+        flag = ""
+        if n == BUDGETED and fast > args.budget_ms:
+            failed, flag = True, f"  over budget ({args.budget_ms:.0f} ms)"
+        print(f"{n:>10,} {fast:>10.1f} {py}{flag}")
+    if failed:
+        print("\nFAIL")
+        sys.exit(1)
+    if BUDGETED in args.sizes:
+        print(f"\nOK: {BUDGETED:,} players under {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
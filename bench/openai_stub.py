@@ -0,0 +1,136 @@
+# bench/openai_stub.py
+# Tiny local server that speaks enough of the OpenAI chat.completions protocol
+# (blocking JSON + SSE streaming) to exercise PlaidChat without the network.
+#
+#   python -m bench.openai_stub --port 8765 --token-delay 0.03
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub streamlit run app.py
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+def stub_reply_tokens(payload: dict) -> List[str]:
+    """
+    Deterministic reply for a request: echoes the last user line in small tokens.
+    """
+    last = ""
+    for m in reversed(payload.get("messages", [])):
+        if m.get("role") == "user":
+            last = m.get("content", "")
+            break
+    words = f"Stub reply, tartan-certified. You said: {last or 'nothing at all'}".split(" ")
+    max_tokens = int(payload.get("max_tokens") or 300)
+    return [w + " " for w in words[:-1]][:max_tokens] + words[-1:]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients can reuse sockets
+    first_token_delay = 0.0
+    token_delay = 0.0
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"no route {self.path}"}})
+            return
+
+        tokens = stub_reply_tokens(payload)
+        cid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = payload.get("model", "stub")
+
+        if not payload.get("stream"):
+            time.sleep(self.first_token_delay + self.token_delay * len(tokens))
+            self._send_json(200, {
+                "id": cid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta: dict, finish: Optional[str] = None) -> bytes:
+            chunk = {
+                "id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        time.sleep(self.first_token_delay)
+        self._write_chunk(event({"role": "assistant", "content": ""}))
+        for tok in tokens:
+            self._write_chunk(event({"content": tok}))
+            time.sleep(self.token_delay)
+        self._write_chunk(event({}, "stop"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, first_token_delay: float = 0.0,
+          token_delay: float = 0.0, background: bool = True) -> ThreadingHTTPServer:
+    """
+    Start the stub. With port=0 an ephemeral port is picked; read it back from
+    server.server_address. background=True runs it on a daemon thread.
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "first_token_delay": first_token_delay,
+        "token_delay": token_delay,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local OpenAI chat.completions stub")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--first-token-delay", type=float, default=0.2, help="seconds before the first token")
+    ap.add_argument("--token-delay", type=float, default=0.03, help="seconds between tokens")
+    args = ap.parse_args()
+    server = serve(args.host, args.port, args.first_token_delay, args.token_delay, background=False)
+    print(f"OpenAI stub on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# bench/persona.py
+# Offline persona engine: reply latency per Quip (tables only, and with a
+# synthetic corpus), then time to first token for a mixed chat against a healthy,
+# a slow and a dead OpenAI-compatible stub, with and without FallbackBackend.
+#
+#   python -m bench.persona
+#   python -m bench.persona --replies 50000 --slow-delay 2.0 --turns 30
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from bench.history import WORDS, synthetic_line
+from bench.openai_stub import serve
+from plaidlibs.backends import ChatBackend, FallbackBackend, OpenAIBackend, TemplateBackend
+from plaidlibs.catalog import QUIPS
+from plaidlibs.llm_client import ClientSettings, PooledClient
+from plaidlibs.persona import PersonaEngine, load_corpus
+
+BUDGET_MS = 5.0
+CASUAL = ["hi", "lol", "ok cool", "thanks!", "haha yes", "go on"]
+
+
+def pct(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def latency(engine: PersonaEngine, n: int, rng: random.Random) -> Dict[str, float]:
+    histories = []
+    for i in range(n):
+        turns = rng.randint(1, 6)
+        h = []
+        for _ in range(turns):
+            h.append({"role": "user", "content": synthetic_line(rng)})
+            h.append({"role": "assistant", "content": synthetic_line(rng)})
+        histories.append((QUIPS[i % len(QUIPS)], h[:-1]))
+    for quip in QUIPS:  # models are built on first use; time steady-state replies
+        engine.reply(quip, [{"role": "user", "content": "hello"}])
+    times = []
+    for quip, h in histories:
+        t0 = time.perf_counter()
+        engine.reply(quip, h)
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"p50": statistics.median(times), "p99": pct(times, 0.99), "max": max(times)}
+
+
+def synthetic_corpus(path: str, lines: int, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            quip = QUIPS[i % (len(QUIPS) + 1)] if i % (len(QUIPS) + 1) < len(QUIPS) else None
+            text = synthetic_line(rng)
+            f.write(f"{quip}\t{text}\n" if quip else f"{text}\n")
+
+
+def ttft(backend: ChatBackend, turns: List[str]) -> List[float]:
+    out = []
+    for said in turns:
+        t0 = time.perf_counter()
+        stream = iter(backend.stream("MacQuip", [{"role": "user", "content": said}]))
+        next(stream, None)
+        out.append((time.perf_counter() - t0) * 1000)
+        for _ in stream:
+            pass
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline persona engine latency and API fallback")
+    ap.add_argument("--replies", type=int, default=20_000)
+    ap.add_argument("--corpus-lines", type=int, default=5_000)
+    ap.add_argument("--turns", type=int, default=20, help="chat turns per fallback scenario")
+    ap.add_argument("--slow-delay", type=float, default=1.5, help="first-token delay of the slow stub (s)")
+    ap.add_argument("--first-token-timeout", type=float, default=0.5)
+    args = ap.parse_args()
+    rng = random.Random(11)
+
+    print(f"{args.replies:,} replies across {len(QUIPS)} Quips (budget {BUDGET_MS:.0f} ms)")
+    print(f"{'engine':<28} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.txt")
+        synthetic_corpus(path, args.corpus_lines, rng)
+        engines = (("voice tables", PersonaEngine()),
+                   (f"+ {args.corpus_lines:,}-line corpus", PersonaEngine(load_corpus(path))))
+        worst = 0.0
+        for label, engine in engines:
+            r = latency(engine, args.replies, rng)
+            worst = max(worst, r["p99"])
+            print(f"{label:<28} {r['p50']:>9.3f} {r['p99']:>9.3f} {r['max']:>9.3f}")
+    print("OK" if worst < BUDGET_MS else "FAIL", f"p99 {worst:.3f} ms vs {BUDGET_MS:.0f} ms budget\n")
+
+    turns = [rng.choice(CASUAL) if i % 2 else " ".join(rng.choice(WORDS) for _ in range(12))
+             for i in range(args.turns)]
+    healthy, slow = serve(), serve(first_token_delay=args.slow_delay)
+    dead = "http://127.0.0.1:9/v1"  # discard port: connection refused
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    print(f"Time to first token, {args.turns} turns (half casual), first-token timeout {args.first_token_timeout}s")
+    print(f"{'upstream':<10} {'backend':<18} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for label, url in (("healthy", f"http://127.0.0.1:{healthy.server_address[1]}/v1"),
+                       ("slow", f"http://127.0.0.1:{slow.server_address[1]}/v1"),
+                       ("down", dead)):
+        primary = OpenAIBackend(PooledClient(ClientSettings(base_url=url, max_retries=0)))
+        for name, backend in (("openai", primary),
+                              ("openai+template", FallbackBackend(primary, TemplateBackend(),
+                                                                  first_token_timeout=args.first_token_timeout))):
+            times, errors = [], 0
+            for said in turns:
+                try:
+                    times += ttft(backend, [said])
+                except Exception:
+                    errors += 1
+            if times:
+                print(f"{label:<10} {name:<18} {statistics.median(times):>9.1f} {pct(times, 0.99):>9.1f} {errors:>7}")
+            else:
+                print(f"{label:<10} {name:<18} {'-':>9} {'-':>9} {errors:>7}")
+        time.sleep(args.slow_delay)  # let abandoned slow replies finish before closing their sockets
+        primary.pooled.close()
+
+
+if __name__ == "__main__":
+    main()
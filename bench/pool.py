@@ -0,0 +1,61 @@
+# bench/pool.py
+# Connection reuse: a fresh OpenAI() per turn (old behaviour) vs. the shared
+# PooledClient, against the local OpenAI stub, sequential and concurrent.
+#
+#   python -m bench.pool --turns 50 --threads 8
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.openai_stub import serve
+from plaidlibs.chat import persona_reply
+from plaidlibs.llm_client import ClientSettings, PooledClient
+
+HISTORY = [{"role": "user", "content": "hi"}]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PlaidChat connection pool reuse")
+    ap.add_argument("--turns", type=int, default=50)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--pool-size", type=int, default=8)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    server = serve()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    settings = ClientSettings(pool_size=args.pool_size, base_url=base_url)
+
+    t0 = time.perf_counter()
+    cold_new = 0
+    for _ in range(args.turns):
+        cold = PooledClient(settings)  # one cold client per "rerun"
+        persona_reply(cold.client, "MacQuip", HISTORY)
+        cold_new += cold.stats.new_connections
+        cold.close()
+    cold_s = time.perf_counter() - t0
+
+    pooled = PooledClient(settings)
+    t0 = time.perf_counter()
+    for _ in range(args.turns):
+        persona_reply(pooled.client, "MacQuip", HISTORY)
+    warm_s = time.perf_counter() - t0
+    seq = pooled.stats.snapshot()
+
+    with ThreadPoolExecutor(args.threads) as ex:
+        list(ex.map(lambda _: persona_reply(pooled.client, "MacQuip", HISTORY), range(args.turns)))
+    total = pooled.stats.snapshot()
+    pooled.close()
+    server.shutdown()
+
+    print(f"client per turn : {args.turns} turns, {cold_new} new connections, {cold_s * 1000 / args.turns:.2f} ms/turn")
+    print(f"pooled (serial) : {seq['requests']} turns, {seq['new_connections']} new, "
+          f"{seq['reused_connections']} reused, {warm_s * 1000 / args.turns:.2f} ms/turn")
+    print(f"pooled (total)  : {total['requests']} turns, {total['new_connections']} new, "
+          f"{total['reused_connections']} reused (pool size {args.pool_size}, {args.threads} threads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# bench/rerun.py
+# Per-rerun script time for app.py: open a workflow step and rerun it repeatedly,
+# the way Streamlit re-executes the whole script on every interaction. Uses
+# Streamlit's AppTest harness, so no browser or server is needed. Only the script's
+# own execution is timed (AppTest adds a few hundred ms of polling per run).
+#
+#   python -m bench.rerun --reruns 200
+#   python -m bench.rerun --app /path/to/old/app.py    # compare another revision
+#   python -m bench.rerun --stories                    # script runs per completed story
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+WORKFLOWS = ["Lib-Ate", "Create Direct", "Storyline", "PlaidPic", "PlaidMagGen", "PlaidPlay"]
+TIMES = []  # filled by the wrapper script, which runs in this process
+CODE = {}   # compiled app per path (Streamlit caches script bytecode the same way)
+
+WRAPPER = """
+import sys, time
+sys.path.insert(0, {root!r})
+from bench import rerun as _bench  # the app may define its own "rerun"
+__file__ = {app!r}
+_code = _bench.CODE.get(__file__)
+if _code is None:
+    _code = _bench.CODE[__file__] = compile(open(__file__, encoding="utf-8").read(), __file__, "exec")
+_t0 = time.perf_counter()
+try:
+    exec(_code)
+finally:
+    _bench.TIMES.append((time.perf_counter() - _t0) * 1000)
+"""
+
+
+# One complete story per workflow, as a user would click through it:
+# ("set", widget key, value) fills an input, ("click", label) presses a button.
+LIBATE_WORDS = [a for i in range(12) for a in (("set", f"libate_word_{i}", f"word{i}"), ("click", "Submit answer"))]
+STORIES = {
+    "Lib-Ate": [("set", "libate_style_pick", "2"), ("click", "Submit style"),
+                ("set", "libate_genre_pick", "1"), ("click", "Submit genre"),
+                ("set", "libate_abs_pick", "1"), ("click", "Submit absurdity"),
+                ("set", "libate_ready", "yes"), ("click", "Confirm")] + LIBATE_WORDS,
+    "Create Direct": [("set", "cd_style", "1"), ("click", "Submit style"),
+                      ("set", "cd_genre", "1"), ("click", "Submit genre"),
+                      ("set", "cd_abs", "3"), ("click", "Submit absurdity"),
+                      ("click", "Generate")],
+    "Storyline": [("set", "sl_concept", "A baker in Paris finds a luminous cat"), ("click", "Save Concept"),
+                  ("set", "sl_style", "1"), ("click", "Submit style"),
+                  ("set", "sl_abs", "2"), ("click", "Submit absurdity"),
+                  ("click", "Generate Story")],
+    "PlaidPic": [("set", "pp_desc", "fox in a scarf"), ("click", "Proceed"),
+                 ("set", "pp_cap", "cap"), ("set", "pp_mood", "cozy"), ("click", "Save & Continue"),
+                 ("set", "pp_style", "1"), ("set", "pp_genre", "1"), ("set", "pp_abs", "1"), ("click", "Lock Config")],
+    "PlaidMagGen": [("set", "pm_format", "1"), ("click", "Set Format"),
+                    ("set", "pm_style", "1"), ("click", "Set Style"),
+                    ("set", "pm_desc", "otter"), ("click", "Save Description"),
+                    ("click", "Generate Visual Spec")],
+    "PlaidPlay": [("click", "Start Round"), ("click", "Run Voting Simulation")],
+}
+DONE_STEP = {"Lib-Ate": 7, "Create Direct": 5, "Storyline": 5, "PlaidPic": 5, "PlaidMagGen": 5, "PlaidPlay": 3}
+
+
+def pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def count_stories(script, times):
+    """
+    Script executions per completed story: select the workflow, then replay STORIES.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    print(f"{'workflow':<18} {'actions':>8} {'runs/story':>11} {'runs/action':>12}")
+    total_actions = total_runs = 0
+    for mode, actions in STORIES.items():
+        at = AppTest.from_file(script, default_timeout=30).run()
+        del times[:]
+        at.sidebar.selectbox(key="workflow_select").set_value(mode).run()
+        clicks = 1
+        for action in actions:
+            if action[0] == "set":
+                next(w for w in at.main if getattr(w, "key", None) == action[1]).set_value(action[2])
+            else:
+                next(b for b in at.button if b.label == action[1]).click().run()
+                clicks += 1
+        assert not at.exception, at.exception
+        assert at.session_state.GLOBAL["CURRENT_STEP"] == DONE_STEP[mode], (mode, at.session_state.GLOBAL)
+        total_actions += clicks
+        total_runs += len(times)
+        print(f"{mode:<18} {clicks:>8} {len(times):>11} {len(times) / clicks:>12.2f}")
+    print(f"{'all':<18} {total_actions:>8} {total_runs:>11} {total_runs / total_actions:>12.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="app.py rerun cost")
+    ap.add_argument("--app", default=APP)
+    ap.add_argument("--reruns", type=int, default=200)
+    ap.add_argument("--stories", action="store_true", help="count script runs per completed story instead")
+    args = ap.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    from bench import rerun  # the wrapper imports this module by name, not as __main__
+
+    app = os.path.abspath(args.app)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(WRAPPER.format(root=root, app=app))
+    sys.path.insert(0, os.path.dirname(app))
+    if args.stories:
+        count_stories(f.name, rerun.TIMES)
+        os.unlink(f.name)
+        return
+
+    print(f"{'workflow (step 1)':<18} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    overall = []
+    for mode in WORKFLOWS:
+        at = AppTest.from_file(f.name, default_timeout=30).run()
+        at.sidebar.selectbox(key="workflow_select").set_value(mode).run()
+        for _ in range(5):  # warm imports and caches
+            at.run()
+        del rerun.TIMES[:]
+        for _ in range(args.reruns):
+            at.run()
+        assert not at.exception, at.exception
+        times = list(rerun.TIMES)
+        overall += times
+        print(f"{mode:<18} {statistics.mean(times):9.2f} {statistics.median(times):9.2f} {pct(times, 0.99):9.2f}")
+    print(f"{'all':<18} {statistics.mean(overall):9.2f} {statistics.median(overall):9.2f} {pct(overall, 0.99):9.2f}")
+    os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# bench/round_store.py
+# Restart cost of the hub's durable rounds (plaidlibs.roundstore): fills a
+# SQLite store with --rounds played rounds (--open-pct of them still mid-vote),
+# appending every event as the hub does and flushing every --flush-events
+# events, then times recover() on a fresh connection against replaying the
+# whole log. Checks the recovered rounds against the ones that were written.
+# Exits 1 if recovery takes longer than --budget-ms.
+#
+#   python -m bench.round_store
+#   python -m bench.round_store --rounds 100000 --players 4 --open-pct 10 --snapshot-every 2000
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from plaidlibs.hub import random_entry
+from plaidlibs.rounds import Round
+from plaidlibs.roundstore import RoundStore
+
+
+def fill(store: RoundStore, first_id: int, rounds: int, players: int, open_pct: float, flush_events: int,
+         rng: random.Random, max_events: int = 0) -> Dict[str, Round]:
+    """
+    Play rounds first_id.. through store.append() (stopping after max_events, if
+    given); returns the ones left open. Rounds are played a batch at a time,
+    interleaved move by move.
+    """
+    still_open: Dict[str, Round] = {}
+    appended = 0
+    names = [f"p{j}" for j in range(players)]
+    batch = 500
+    for start in range(first_id, first_id + rounds, batch):
+        live = [Round(f"R{i:07d}", keep_events=False) for i in range(start, min(first_id + rounds, start + batch))]
+        moves = [[("open", names[0], {"prompt": "bench", "max_players": players})]
+                 + [("join", p, None) for p in names] + [("submit", p, None) for p in names]
+                 + [("vote", p, None) for p in names] + [("close", names[0], None)] for _ in live]
+        for plan in moves:
+            if rng.random() * 100 < open_pct:
+                del plan[-1 - rng.randrange(players + 1):]  # stops somewhere in the voting
+        for step in range(max(len(plan) for plan in moves)):
+            for r, plan in zip(live, moves):
+                if step >= len(plan):
+                    continue
+                kind, player, data = plan[step]
+                if kind == "submit":
+                    data = random_entry(rng)
+                elif kind == "vote":
+                    others = [p for p in names if p != player]
+                    first, second = rng.sample(others, 2)
+                    data = {"first": first, "second": second}
+                store.append(r, json.dumps(r.apply(kind, player, data)))
+                appended += 1
+                if appended % flush_events == 0:
+                    store.flush()
+                if appended == max_events:
+                    break
+            if appended == max_events:
+                break
+        still_open.update((r.id, r) for r in live if r.seq and not r.closed)
+        if appended == max_events:
+            break
+    store.flush()
+    return still_open
+
+
+def full_replay(path: str) -> Dict[str, Round]:
+    rounds: Dict[str, Round] = {}
+    db = sqlite3.connect(path)
+    for round_id, body in db.execute("SELECT round, body FROM events ORDER BY id"):
+        r = rounds.get(round_id)
+        if r is None:
+            r = rounds[round_id] = Round(round_id, keep_events=False)
+        r.fold(json.loads(body))
+    db.close()
+    return {round_id: r for round_id, r in rounds.items() if not r.closed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Recovery time of the PlaidPlay round store")
+    ap.add_argument("--rounds", type=int, default=100_000)
+    ap.add_argument("--players", type=int, default=4)
+    ap.add_argument("--open-pct", type=float, default=10.0, help="rounds still open at the restart")
+    ap.add_argument("--snapshot-every", type=int, default=2000, help="events between snapshot passes")
+    ap.add_argument("--flush-events", type=int, default=200, help="events per commit (the hub's flush interval)")
+    ap.add_argument("--budget-ms", type=float, default=1000.0, help="recover() on 100k stored rounds")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "rounds.sqlite3")
+        store = RoundStore(path, snapshot_every=args.snapshot_every, keep_closed=None)
+        t0 = time.perf_counter()
+        rng = random.Random(3)
+        expected = fill(store, 0, args.rounds, args.players, args.open_pct, args.flush_events, rng)
+        fill_s = time.perf_counter() - t0
+        filled = store.stats["appends"]
+        # the worst case: the hub dies just before its next snapshot pass is due
+        store.snapshot()
+        expected.update(fill(store, args.rounds, args.rounds, args.players, args.open_pct, args.flush_events, rng,
+                             max_events=args.snapshot_every - 1))
+        events = store.stats["appends"]
+        tail = events - store.checkpoint()
+        snapshot_ms = store.stats["snapshot_ms_max"]
+        store.close(snapshot=False)  # as if the hub died: no final snapshot
+        size_mb = os.path.getsize(path) / 1e6
+
+        t0 = time.perf_counter()
+        recovered = {r.id: r for r in RoundStore(path, keep_closed=None).recover().values() if not r.closed}
+        recover_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        replayed = full_replay(path)
+        replay_ms = (time.perf_counter() - t0) * 1000
+
+    for got in (recovered, replayed):
+        assert got.keys() == expected.keys(), "recovered a different set of open rounds"
+        assert all(json.dumps(got[i].snapshot()) == json.dumps(r.snapshot()) for i, r in expected.items())
+    print(f"{args.rounds:,} rounds x {args.players} players, {events:,} events ({filled / fill_s:,.0f}/s appended), "
+          f"{size_mb:.0f} MB on disk, slowest snapshot pass {snapshot_ms:.0f} ms")
+    print(f"at the restart: {len(expected):,} open rounds, {tail:,} events past the last snapshot")
+    print(f"recover() {recover_ms:,.0f} ms · full log replay {replay_ms:,.0f} ms")
+    if recover_ms > args.budget_ms:
+        print(f"FAIL: recovery over {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"OK: recovery under {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# bench/session_flood.py
+# Synthetic session flood against plaidlibs.sessions: N browser tabs on a fake
+# clock, a few of them heavy chatters, all eventually left open and idle. Each
+# simulated script run calls SessionRegistry.touch() like app.py does. Reports
+# live session memory with no limits vs with the per-session budget and idle TTL.
+#
+#   python -m bench.session_flood
+#   python -m bench.session_flood --sessions 5000 --heavy 0.2 --budget-kb 128 --ttl 900
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from plaidlibs.generators import assemble_story, random_story_seeds
+from plaidlibs.sessions import SessionBudget, SessionRegistry, session_bytes
+from plaidlibs.state import init_session, reset_workflow
+
+WORDS = ("plaid otter lighthouse accordion nebula kilt teacup ripple compass heist "
+         "marmalade tartan clocktower ledger whisper moonlit station parade").split()
+STYLES = ("Flash Fiction", "Ballads", "Magic Realism", "Scriptlets", "Breaking News")
+
+
+def line(rng: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(lo, hi))).capitalize() + "."
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def flood(budget: SessionBudget, args) -> Dict[str, Any]:
+    clock = Clock()
+    registry = SessionRegistry(budget, clock=clock)
+    rng = random.Random(args.seed)
+    sessions: List[Dict[str, Any]] = []
+    plans = []  # (heavy, first tick, last active tick)
+    for i in range(args.sessions):
+        s: Dict[str, Any] = {}
+        init_session(s, i)
+        sessions.append(s)
+        start = rng.randrange(args.ticks // 2)
+        plans.append((rng.random() < args.heavy, start, start + rng.randint(5, args.ticks)))
+
+    touch_us: List[float] = []
+    for tick in range(args.ticks):
+        clock.now = tick * args.tick_seconds
+        for s, (heavy, first, last) in zip(sessions, plans):
+            if not first <= tick <= last:
+                continue  # tab not opened yet, or left open and idle
+            t0 = time.perf_counter()
+            registry.touch(s["GLOBAL"]["SESSION_ID"], s)
+            touch_us.append((time.perf_counter() - t0) * 1e6)
+            if heavy and tick > first:  # heavy users write one story, then chat on
+                if s["GLOBAL"]["CURRENT_MODE"] != "PlaidChat":
+                    reset_workflow(s, "PlaidChat")
+                chat = s["PLAIDCHAT"]
+                for _ in range(rng.randint(1, 3)):
+                    chat.messages.append({"role": "user", "content": line(rng, 6, 30)})
+                    chat.HISTORY.window(chat.messages)
+                    chat.messages.append({"role": "assistant", "content": line(rng, 20, 80)})
+            elif heavy or rng.random() < 0.3:
+                if s["GLOBAL"]["CURRENT_MODE"] != "Create Direct":
+                    reset_workflow(s, "Create Direct")
+                s["generated_story"] = assemble_story(rng.choice(STYLES), "Comedy", "Moderate", "MacQuip",
+                                                      random_story_seeds(rng), rng)
+                s["generated_seed"] = rng.getrandbits(32)
+
+    sizes = sorted(session_bytes(s) for s in sessions)
+    stats = registry.snapshot()
+    return {
+        "live_mb": sum(sizes) / 2**20,
+        "max_kb": sizes[-1] / 1024,
+        "p99_kb": sizes[int(len(sizes) * 0.99) - 1] / 1024,
+        "tracked": stats["sessions"],
+        "tracked_mb": stats["bytes"] / 2**20,
+        "touch_p50_us": statistics.median(touch_us),
+        "touch_p99_us": sorted(touch_us)[int(len(touch_us) * 0.99) - 1],
+        "spill_files": len(os.listdir(budget.spill_dir)) if os.path.isdir(budget.spill_dir) else 0,
+        **{k: stats[k] for k in ("trimmed_messages", "spilled_stories", "over_budget", "evicted_idle")},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Session memory under a synthetic session flood")
+    ap.add_argument("--sessions", type=int, default=2000)
+    ap.add_argument("--ticks", type=int, default=120, help="simulated minutes")
+    ap.add_argument("--tick-seconds", type=float, default=60.0)
+    ap.add_argument("--heavy", type=float, default=0.1, help="share of sessions that chat every tick")
+    ap.add_argument("--budget-kb", type=int, default=64)
+    ap.add_argument("--chat-keep", type=int, default=200)
+    ap.add_argument("--ttl", type=float, default=1800.0)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    spill_dir = tempfile.mkdtemp(prefix="plaidlibs-flood-")
+    try:
+        unbounded = flood(SessionBudget(max_bytes=2**62, chat_keep=2**62, spill_dir=spill_dir,
+                                        idle_ttl=float("inf")), args)
+        budgeted = flood(SessionBudget(max_bytes=args.budget_kb * 1024, chat_keep=args.chat_keep,
+                                       spill_dir=spill_dir, idle_ttl=args.ttl), args)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    print(f"{args.sessions:,} sessions, {args.ticks} ticks of {args.tick_seconds:.0f}s, "
+          f"{args.heavy:.0%} heavy chatters; budget {args.budget_kb} KB, last {args.chat_keep} "
+          f"messages, idle TTL {args.ttl:.0f}s\n")
+    print(f"{'':<26} {'no limits':>12} {'budgeted':>12}")
+    rows = (
+        ("live session memory", "live_mb", "{:>10.1f}MB"),
+        ("largest session", "max_kb", "{:>10.1f}KB"),
+        ("p99 session", "p99_kb", "{:>10.1f}KB"),
+        ("sessions in registry", "tracked", "{:>12,}"),
+        ("registry total", "tracked_mb", "{:>10.1f}MB"),
+        ("touch() p50", "touch_p50_us", "{:>10.1f}µs"),
+        ("touch() p99", "touch_p99_us", "{:>10.1f}µs"),
+        ("chat messages trimmed", "trimmed_messages", "{:>12,}"),
+        ("stories spilled", "spilled_stories", "{:>12,}"),
+        ("spill files on disk", "spill_files", "{:>12,}"),
+        ("idle sessions evicted", "evicted_idle", "{:>12,}"),
+        ("runs still over budget", "over_budget", "{:>12,}"),
+    )
+    for label, key, fmt in rows:
+        print(f"{label:<26} {fmt.format(unbounded[key])} {fmt.format(budgeted[key])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# bench/session_memory.py
+# Per-session memory footprint: builds N simulated sessions with plaidlibs.state
+# (slotted dataclass per workflow) and with the dict-per-workflow layout it
+# replaced, and reports bytes per session plus allocations per workflow reset.
+# The footprint section compares creating every workflow's state up front with
+# creating it on first entry: the cost of a session's first run, and what an
+# idle session still holds after the user chatted and then switched workflows.
+#
+#   python -m bench.session_memory                 # 10k sessions
+#   python -m bench.session_memory --sessions 50000
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict
+
+from plaidlibs.history import HistoryWindow
+from plaidlibs.generators import quip_greeting
+from plaidlibs.state import STATE_KEYS, init_session, reset_workflow, workflow_state
+
+
+def legacy_state(mode: str) -> Dict[str, Any]:
+    """
+    The dict-per-workflow layout these dataclasses replaced (verbatim).
+    """
+    if mode == "Lib-Ate":
+        return {
+            "QUIP_SELECTED": "MacQuip",
+            "STYLE_SELECTED": None,
+            "GENRE_SELECTED": None,
+            "ABSURDITY_SELECTED": None,
+            "PROMPTS_NEEDED": 0,
+            "PROMPTS_COLLECTED": 0,
+            "COLLECTED": {},
+            "teaser": "",
+        }
+    if mode == "Create Direct":
+        return {
+            "QUIP_SELECTED": "MacQuip",
+            "STYLE_SELECTED": None,
+            "GENRE_SELECTED": None,
+            "ABSURDITY_SELECTED": None,
+        }
+    if mode == "Storyline":
+        return {
+            "USER_STORYLINE": "",
+            "QUIP_SELECTED": "MacQuip",
+            "STYLE_SELECTED": None,
+            "ABSURDITY_SELECTED": None,
+        }
+    if mode == "PlaidPic":
+        return {
+            "IMAGE_UPLOADED": False,
+            "IMAGE_ANALYSIS": {},
+            "QUIP_SELECTED": "MacQuip",
+            "STYLE_SELECTED": None,
+            "GENRE_SELECTED": None,
+            "ABSURDITY_SELECTED": None,
+            "TEXT_DESC": "",
+        }
+    if mode == "PlaidMagGen":
+        return {
+            "FORMAT_SELECTED": None,
+            "STYLE_SELECTED": None,
+            "PROMPT_COLLECTED": "",
+            "ENHANCEMENT_TAGS": [],
+            "QUIP_SELECTED": "MacQuip",
+        }
+    if mode == "PlaidPlay":
+        return {
+            "QUIP_SELECTED": "MacQuip",
+            "STYLE_SELECTED": None,
+            "GENRE_SELECTED": None,
+            "ABSURDITY_SELECTED": None,
+            "PLAYER_EMAILS": [],
+            "SUBMISSIONS": [],
+            "VOTE_TALLY": {},
+            "SUBMISSIONS_RECEIVED": 0,
+            "MASTER_PROMPT": "",
+            "N_PLAYERS": 0,
+            "ROUND_SEED": None,
+        }
+    if mode == "PlaidChat":
+        return {
+            "QUIP_SELECTED": "MacQuip",
+            "messages": [
+                {"role": "assistant", "content": quip_greeting("MacQuip")}
+            ],
+            "HISTORY": HistoryWindow(),    # what actually gets sent upstream
+            "PENDING": None,               # in-flight turn: {"turn": hash, "cache_key": key}
+        }
+    raise KeyError(mode)
+
+
+def legacy_session(session: Dict[str, Any], seed: int):
+    session["GLOBAL"] = {
+        "CURRENT_MODE": None, "CURRENT_STEP": 0, "WAITING_FOR": "", "SESSION_ID": uuid.uuid4().hex,
+        "SEED": seed, "RNG": random.Random(seed), "RUNS": 0, "STORIES": 0,
+    }
+    for mode, key in STATE_KEYS.items():
+        session[key] = legacy_state(mode)
+
+
+def legacy_reset(session: Dict[str, Any], mode: str):
+    session["GLOBAL"].update({"CURRENT_MODE": mode, "CURRENT_STEP": 1, "WAITING_FOR": ""})
+    session[STATE_KEYS[mode]].update(legacy_state(mode))
+
+
+def eager_session(session: Dict[str, Any], seed: int):
+    """
+    Every workflow's state created up front, as init_session used to.
+    """
+    init_session(session, seed)
+    for mode, key in STATE_KEYS.items():
+        session[key] = workflow_state(mode)
+
+
+def eager_reset(session: Dict[str, Any], mode: str):
+    """
+    reset_workflow without releasing the workflow being left.
+    """
+    g = session["GLOBAL"]
+    g["CURRENT_MODE"], g["CURRENT_STEP"], g["WAITING_FOR"] = mode, 1, ""
+    session[STATE_KEYS[mode]].reset()
+
+
+def cold_run(new_session: Callable[[Dict[str, Any], int], None],
+             reset: Callable[[Dict[str, Any], str], None]) -> Callable[[Dict[str, Any], int], None]:
+    """
+    A session's first script run: create it, then enter the default workflow.
+    """
+    def build(session: Dict[str, Any], seed: int):
+        new_session(session, seed)
+        reset(session, "Lib-Ate")
+    return build
+
+
+def idle_after_chat(new_session: Callable[[Dict[str, Any], int], None],
+                    reset: Callable[[Dict[str, Any], str], None],
+                    turns: int) -> Callable[[Dict[str, Any], int], None]:
+    """
+    A session that chatted for `turns` turns, switched to Lib-Ate and went idle.
+    """
+    def build(session: Dict[str, Any], seed: int):
+        cold_run(new_session, reset)(session, seed)
+        reset(session, "PlaidChat")
+        messages = session[STATE_KEYS["PlaidChat"]].messages
+        for t in range(turns):
+            messages.append({"role": "user", "content": f"turn {t}: " + "plaid " * 20})
+            messages.append({"role": "assistant", "content": f"reply {t}: " + "tartan " * 30})
+        reset(session, "Lib-Ate")
+    return build
+
+
+def us_per_session(build: Callable[[Dict[str, Any], int], None], n: int) -> float:
+    gc.collect()
+    t0 = time.perf_counter()
+    for i in range(n):
+        build({}, i)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def bytes_per_session(build: Callable[[Dict[str, Any], int], None], n: int, workflows_only: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    sessions = []
+    for i in range(n):
+        s: Dict[str, Any] = {}
+        build(s, i)
+        if workflows_only:
+            del s["GLOBAL"]
+        sessions.append(s)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # don't count the outer list
+    return (after - before - sessions.__sizeof__()) / n
+
+
+def reset_cost(new_session: Callable[[Dict[str, Any], int], None],
+               reset: Callable[[Dict[str, Any], str], None], n: int) -> Dict[str, float]:
+    session: Dict[str, Any] = {}
+    new_session(session, 1)
+    modes = list(STATE_KEYS)
+    for mode in modes:  # warm up
+        reset(session, mode)
+    gc.collect()
+    t0 = time.perf_counter()
+    for i in range(n):
+        reset(session, modes[i % len(modes)])
+    us = (time.perf_counter() - t0) / n * 1e6
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for i in range(n):
+        reset(session, modes[i % len(modes)])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_reset": us, "peak_bytes": peak - before}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Session state memory per session")
+    ap.add_argument("--sessions", type=int, default=10_000)
+    ap.add_argument("--resets", type=int, default=70_000)
+    ap.add_argument("--turns", type=int, default=20, help="chat turns in the idle-session scenario")
+    args = ap.parse_args()
+    n = args.sessions
+
+    print(f"{n:,} simulated sessions, all seven workflows initialised\n")
+    print(f"{'bytes per session':<28} {'dict layout':>12} {'dataclasses':>12} {'change':>8}")
+    for label, workflows_only in (("workflow state", True), ("whole session (+GLOBAL)", False)):
+        old = bytes_per_session(legacy_session, n, workflows_only)
+        new = bytes_per_session(eager_session, n, workflows_only)
+        print(f"{label:<28} {old:>12,.0f} {new:>12,.0f} {new / old - 1:>+8.1%}")
+    old = bytes_per_session(legacy_session, n, False)
+    new = bytes_per_session(eager_session, n, False)
+    print(f"{'total for ' + format(n, ',') + ' sessions':<28} {old * n / 2**20:>10.1f}MB {new * n / 2**20:>10.1f}MB")
+
+    print(f"\n{args.resets:,} workflow resets")
+    print(f"{'':<28} {'dict layout':>12} {'dataclasses':>12}")
+    old = reset_cost(legacy_session, legacy_reset, args.resets)
+    new = reset_cost(eager_session, eager_reset, args.resets)
+    print(f"{'µs per reset':<28} {old['us_per_reset']:>12.2f} {new['us_per_reset']:>12.2f}")
+    print(f"{'peak bytes allocated':<28} {old['peak_bytes']:>12,} {new['peak_bytes']:>12,}")
+
+    print("\nSession footprint: all workflows up front vs created on entry / released on exit")
+    print(f"{'':<34} {'eager':>10} {'lazy':>10} {'change':>8}")
+    eager, lazy = cold_run(eager_session, eager_reset), cold_run(init_session, reset_workflow)
+    old, new = us_per_session(eager, n), us_per_session(lazy, n)
+    print(f"{'cold session, µs':<34} {old:>10.2f} {new:>10.2f} {new / old - 1:>+8.1%}")
+    old, new = bytes_per_session(eager, n, False), bytes_per_session(lazy, n, False)
+    print(f"{'cold session, bytes':<34} {old:>10,.0f} {new:>10,.0f} {new / old - 1:>+8.1%}")
+    old = bytes_per_session(idle_after_chat(eager_session, eager_reset, args.turns), n, False)
+    new = bytes_per_session(idle_after_chat(init_session, reset_workflow, args.turns), n, False)
+    label = f"idle after {args.turns}-turn chat, bytes"
+    print(f"{label:<34} {old:>10,.0f} {new:>10,.0f} {new / old - 1:>+8.1%}")
+    print(f"{'  total for ' + format(n, ',') + ' sessions':<34} {old * n / 2**20:>8.1f}MB {new * n / 2**20:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench/tally.py
+# Live PlaidPlay leaderboards: what one refresh costs with plaidlibs.tally.LiveTally
+# (ingest the new votes, read the top k) against rescanning the whole lobby each
+# time (a tally dict sorted for its top k, or leaderboard() over the NumPy scores).
+#
+#   python -m bench.tally
+#   python -m bench.tally --sizes 1000 100000 --ballots 200000 -k 10
+
+import argparse
+import random
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+from plaidlibs.lobby import leaderboard, lobby_round, lobby_rng
+from plaidlibs.tally import FIRST_POINTS, SECOND_POINTS, LiveTally
+
+
+def best_us(fn: Callable[[], object], repeat: int = 200) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1e6)
+    return min(times)
+
+
+def per_ballot(n: int, ballots: int, k: int, rng: random.Random) -> Dict[str, float]:
+    votes = [(rng.randrange(n), rng.randrange(n)) for _ in range(ballots)]
+    live = LiveTally(n, k)
+    t0 = time.perf_counter()
+    live.add_ballots(votes)
+    live_ns = (time.perf_counter() - t0) * 1e9 / ballots
+
+    tally = {f"Player {i+1}": 0 for i in range(n)}
+    names = list(tally)
+    t0 = time.perf_counter()
+    for first, second in votes:
+        tally[names[first]] += FIRST_POINTS
+        tally[names[second]] += SECOND_POINTS
+    dict_ns = (time.perf_counter() - t0) * 1e9 / ballots
+    assert live.snapshot() == sorted(tally.items(), key=lambda kv: (-kv[1], int(kv[0][7:])))[:k]
+    return {
+        "ingest_live": live_ns,
+        "ingest_dict": dict_ns,
+        "snap_live": best_us(live.snapshot),
+        "snap_rescan": best_us(lambda: sorted(tally.items(), key=lambda kv: -kv[1])[:k], repeat=5),
+    }
+
+
+def per_round(n: int, k: int) -> Dict[str, float]:
+    rng = lobby_rng(7, 1)
+    rounds = [lobby_round(n, rng) for _ in range(4)]
+    live = LiveTally(n, k)
+    scores = np.zeros(n, dtype=np.int64)
+    add_ms = []
+    for points in rounds:
+        t0 = time.perf_counter()
+        live.add_counts(points, ballots=n)
+        add_ms.append((time.perf_counter() - t0) * 1000)
+        scores += points
+    assert live.snapshot() == leaderboard(scores, k)
+    return {
+        "add_round": min(add_ms),
+        "snap_live": best_us(live.snapshot),
+        "snap_rescan": best_us(lambda: leaderboard(scores, k), repeat=5),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental tally vs full rescan per leaderboard refresh")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    ap.add_argument("--ballots", type=int, default=100_000, help="single ballots ingested per size")
+    ap.add_argument("-k", type=int, default=10, help="leaderboard rows")
+    args = ap.parse_args()
+    rng = random.Random(5)
+
+    print(f"Ballots one at a time ({args.ballots:,}), top {args.k}")
+    print(f"{'players':>10} {'live ns/vote':>13} {'dict ns/vote':>13} {'snapshot us':>12} {'rescan us':>12}")
+    for n in args.sizes:
+        r = per_ballot(n, args.ballots, args.k, rng)
+        print(f"{n:>10,} {r['ingest_live']:>13.0f} {r['ingest_dict']:>13.0f} {r['snap_live']:>12.1f} "
+              f"{r['snap_rescan']:>12.1f}")
+
+    print(f"\nWhole voting rounds (NumPy points per player), top {args.k}")
+    print(f"{'players':>10} {'add ms/round':>13} {'snapshot us':>12} {'rescan us':>12}")
+    for n in args.sizes:
+        r = per_round(n, args.k)
+        print(f"{n:>10,} {r['add_round']:>13.2f} {r['snap_live']:>12.1f} {r['snap_rescan']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# bench/templates.py
+# Stories per second: the old f-string assemble_story vs. compiled render plans,
+# plus a byte-for-byte equality check over every style/absurdity/narrator combo.
+#
+#   python -m bench.templates --stories 20000
+
+import argparse
+import itertools
+import random
+import time
+from typing import Dict, Optional
+
+from bench.highlight import legacy_boldify_user_words
+from plaidlibs.highlight import boldify_user_words
+from plaidlibs.templates import PLAIDEMONIUM_FLAIRS, story_plan
+
+
+def legacy_story_intro_line(quip: str, style: str, genre: Optional[str] = None) -> str:
+    # Verbatim copy of the pre-template implementation, kept for comparison.
+    if quip == "MacQuip":
+        base = f"As your tartan-tongued narrator, I’ll spin a {style}"
+        if genre:
+            base += f" {genre}"
+        return base + " so tight it squeaks."
+    if quip == "DJ Q'Wip":
+        return f"Check it—{style} vibes incoming, genre on lock: {genre or 'Freestyle'}!"
+    if quip == "SoQuip":
+        return f"Hush now—let’s tell a {style} {genre or ''} story with a tender hand."
+    if quip == "DonQuip":
+        return f"Here’s the arrangement: a {style} {genre or ''}. We do it clean."
+    if quip == "ErrQuip":
+        return f"Loading {style}::{genre or 'Undefined'} … compiling feelings … OK-ish."
+    if quip == "McQuip":
+        return f"Right! A {style} {genre or ''}! Wait—what’s that? No, I’m ready."
+    return f"A {style} {genre or ''} begins."
+
+
+def legacy_assemble_story(style: str, genre: str, absurdity: str, narrator: str, seeds: Dict[str, str],
+                          highlight: bool = True, boldify=boldify_user_words) -> str:
+    user_words = [v for k, v in seeds.items()]
+    abs_display = absurdity
+    if absurdity.startswith("Plaidemonium"):
+        flair = random.choice([
+            "Maximum Plaidemonium™", "Beyond Maximum Plaidemonium™",
+            "Abandon-All-Logic Plaidemonium™", "Logic.exe has crashed"
+        ])
+        abs_display = flair
+
+    paragraphs = []
+    lead = legacy_story_intro_line(narrator, style, genre)
+    paragraphs.append(lead)
+
+    p1 = (
+        f"In the town of {seeds.get('place','Somewhere')}, under a {seeds.get('adjective','restless')} sky, "
+        f"a {seeds.get('profession','person')} named {seeds.get('name','Alex')} discovered a {seeds.get('object','mystery')} "
+        f"that hummed like an argument about destiny."
+    )
+    if absurdity == "Mild":
+        p1 += " The logic behaved, mostly."
+    elif absurdity == "Moderate":
+        p1 += " The physics negotiated but charged a small fee."
+    else:
+        p1 += " The laws of reality put on plaid trousers and called it a casual Friday."
+    paragraphs.append(p1)
+
+    p2 = (
+        f"Rumors spread like marmalade—sticky, bright, and impossible to ignore. "
+        f"{seeds.get('name2','Riley')} whispered of a map folded into the {seeds.get('object2','dawn')}, "
+        f"while the old clock in {seeds.get('place2','East Gate')} kept time in polite disagreements."
+    )
+    if "Ballads" in style:
+        p2 += " The town sang rhymes soft as thistle-down."
+    if "Breaking News" in style:
+        p2 = "BREAKING: Local calm disrupted by anomalous plaid event; sources contradict sources."
+    paragraphs.append(p2)
+
+    p3 = (
+        f"At last, our {seeds.get('profession','hero')} chose: step through the {seeds.get('portal','ripple')} "
+        f"or stitch the day back together with {seeds.get('tool','courage')} and {seeds.get('trait','grace')}."
+    )
+    if "Plaidemonium" in absurdity:
+        p3 += " They stepped. The world cheered in tartan."
+    else:
+        p3 += " They breathed. The page turned itself politely."
+    paragraphs.append(p3)
+
+    outro = {
+        "MacQuip": "There—we’ve tied the bow, probably around a hedgehog. Stylish, if prickly.",
+        "DJ Q'Wip": "And that’s a WRAP—bars, beats, and brave hearts!",
+        "SoQuip": "Sweet mercy, look at that: a little courage goes a long way, sugar.",
+        "DonQuip": "It’s done. Keep it between us, capisce?",
+        "ErrQuip": "Story terminated(0). Memory leak: emotions not freed.",
+        "McQuip": "We made it! I think? I think!",
+    }.get(narrator, "Fin.")
+    paragraphs.append(outro)
+
+    text = "\n\n".join(paragraphs)
+    return boldify(text, user_words) if highlight else text
+
+
+def compiled_assemble_story(style, genre, absurdity, narrator, seeds, highlight: bool = True) -> str:
+    if absurdity.startswith("Plaidemonium"):
+        random.choice(PLAIDEMONIUM_FLAIRS)
+    text = story_plan(style, absurdity, narrator).render(genre, seeds)
+    return boldify_user_words(text, seeds.values()) if highlight else text
+
+
+STYLES = ["Flash Fiction", "Ballads", "Satire & Light Parody", "Breaking News", "Scriptlets", "Noir", "Magic Realism"]
+GENRES = ["Mystery", "Fantasy", "Comedy", "Cosmic Plaid", "", None]
+ABSURDITY = ["Mild", "Moderate", "Plaidemonium™"]
+QUIPS = ["MacQuip", "DJ Q'Wip", "SoQuip", "DonQuip", "ErrQuip", "McQuip", "Guest"]
+SEED_KEYS = ["name", "profession", "place", "adjective", "object", "name2", "object2", "place2", "portal", "tool", "trait"]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="assemble_story template engine")
+    ap.add_argument("--stories", type=int, default=20000)
+    args = ap.parse_args()
+
+    rng = random.Random(5)
+    checked = 0
+    for style, genre, absurd, quip in itertools.product(STYLES, GENRES, ABSURDITY, QUIPS):
+        seeds = {k: rng.choice(["Rowan", "lantern", "", "grit (dialect spice)"]) for k in SEED_KEYS if rng.random() < 0.8}
+        random.seed(checked)
+        a = legacy_assemble_story(style, genre, absurd, quip, seeds)
+        random.seed(checked)
+        b = compiled_assemble_story(style, genre, absurd, quip, seeds)
+        assert a == b, (style, genre, absurd, quip)
+        checked += 1
+    print(f"byte-identical over {checked} combinations")
+
+    jobs = [(rng.choice(STYLES), rng.choice(GENRES), rng.choice(ABSURDITY), rng.choice(QUIPS),
+             {k: rng.choice(["Rowan", "Miri", "lantern", "ledger", "courage"]) for k in SEED_KEYS})
+            for _ in range(args.stories)]
+    for highlight in (False, True):
+        rates = []
+        for fn in (legacy_assemble_story, compiled_assemble_story):
+            t0 = time.perf_counter()
+            for style, genre, absurd, quip, seeds in jobs:
+                fn(style, genre, absurd, quip, seeds, highlight)
+            rates.append(len(jobs) / (time.perf_counter() - t0))
+        label = "with highlighting" if highlight else "templates only"
+        print(f"{label:<18} legacy {rates[0]:10.0f} stories/s  compiled {rates[1]:10.0f} stories/s  x{rates[1] / rates[0]:4.1f}")
+
+    t0 = time.perf_counter()
+    for style, genre, absurd, quip, seeds in jobs:
+        legacy_assemble_story(style, genre, absurd, quip, seeds, True, legacy_boldify_user_words)
+    before = len(jobs) / (time.perf_counter() - t0)
+    print(f"{'end to end':<18} pre-engine code {before:8.0f} stories/s (old highlighter + f-strings)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# bench/ttft.py
+# Time-to-first-token for PlaidChat: blocking persona_reply vs stream_persona_reply,
+# measured against the local OpenAI stub.
+#
+#   python -m bench.ttft --runs 10 --token-delay 0.03
+
+import argparse
+import statistics
+import time
+
+from bench.openai_stub import serve
+from plaidlibs.chat import persona_reply, stream_persona_reply
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PlaidChat time-to-first-token")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--first-token-delay", type=float, default=0.2)
+    ap.add_argument("--token-delay", type=float, default=0.03)
+    args = ap.parse_args()
+
+    from openai import OpenAI
+
+    server = serve(first_token_delay=args.first_token_delay, token_delay=args.token_delay)
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="stub")
+    history = [{"role": "user", "content": "tell me a story about a plaid otter and a lighthouse"}]
+
+    blocking, streaming, full_stream = [], [], []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        persona_reply(client, "MacQuip", history)
+        blocking.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        first = None
+        for _delta in stream_persona_reply(client, "MacQuip", history):
+            if first is None:
+                first = time.perf_counter() - t0
+        full_stream.append(time.perf_counter() - t0)
+        streaming.append(first or 0.0)
+
+    server.shutdown()
+    ms = lambda xs: f"{statistics.median(xs) * 1000:8.1f} ms"
+    print(f"blocking  first visible text (p50): {ms(blocking)}")
+    print(f"streaming first token        (p50): {ms(streaming)}")
+    print(f"streaming full reply         (p50): {ms(full_stream)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# bench/turns.py
+# Duplicate upstream calls under double-submits / mid-request reruns: each of N
+# sessions fires its turn `--dupes` times while the first is still in flight.
+#
+#   python -m bench.turns --sessions 50 --dupes 3
+
+import argparse
+import os
+import time
+
+from bench.openai_stub import serve
+from plaidlibs.chat import stream_persona_reply
+from plaidlibs.llm_client import ClientSettings, PooledClient
+from plaidlibs.turns import TurnExecutor, history_hash
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PlaidChat turn coalescing")
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--dupes", type=int, default=3)
+    ap.add_argument("--token-delay", type=float, default=0.01)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    server = serve(first_token_delay=0.1, token_delay=args.token_delay)
+    pooled = PooledClient(ClientSettings(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1"))
+    executor = TurnExecutor()
+
+    t0 = time.perf_counter()
+    jobs = []
+    for i in range(args.sessions):
+        history = [{"role": "user", "content": f"hello from session {i}"}]
+        turn = history_hash(history)
+        for _ in range(args.dupes):
+            jobs.append(executor.submit(f"s{i}", turn, lambda h=history: stream_persona_reply(pooled.client, "MacQuip", h)))
+    submit_ms = (time.perf_counter() - t0) * 1000
+    for job in jobs:
+        while not job.done:
+            job.wait(len(job.parts), timeout=0.5)
+    total_s = time.perf_counter() - t0
+
+    upstream = pooled.stats.snapshot()["requests"]
+    print(f"turn submissions : {len(jobs)} ({args.sessions} sessions x {args.dupes})")
+    print(f"upstream calls   : {upstream} (coalesced {executor.stats['coalesced']}, failed {executor.stats['failed']})")
+    print(f"script thread    : {submit_ms:.2f} ms to submit everything (replies finish off-thread in {total_s:.2f} s)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# plaidlibs/__init__.py
+# PlaidLibs™ engine helpers shared by the Streamlit app (app.py) and the
+# headless tools under bench/. Nothing in this package imports Streamlit.
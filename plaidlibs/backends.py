@@ -0,0 +1,330 @@
+# plaidlibs/backends.py
+# Pluggable PlaidChat backends. The app asks shared_backend() for one object with
+# reply() / stream() and never touches a client directly; the backend is resolved
+# once per process, so the openai package (and its client) is only imported when
+# the OpenAI backend is actually selected.
+#
+# PLAIDLIBS_CHAT_BACKEND=openai | template | auto (default). "auto" picks openai
+# when the package is installed and an API key or base URL is configured, and the
+# offline template backend otherwise. PLAIDLIBS_CHAT_FALLBACK=template (default
+# with "auto"; "none" turns it off) puts the offline backend behind the chosen
+# one for casual turns and for when the API is slow or down (FallbackBackend).
+
+import importlib.util
+import os
+import queue
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from plaidlibs.chat import CHAT_MODEL, persona_cache_key, persona_reply, stream_persona_reply
+from plaidlibs.llm_client import PooledClient, shared_client
+from plaidlibs.persona import PersonaEngine
+
+Message = Dict[str, str]
+
+_CHUNK = re.compile(r"\S+\s*")
+
+
+def _abort(stream: Any):
+    """
+    Close an openai response stream from another thread. close() alone waits for
+    the reader's blocking read to return; shutting the socket down ends it now.
+    """
+    response = getattr(stream, "response", None)
+    net = response.extensions.get("network_stream") if response is not None else None
+    sock = net.get_extra_info("socket") if net is not None else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    stream.close()
+
+
+class ChatBackend:
+    """
+    Persona replies for PlaidChat. Subclasses implement reply() or stream() (the
+    other one falls back to it); model is part of the response-cache key.
+    """
+    name = "base"
+    model = ""
+
+    def reply(self, quip: str, history: List[Message]) -> str:
+        return "".join(self.stream(quip, history)).strip()
+
+    def stream(self, quip: str, history: List[Message]) -> Iterator[str]:
+        yield self.reply(quip, history)
+
+    def open_stream(self, quip: str, history: List[Message]) -> Tuple[Iterator[str], Callable[[], None]]:
+        """
+        stream() plus a cancel() that another thread may call to abandon it
+        (here a no-op: the consumer just stops reading and closes the iterator).
+        """
+        return self.stream(quip, history), lambda: None
+
+    def status(self) -> List[str]:
+        """
+        Short sidebar lines describing the backend.
+        """
+        return []
+
+    def cacheable(self, cache_key: str) -> bool:
+        """
+        Whether the finished reply for cache_key may go into the response cache.
+        """
+        return True
+
+
+class OpenAIBackend(ChatBackend):
+    """
+    chat.completions over the process-wide pooled client (plaidlibs.llm_client).
+    """
+    name = "openai"
+    model = CHAT_MODEL
+
+    def __init__(self, pooled: Optional[PooledClient] = None):
+        self.pooled = pooled or shared_client()  # imports openai + httpx
+
+    def reply(self, quip: str, history: List[Message]) -> str:
+        return persona_reply(self.pooled.client, quip, history)
+
+    def stream(self, quip: str, history: List[Message]) -> Iterator[str]:
+        yield from stream_persona_reply(self.pooled.client, quip, history)
+
+    def open_stream(self, quip: str, history: List[Message]) -> Tuple[Iterator[str], Callable[[], None]]:
+        # cancel() closes the HTTP response (stopping generation and billing, and
+        # freeing the pooled connection), whether or not the request has returned yet
+        lock = threading.Lock()
+        state: Dict[str, Any] = {"stream": None, "cancelled": False}
+
+        def opened(stream: Any):
+            with lock:
+                state["stream"] = stream
+                cancelled = state["cancelled"]
+            if cancelled:
+                _abort(stream)
+
+        def cancel():
+            with lock:
+                state["cancelled"] = True
+                stream = state["stream"]
+            if stream is not None:
+                _abort(stream)
+
+        return stream_persona_reply(self.pooled.client, quip, history, opened), cancel
+
+    def status(self) -> List[str]:
+        s = self.pooled.stats.snapshot()
+        return [f"Pool size {self.pooled.settings.pool_size} · requests {s['requests']} · "
+                f"reused {s['reused_connections']} · new {s['new_connections']}"]
+
+
+class TemplateBackend(ChatBackend):
+    """
+    Offline, zero-dependency replies from the per-Quip persona grammar in
+    plaidlibs.persona (voice tables plus the optional PLAIDLIBS_PERSONA_CORPUS).
+    Same input, same reply.
+    """
+    name = "template"
+    model = "template"
+
+    def __init__(self, engine: Optional[PersonaEngine] = None):
+        self.engine = engine or PersonaEngine.from_env()
+
+    def reply(self, quip: str, history: List[Message]) -> str:
+        return self.engine.reply(quip, history)
+
+    def stream(self, quip: str, history: List[Message]) -> Iterator[str]:
+        yield from _CHUNK.findall(self.reply(quip, history))
+
+
+class FallbackBackend(ChatBackend):
+    """
+    Primary backend guarded by a local one. A turn is answered locally when
+      - the user's line is casual (casual_words words or fewer),
+      - the primary has no first token after first_token_timeout seconds, or fails
+        before sending one (the primary's request is cancelled), or
+      - the circuit is open: after max_failures slow/failed turns in a row, every
+        turn goes local for cooldown seconds.
+    Locally served turns are not cacheable under the primary's model (cacheable()).
+    """
+
+    def __init__(self, primary: ChatBackend, local: ChatBackend, first_token_timeout: float = 3.0,
+                 casual_words: int = 3, max_failures: int = 3, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.primary, self.local = primary, local
+        self.name = f"{primary.name}+{local.name}"
+        self.model = primary.model
+        self.first_token_timeout = first_token_timeout
+        self.casual_words = casual_words
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.open_until = 0.0
+        self.stats = {"primary": 0, "casual": 0, "slow": 0, "failed": 0, "circuit_open": 0}
+        self._local_keys: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, primary: ChatBackend, local: ChatBackend) -> "FallbackBackend":
+        """
+        PLAIDLIBS_CHAT_FIRST_TOKEN_TIMEOUT / PLAIDLIBS_CHAT_CASUAL_WORDS /
+        PLAIDLIBS_CHAT_MAX_FAILURES / PLAIDLIBS_CHAT_COOLDOWN.
+        """
+        env = os.environ.get
+        return cls(
+            primary, local,
+            first_token_timeout=float(env("PLAIDLIBS_CHAT_FIRST_TOKEN_TIMEOUT", 3.0)),
+            casual_words=int(env("PLAIDLIBS_CHAT_CASUAL_WORDS", 3)),
+            max_failures=int(env("PLAIDLIBS_CHAT_MAX_FAILURES", 3)),
+            cooldown=float(env("PLAIDLIBS_CHAT_COOLDOWN", 30.0)),
+        )
+
+    def _route(self, history: List[Message]) -> Optional[str]:
+        said = next((m["content"] for m in reversed(history) if m["role"] == "user"), "")
+        if len(said.split()) <= self.casual_words:
+            return "casual"
+        if self.clock() < self.open_until:
+            return "circuit_open"
+        return None
+
+    def _served_locally(self, reason: str, quip: str, history: List[Message]):
+        with self._lock:
+            self.stats[reason] += 1
+            if reason in ("slow", "failed"):
+                self.failures += 1
+                if self.failures >= self.max_failures:
+                    self.open_until = self.clock() + self.cooldown
+            self._local_keys[persona_cache_key(quip, history, model=self.model)] = None
+            while len(self._local_keys) > 1024:
+                self._local_keys.popitem(last=False)
+
+    def cacheable(self, cache_key: str) -> bool:
+        with self._lock:
+            if cache_key in self._local_keys:
+                del self._local_keys[cache_key]
+                return False
+            return True
+
+    def stream(self, quip: str, history: List[Message]) -> Iterator[str]:
+        reason = self._route(history)
+        if reason is None:
+            deltas: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=64)
+            stop = threading.Event()
+            replies, cancel = self.primary.open_stream(quip, history)
+
+            def put(item: Tuple[str, Any]) -> bool:
+                while not stop.is_set():
+                    try:
+                        deltas.put(item, timeout=0.1)
+                        return True
+                    except queue.Full:
+                        pass
+                return False
+
+            def pump():
+                try:
+                    for delta in replies:
+                        if not put(("delta", delta)):
+                            break
+                    else:
+                        put(("done", None))
+                except Exception as e:
+                    put(("error", e))
+                finally:
+                    close = getattr(replies, "close", None)
+                    if close:
+                        close()
+
+            threading.Thread(target=pump, name="plaidlibs-primary", daemon=True).start()
+            finished = False
+            try:
+                try:
+                    kind, value = deltas.get(timeout=self.first_token_timeout)
+                except queue.Empty:
+                    reason = "slow"
+                else:
+                    if kind == "error":
+                        reason = "failed"
+                    else:
+                        with self._lock:
+                            self.stats["primary"] += 1
+                            self.failures = 0
+                        while kind == "delta":
+                            yield value
+                            kind, value = deltas.get()
+                        finished = True
+                        if kind == "error":
+                            raise value
+                        return
+            finally:
+                if not finished:  # falling back, or the consumer stopped reading: abandon the primary
+                    stop.set()
+                    cancel()
+        self._served_locally(reason, quip, history)
+        yield from self.local.stream(quip, history)
+
+    def status(self) -> List[str]:
+        with self._lock:
+            s = dict(self.stats)
+            circuit = "open" if self.clock() < self.open_until else "closed"
+        return self.primary.status() + [
+            f"Local replies: casual {s['casual']} · slow {s['slow']} · failed {s['failed']} · "
+            f"circuit open {s['circuit_open']} · primary {s['primary']} · circuit {circuit}"
+        ]
+
+
+def openai_configured() -> bool:
+    env = os.environ.get
+    has_endpoint = env("OPENAI_API_KEY") or env("OPENAI_BASE_URL") or env("PLAIDLIBS_LLM_BASE_URL")
+    return bool(has_endpoint) and importlib.util.find_spec("openai") is not None
+
+
+# backend name -> factory; register_backend() adds more
+BACKENDS: Dict[str, Callable[[], ChatBackend]] = {
+    "openai": OpenAIBackend,
+    "template": TemplateBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], ChatBackend]):
+    BACKENDS[name] = factory
+
+
+def resolve_backend(name: Optional[str] = None) -> ChatBackend:
+    """
+    Build the backend named by `name` or PLAIDLIBS_CHAT_BACKEND ("auto" if unset).
+    """
+    env = os.environ.get
+    name = (name or env("PLAIDLIBS_CHAT_BACKEND") or "auto").strip().lower()
+    fallback = (env("PLAIDLIBS_CHAT_FALLBACK") or ("template" if name == "auto" else "none")).strip().lower()
+    if name == "auto":
+        name = "openai" if openai_configured() else "template"
+    for n in (name, fallback):
+        if n not in BACKENDS and n != "none":
+            raise ValueError(f"unknown chat backend {n!r} (have: {', '.join(sorted(BACKENDS))})")
+    backend = BACKENDS[name]()
+    if fallback in ("none", name):
+        return backend
+    return FallbackBackend.from_env(backend, BACKENDS[fallback]())
+
+
+_shared: Optional[ChatBackend] = None
+_shared_lock = threading.Lock()
+
+
+def shared_backend() -> ChatBackend:
+    """
+    Process-wide chat backend (resolved from the environment), created on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = resolve_backend()
+    return _shared
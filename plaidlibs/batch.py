@@ -0,0 +1,247 @@
+# plaidlibs/batch.py
+# Headless batch generation: drive assemble_story, generate_visual_prompt and
+# simulate_submissions from a JSONL spec, fan the work out over a process pool and
+# stream the results to JSONL. Never imports Streamlit.
+#
+#   python -m plaidlibs.batch spec.jsonl -o stories.jsonl --workers 8
+#   python -m plaidlibs.batch spec.jsonl -o stories.zip --export zip --formats md,html
+#
+# --export writes through the app's story exporter (plaidlibs.export) instead:
+# a ZIP with a file per output and format, or JSONL with Markdown/plain/HTML
+# renderings inline.
+#
+# Spec lines (one job each; "count" repeats it, "seed" makes it reproducible):
+#   {"kind": "story", "style": "Noir", "genre": "Mystery", "absurdity": "Mild",
+#    "narrator": "MacQuip", "seeds": {"name": "Rowan"}, "count": 100000, "seed": 1}
+#   {"kind": "visual_prompt", "format": "Poster", "style": "Noir", "desc": "an otter", "tags": [], "count": 10}
+#   {"kind": "submissions", "prompt": "Plaid heist", "n_players": 8, "count": 10}
+# Stories without "seeds" get random instant-mode seeds (as in Create Direct).
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing import get_context
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from plaidlibs.export import FORMATS, KINDS as KINDS_OUT, ArchiveWriter, prepare
+from plaidlibs.generators import (
+    assemble_story, fresh_seed, generate_visual_prompt, random_story_seeds, simulate_submissions,
+)
+
+KINDS = ("story", "visual_prompt", "submissions")
+Task = Tuple[int, Dict[str, Any], int, int, Optional[int]]  # spec_no, spec, start, count, base seed
+Entry = Tuple[Dict[str, Any], Any]  # export record without its text, plaidlibs.export.prepare() of it
+
+
+def render_one(spec: Dict[str, Any], rng: random.Random) -> Any:
+    """
+    Produce a single output for one spec line.
+    """
+    kind = spec.get("kind", "story")
+    if kind == "story":
+        seeds = spec.get("seeds") or random_story_seeds(rng)
+        return assemble_story(
+            spec.get("style", "Flash Fiction"), spec.get("genre", "Mystery"),
+            spec.get("absurdity", "Mild"), spec.get("narrator", "MacQuip"), seeds, rng,
+        )
+    if kind == "visual_prompt":
+        return generate_visual_prompt(
+            spec.get("format", "Poster"), spec.get("style", "Flash Fiction"),
+            spec.get("desc", ""), spec.get("tags", []), rng,
+        )
+    if kind == "submissions":
+        return simulate_submissions(spec.get("prompt", ""), int(spec.get("n_players", 4)), rng)
+    raise ValueError(f"unknown kind {kind!r} (expected one of {', '.join(KINDS)})")
+
+
+def _run_chunk(task: Task) -> Tuple[int, str, int, float]:
+    """
+    Worker body: render `count` outputs starting at index `start` and return them as
+    one pre-serialized JSONL block (one pickle per chunk, not per story).
+    """
+    spec_no, spec, start, count, seed = task
+    rng = random.Random(f"{seed}:{spec_no}:{start}" if seed is not None else fresh_seed())
+    t0 = time.perf_counter()
+    lines = []
+    kind = spec.get("kind", "story")
+    for i in range(start, start + count):
+        lines.append(json.dumps({"spec": spec_no, "i": i, "kind": kind, "output": render_one(spec, rng)},
+                                ensure_ascii=False))
+    lines.append("")
+    return os.getpid(), "\n".join(lines), count, time.perf_counter() - t0
+
+
+def output_text(spec: Dict[str, Any], output: Any) -> str:
+    """
+    An output as the text an export renders (submissions become one line per player).
+    """
+    if isinstance(output, str):
+        return output
+    return "\n".join(f"{s['player']}: {', '.join(s['adjs'])} {', '.join(s['nouns'])} + {s['wild']}" for s in output)
+
+
+def _title(spec_no: int, spec: Dict[str, Any], i: int) -> str:
+    kind = spec.get("kind", "story")
+    if kind == "story":
+        label = f"{spec.get('style', 'Flash Fiction')} {spec.get('genre', 'Mystery')}"
+    elif kind == "visual_prompt":
+        label = f"{spec.get('format', 'Poster')} {spec.get('style', 'Flash Fiction')}"
+    else:
+        label = f"Submissions {spec.get('prompt', '')}".strip()
+    return f"{label} ({spec_no}.{i})"
+
+
+def _export_chunk(archive: str, formats: Sequence[str], task: Task) -> Tuple[int, List[Entry], int, float]:
+    """
+    Worker body for --export: like _run_chunk, but each output comes back
+    rendered and compressed (plaidlibs.export.prepare) next to its record's
+    metadata, so the parent only writes bytes.
+    """
+    spec_no, spec, start, count, seed = task
+    rng = random.Random(f"{seed}:{spec_no}:{start}" if seed is not None else fresh_seed())
+    t0 = time.perf_counter()
+    kind = spec.get("kind", "story")
+    entries = []
+    for i in range(start, start + count):
+        meta = {"spec": spec_no, "i": i, "kind": kind, "title": _title(spec_no, spec, i)}
+        entries.append((meta, prepare(dict(meta, text=output_text(spec, render_one(spec, rng))), archive, formats)))
+    return os.getpid(), entries, count, time.perf_counter() - t0
+
+
+def _tasks(specs: Iterable[Dict[str, Any]], chunk_size: int, seed: Optional[int]) -> Iterator[Task]:
+    for spec_no, spec in enumerate(specs):
+        if spec.get("kind", "story") not in KINDS:
+            raise ValueError(f"spec {spec_no}: unknown kind {spec.get('kind')!r}")
+        count = int(spec.get("count", 1))
+        spec_seed = spec.get("seed", seed)
+        for start in range(0, count, chunk_size):
+            yield spec_no, spec, start, min(chunk_size, count - start), spec_seed
+
+
+@dataclass
+class BatchReport:
+    outputs: int = 0
+    seconds: float = 0.0
+    per_worker: Dict[int, Dict[str, float]] = field(default_factory=dict)  # pid → outputs / busy seconds
+    bytes_out: int = 0  # export archives only
+
+    @property
+    def rate(self) -> float:
+        return self.outputs / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        lines = [f"{self.outputs} outputs in {self.seconds:.2f}s ({self.rate:,.0f}/s, {len(self.per_worker)} workers)"]
+        if self.bytes_out and self.seconds:
+            lines[0] += f", {self.bytes_out / 1e6:.1f} MB written ({self.bytes_out / 1e6 / self.seconds:.1f} MB/s)"
+        for pid, w in sorted(self.per_worker.items()):
+            rate = w["outputs"] / w["busy"] if w["busy"] else 0.0
+            lines.append(f"  worker {pid}: {int(w['outputs'])} outputs, {w['busy']:.2f}s busy, {rate:,.0f}/s")
+        return "\n".join(lines)
+
+
+def run_batch(specs: Iterable[Dict[str, Any]], out: TextIO, workers: Optional[int] = None,
+              chunk_size: int = 2000, seed: Optional[int] = None, ordered: bool = False) -> BatchReport:
+    """
+    Render every spec line and write one JSON object per output to `out`.
+    workers=1 runs in-process (handy for profiling); otherwise a process pool over
+    all cores. Results are streamed as chunks finish, so memory stays bounded.
+    """
+    return _drive(_run_chunk, _tasks(specs, chunk_size, seed), out.write, workers, ordered)
+
+
+def export_batch(specs: Iterable[Dict[str, Any]], out: BinaryIO, kind: str = "zip",
+                 formats: Sequence[str] = FORMATS, workers: Optional[int] = None, chunk_size: int = 2000,
+                 seed: Optional[int] = None, ordered: bool = False) -> BatchReport:
+    """
+    run_batch, written as an export archive (ZIP or JSONL, see plaidlibs.export)
+    to a binary stream. Workers render and compress; this process writes the
+    entries out as chunks finish.
+    """
+    t0 = time.perf_counter()
+    writer = ArchiveWriter(out, kind, formats)
+
+    def write(entries: List[Entry]):
+        for meta, prepared in entries:
+            writer.add(meta, prepared)
+
+    worker = partial(_export_chunk, kind, tuple(formats))
+    report = _drive(worker, _tasks(specs, chunk_size, seed), write, workers, ordered)
+    writer.close()
+    report.seconds = time.perf_counter() - t0
+    report.bytes_out = writer.bytes_out
+    return report
+
+
+def _drive(worker, tasks: Iterator[Task], write, workers: Optional[int], ordered: bool) -> BatchReport:
+    report = BatchReport()
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    def consume(results: Iterable[Tuple[int, Any, int, float]]):
+        for pid, block, count, busy in results:
+            write(block)
+            report.outputs += count
+            w = report.per_worker.setdefault(pid, {"outputs": 0, "busy": 0.0})
+            w["outputs"] += count
+            w["busy"] += busy
+
+    if workers == 1:
+        consume(map(worker, tasks))
+    else:
+        with get_context("spawn").Pool(workers) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            consume(imap(worker, tasks))
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def iter_specs(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for n, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"spec line {n}: {e}") from None
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(prog="python -m plaidlibs.batch", description="Headless PlaidLibs batch generation")
+    ap.add_argument("spec", help="JSONL spec file ('-' for stdin)")
+    ap.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout)")
+    ap.add_argument("-w", "--workers", type=int, default=None, help="processes (default: all cores)")
+    ap.add_argument("--chunk-size", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=None, help="base seed for specs without their own")
+    ap.add_argument("--ordered", action="store_true", help="write chunks in spec order")
+    ap.add_argument("--export", choices=KINDS_OUT, default=None,
+                    help="write an export archive (Markdown/plain/HTML renderings) instead of raw JSONL")
+    ap.add_argument("--formats", default=",".join(FORMATS), help="renderings for --export (comma-separated)")
+    args = ap.parse_args(argv)
+
+    spec_file = sys.stdin if args.spec == "-" else open(args.spec, encoding="utf-8")
+    if args.export:
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        if args.export:
+            report = export_batch(iter_specs(spec_file), out, args.export, args.formats.split(","), args.workers,
+                                  args.chunk_size, args.seed, args.ordered)
+        else:
+            report = run_batch(iter_specs(spec_file), out, args.workers, args.chunk_size, args.seed, args.ordered)
+    finally:
+        if spec_file is not sys.stdin:
+            spec_file.close()
+        if out not in (sys.stdout, sys.stdout.buffer):
+            out.close()
+    print(report.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
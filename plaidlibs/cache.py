@@ -0,0 +1,162 @@
+# plaidlibs/cache.py
+# LRU + TTL response cache for PlaidChat: an in-memory tier per process and an
+# optional SQLite tier (WAL mode) that several worker processes can share.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+_WS = re.compile(r"\s+")
+_EDGE_PUNCT = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def normalize_text(text: str) -> str:
+    """
+    "  Hi!! " and "hi" should share an entry: casefold, collapse whitespace,
+    strip leading/trailing punctuation.
+    """
+    return _EDGE_PUNCT.sub("", _WS.sub(" ", text.casefold()).strip())
+
+
+def response_key(quip: str, system_prompt: str, messages: List[Dict[str, str]], model: str,
+                 temperature: float, last_k: int = 2) -> str:
+    """
+    Cache key over (quip, system prompt, normalized last-k messages, model, temperature bucket).
+    """
+    tail = [(m["role"], normalize_text(m["content"])) for m in messages[-last_k:]] if last_k > 0 else []
+    raw = json.dumps([quip, system_prompt, tail, model, round(temperature, 1)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    get/set keyed by response_key(). Memory tier is an OrderedDict in LRU order;
+    entries expire ttl seconds after being stored. A memory miss falls through to
+    SQLite (if configured) and promotes the row back into memory.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, sqlite_path: Optional[str] = None,
+                 max_disk_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._mem: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0, "sets": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self.sqlite_path = sqlite_path
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses(used_at)")
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """
+        PLAIDLIBS_CACHE_MAX / PLAIDLIBS_CACHE_TTL / PLAIDLIBS_CACHE_SQLITE (path enables the disk tier).
+        """
+        env = os.environ.get
+        return cls(
+            max_entries=int(env("PLAIDLIBS_CACHE_MAX", 1024)),
+            ttl=float(env("PLAIDLIBS_CACHE_TTL", 3600)),
+            sqlite_path=env("PLAIDLIBS_CACHE_SQLITE") or None,
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                value, expires_at = hit
+                if expires_at > now:
+                    self._mem.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._mem[key]
+                self.stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+                    self._put_mem(key, row[0], row[1])
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                    return row[0]
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._put_mem(key, value, expires_at)
+            self.stats["sets"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+                if self.stats["sets"] % 256 == 0:
+                    self._prune_disk(now)
+
+    def _put_mem(self, key: str, value: str, expires_at: float):
+        self._mem[key] = (value, expires_at)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _prune_disk(self, now: float):
+        cur = self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self.stats["expired"] += max(cur.rowcount, 0)
+        cur = self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+        self.stats["evictions"] += max(cur.rowcount, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.stats)
+            out["entries"] = len(self._mem)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate_pct"] = round(100 * out["hits"] / lookups) if lookups else 0
+        return out
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+
+_shared: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> ResponseCache:
+    """
+    Process-wide ResponseCache (configured from the environment), created on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = ResponseCache.from_env()
+    return _shared
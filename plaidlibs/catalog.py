@@ -0,0 +1,139 @@
+# plaidlibs/catalog.py
+# Data tables shared by the workflows: workflow and narrator names, menus, word
+# pools and fixed remix seeds. Plain tuples/lists/dicts, no behaviour; imported
+# once per process instead of being rebuilt on every Streamlit rerun.
+
+WORKFLOWS = [
+    "Lib-Ate",
+    "Create Direct",
+    "Storyline",
+    "PlaidPic",
+    "PlaidMagGen",
+    "PlaidPlay",
+    "PlaidChat",
+]
+
+QUIPS = [
+    "MacQuip",      # default narrator/host
+    "DJ Q'Wip",
+    "SoQuip",
+    "DonQuip",
+    "ErrQuip",
+    "McQuip",
+]
+
+QUIP_GREETINGS = {
+    "MacQuip": "Oh hello. Another brilliant human. Chaos? Romance? Frogs in power suits?",
+    "DJ Q'Wip": "YO YO YO! DJ Q'Wip in the house! Ready to DROP some tales?",
+    "SoQuip": "Well now, darlin’, let’s ease in like a summer porch swing.",
+    "DonQuip": "Sit down. You came to the right guy. Let’s make a story deal.",
+    "ErrQuip": "Greetings. You smell like plot holes. Specify function: entertainment().",
+    "McQuip": "Aye! Am I greeting you or are you greeting me? Either way—hello!",
+}
+
+ABSURDITY_LEVELS = ["Mild", "Moderate", "Plaidemonium™", "Wild Card"]
+ABSURDITY_CHOICES = {"1": "Mild", "2": "Moderate", "3": "Plaidemonium™", "4": "Wild Card"}
+WILD_ABSURDITY = ["Mild", "Moderate", "Plaidemonium™"]
+
+IMAGE_TAGS = [
+    "Focus on Emotion",
+    "Cinematic Lighting",
+    "Showcase Plaid Clothing",
+    "Add Hidden Detail/Easter Egg",
+    "Add Surreal Element",
+    "Zoomed Portrait / Close Crop",
+    "No Extra Tags",
+]
+
+VISUAL_FORMATS = ["Poster", "3-Panel Comic", "Magazine Cover", "Storyboard (3 frames)", "Trading Card"]
+
+STYLES = [
+    ("Flash Fiction", "Short, complete narrative"),
+    ("Ballads", "Poetic, musical storytelling"),
+    ("Satire & Light Parody", "Humorous mockery"),
+    ("Breaking News", "Headline report format"),
+    ("Scriptlets", "Mini-play with dialogue"),
+    ("Epistolary", "Told via letters/messages"),
+    ("Mythic", "Grand, timeless cadence"),
+    ("Noir", "Moody, hardboiled narration"),
+    ("Magic Realism", "Subtle magic in the ordinary"),
+    ("Travelogue", "Journey told through stops"),
+]
+
+CORE_GENRES = [
+    ("Mystery", "Whodunnit, clues, reveals"),
+    ("Adventure", "Quests, journeys, tight escapes"),
+    ("Horror", "Dread, uncanny turns"),
+    ("Romance", "Hearts, pining, swoons"),
+    ("Sci-Fi", "Tech, futures, what-ifs"),
+    ("Fantasy", "Magic, prophecies, dragons"),
+]
+
+FLEX_GENRES = [
+    ("Fable", "Talking beasts with morals"),
+    ("Fairy Tale", "Once-upon-a-time with a twist"),
+    ("Comedy", "Jokes, timing, banter"),
+    ("Slice of Life", "Quiet moments, big feelings"),
+]
+
+PLAIDVERSE = [
+    ("Plaidverse Caper", "Tartan-powered shenanigans"),
+    ("Cosmic Plaid", "Interdimensional tartans collide"),
+]
+
+ALL_GENRES = CORE_GENRES + FLEX_GENRES + PLAIDVERSE
+
+# Lib-Ate step 1 has a fixed menu; the other workflows draw plaidlibs.menus.draw_styles()
+LIBATE_STYLE_MAP = {
+    "1": "Flash Fiction",
+    "2": "Ballads",
+    "3": "Satire & Light Parody",
+    "4": "Breaking News",
+    "5": "Scriptlets",
+    "6": "Wild Card",
+    "7": "Reshuffle",
+}
+
+REMIX_STYLES = ["Ballads", "Breaking News", "Scriptlets", "Flash Fiction"]
+
+# Lib-Ate word collection: (seed key, prompt title, hint)
+LIBATE_PROMPTS = [
+    ("name", "Name (proper noun)", "Think protagonist: e.g., ‘Rowan’"),
+    ("profession", "Profession (noun)", "Detective, baker, cartographer…"),
+    ("place", "Place (noun)", "City, valley, ship, café…"),
+    ("adjective", "Adjective", "Moody, iridescent, stubborn…"),
+    ("object", "Object (noun)", "Lantern, violin, ledger…"),
+    ("name2", "Second character name", "Rival or ally"),
+    ("object2", "Second object (noun)", "Key, coin, compass…"),
+    ("place2", "Second place (noun)", "Square, market, jetty…"),
+    ("portal", "Portal/threshold (noun)", "Doorway, ripple, curtain…"),
+    ("tool", "Tool/aid (abstract ok)", "Courage, compass, trick…"),
+    ("trait", "Virtue/trait", "Grace, grit, candor…"),
+    ("wild", "Wildcard word/phrase", "Anything at all"),
+]
+
+# "surprise me" answers for Lib-Ate prompts
+SURPRISE_WORDS = [
+    "Rowan","Harper","Alex","Miri","Sable","Juno","Isla","Orion",
+    "astronomer","baker","tinkerer","ranger","scribe",
+    "Dockside","Northbridge","Glimmerfall","Moonmarket",
+    "tattered","luminous","sardonic","restless",
+    "compass","ledger","lantern","accordion","vending machine",
+    "Riley","Kestrel","Nico","Vee",
+    "map","coin","hourglass","key",
+    "Rookery","East Gate","Sun Stairs","Old Yard",
+    "ripple","threshold","curtain","vellum",
+    "courage","wit","stubbornness","luck",
+    "grace","grit","candor","pluck",
+    "confetti rain","time hiccup","snack-based destiny",
+]
+
+# Fixed seed words for remixes that don't reuse the user's words (copy before editing)
+REMIX_SEEDS = {
+    "name":"Remy","profession":"wanderer","place":"Plaidshire","adjective":"zany","object":"teacup",
+    "name2":"Quinn","object2":"ticket","place2":"Clocktower","portal":"mirror","tool":"pluck","trait":"wit",
+}
+PLAIDEMONIUM_SEEDS = {
+    "name":"Zee","profession":"chaos technician","place":"Tartanverse","adjective":"unruly","object":"plaid coil",
+    "name2":"Kestrel","object2":"map","place2":"Sun Stairs","portal":"ripple","tool":"audacity","trait":"grit",
+}
@@ -0,0 +1,84 @@
+# plaidlibs/chat.py
+# PlaidChat persona replies (blocking + streaming) over an OpenAI-compatible client.
+
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from plaidlibs.cache import response_key
+
+CHAT_MODEL = "gpt-4o-mini"  # can switch to "gpt-4o" for stronger replies
+CHAT_MAX_TOKENS = 300
+CHAT_TEMPERATURE = 0.9
+
+
+def persona_system_prompt(quip: str) -> str:
+    return (
+        f"You are {quip}, a playful narrator with a unique personality. "
+        f"Stay in character and respond in a conversational way, like ChatGPT, "
+        f"but flavored with the humor and quirks of {quip}. "
+        f"Keep responses concise, engaging, and context-aware."
+    )
+
+
+def persona_messages(quip: str, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Build the chat.completions message list: persona system prompt + prior conversation.
+    """
+    messages = [{"role": "system", "content": persona_system_prompt(quip)}]
+    for m in history:
+        # system entries are HistoryWindow summaries; anything else non-assistant is the user
+        role = m["role"] if m["role"] in ("assistant", "system") else "user"
+        messages.append({"role": role, "content": m["content"]})
+    return messages
+
+
+def persona_cache_key(quip: str, history: List[Dict[str, str]], last_k: int = 2, model: str = CHAT_MODEL) -> str:
+    """
+    ResponseCache key for the reply persona_reply (or the chat backend serving
+    `model`) would produce for this history.
+    """
+    return response_key(quip, persona_system_prompt(quip), history, model, CHAT_TEMPERATURE, last_k)
+
+
+def persona_reply(client: Any, quip: str, history: List[Dict[str, str]]) -> str:
+    """
+    Generate a persona-style reply using conversation history + narrator quip.
+    Blocks until the whole reply is back.
+    """
+    response = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=persona_messages(quip, history),
+        max_tokens=CHAT_MAX_TOKENS,
+        temperature=CHAT_TEMPERATURE,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def stream_persona_reply(client: Any, quip: str, history: List[Dict[str, str]],
+                         opened: Optional[Callable[[Any], None]] = None) -> Iterator[str]:
+    """
+    Same request as persona_reply, but with stream=True: yields text deltas as the
+    server sends them so the UI can paint the first tokens immediately.
+    opened(stream) gets the response stream as soon as the request returns, so
+    another thread can close() it to abandon the reply.
+    """
+    stream = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=persona_messages(quip, history),
+        max_tokens=CHAT_MAX_TOKENS,
+        temperature=CHAT_TEMPERATURE,
+        stream=True,
+    )
+    if opened:
+        opened(stream)
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    finally:
+        # Release the HTTP connection even if the consumer stops early.
+        close = getattr(stream, "close", None)
+        if close:
+            close()
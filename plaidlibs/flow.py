@@ -0,0 +1,79 @@
+# plaidlibs/flow.py
+# Declarative step machine for the step-by-step workflows. Each workflow is a
+# dict of step key -> Step(render, validate, advance); run_flow() renders the
+# current step and, after a valid submission, renders the next step in the same
+# script run instead of storing the step and calling st.rerun(). A rerun is only
+# requested when a step has to redraw its own widgets (reshuffles), since
+# Streamlit does not allow the same widget twice in one run.
+#
+# GLOBAL["MENUS"] (plaidlibs.menus) belongs to the current step: it is emptied
+# whenever the flow moves on to another step, so each step entry draws afresh.
+#
+# Streamlit-free: the view passes in how to open a frame, show an error and rerun.
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, MutableMapping, Optional, Union
+
+StepKey = Union[int, float]  # 1.5 is a sub-step (Lib-Ate's reshuffled style menu)
+
+
+def _no_errors(value: Any) -> Optional[str]:
+    return None
+
+
+def _stay(value: Any) -> Optional[StepKey]:
+    return None
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    render() draws the step and returns the submitted input, or None while waiting.
+    validate(input) returns an error message for bad input. advance(input) applies a
+    valid input and returns the next step key (None stays on this step).
+    """
+    render: Callable[[], Any]
+    advance: Callable[[Any], Optional[StepKey]] = _stay
+    validate: Callable[[Any], Optional[str]] = _no_errors
+    keep: bool = False        # leave this step on screen and render the next one below it
+    completes: bool = False   # entering this step finishes a story / spec / round
+    reentrant: bool = False   # widgets are keyed per pass, so the step can render twice in one run
+
+
+def run_flow(steps: Dict[StepKey, Step], global_state: MutableMapping[str, Any],
+             frame: Callable[[], Any], show_error: Callable[[str], Any], rerun: Callable[[], Any],
+             max_hops: int = 8):
+    """
+    Render GLOBAL["CURRENT_STEP"] and follow transitions within this run.
+
+    frame() returns a placeholder with .container() (st.empty): a step that is left
+    behind has its placeholder refilled by the next step, unless it is marked keep.
+    """
+    key = global_state["CURRENT_STEP"]
+    slot = frame()
+    for _ in range(max_hops):
+        step = steps[key]
+        with slot.container():
+            value = step.render()
+            if value is None:
+                return
+            error = step.validate(value)
+            if error:
+                show_error(error)
+                return
+            nxt = step.advance(value)
+        if nxt is None:
+            return
+        # advance() may have reset the workflow; the transition still wins
+        global_state["CURRENT_STEP"] = nxt
+        if nxt != key and global_state.get("MENUS"):
+            global_state["MENUS"].clear()
+        if steps[nxt].completes:
+            global_state["STORIES"] = global_state.get("STORIES", 0) + 1
+        if nxt == key and not step.reentrant:
+            rerun()
+            return
+        if step.keep:
+            slot = frame()
+        key = nxt
+    rerun()  # runaway chain of auto-advancing steps; let the next run continue
@@ -0,0 +1,182 @@
+# plaidlibs/generators.py
+# Menu, story, visual-prompt and PlaidPlay generators (lightweight templates). Pure
+# Python, no Streamlit, so the app, the batch CLI and the benchmarks share one
+# implementation.
+#
+# Every generator takes an explicit `rng` (a random.Random). The same inputs and the
+# same seed give the same output, and concurrent sessions never share RNG state.
+# Without one they fall back to the module-level RNG.
+
+import random
+import re
+import secrets
+from typing import Any, Dict, List, Optional
+
+from plaidlibs.catalog import QUIP_GREETINGS
+from plaidlibs.highlight import boldify_user_words
+from plaidlibs.menus import draw_genres, draw_styles
+from plaidlibs.tally import FIRST_POINTS, SECOND_POINTS, Ballot
+from plaidlibs.templates import PLAIDEMONIUM_FLAIRS, intro_plan, story_plan
+
+SEED_BITS = 32
+
+
+def fresh_seed() -> int:
+    """
+    New seed from OS entropy (never from a shared RNG, so sessions can't correlate).
+    """
+    return secrets.randbits(SEED_BITS)
+
+
+def quip_greeting(quip: str) -> str:
+    return QUIP_GREETINGS.get(quip, QUIP_GREETINGS["MacQuip"])
+
+
+def pick_random_styles(n=5, rng: Optional[random.Random] = None):
+    return list(draw_styles(rng, n).options)
+
+
+def genre_menu_block(rng: Optional[random.Random] = None):
+    # 3 core + 2 flexible + 1 plaidverse = 6 + Wild + Reshuffle (the app keeps a Menu instead)
+    menu = draw_genres(rng)
+    labels = menu.names() + list(menu.extras)
+    return menu.text, {str(i): label for i, label in enumerate(labels, 1)}
+
+
+def story_intro_line(quip: str, style: str, genre: Optional[str] = None) -> str:
+    return intro_plan(quip, style).render(genre, {})
+
+
+def assemble_story(style: str, genre: str, absurdity: str, narrator: str, seeds: Dict[str, str],
+                   rng: Optional[random.Random] = None) -> str:
+    # Paragraph templates live in plaidlibs.templates; the (style, absurdity, narrator)
+    # plan is compiled once and cached, so this is just slot filling + highlighting.
+    if absurdity.startswith("Plaidemonium"):
+        # Flair label draw: unused in the text, but kept so the RNG sequence is unchanged
+        (rng or random).choice(PLAIDEMONIUM_FLAIRS)
+    text = story_plan(style, absurdity, narrator).render(genre, seeds)
+    return boldify_user_words(text, seeds.values())
+
+
+def generate_visual_prompt(format_name: str, style_name: str, desc: str, tags: List[str],
+                           rng: Optional[random.Random] = None) -> str:
+    base = f"[VISUAL CONFIGURATION]\nFormat: {format_name}\nStyle: {style_name}\n"
+    base += f'Description: "{desc.strip()}"\nEnhancements: {", ".join(tags) if tags else "None"}\n\n'
+    base += "Constraints: Bright white background; visible plaid elements where appropriate; match selected style.\n"
+    base += "\nShort creative blurb:\n"
+    base += (rng or random).choice([
+        "Crisp light cuts across tartan seams as motion freezes the moment before chaos.",
+        "A clean white field, plaid accents pulsing like a heartbeat in negative space.",
+        "Plaid lines anchor a surreal cascade of character and scene, luminous and bold.",
+    ])
+    return base
+
+
+# PlaidPlay submission vocabulary (also sampled by plaidlibs.lobby)
+SUBMISSION_NOUNS = ["otter", "eclipse", "engine", "parka", "nebula", "plaid", "vending machine", "lighthouse",
+                    "accordion"]
+SUBMISSION_ADJS = ["sardonic", "luminous", "rickety", "whispering", "clockwork", "minty", "chaotic"]
+SUBMISSION_WILDS = ["time hiccup", "snack-based destiny", "gravity is optional", "confetti rain", "stage whisper"]
+
+
+def simulate_submissions(prompt: str, n_players: int, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
+    rng = rng or random
+    subs = []
+    for i in range(n_players):
+        sub = {
+            "player": f"Player {i+1}",
+            "nouns": rng.sample(SUBMISSION_NOUNS, 3),
+            "adjs": rng.sample(SUBMISSION_ADJS, 2),
+            "wild": rng.choice(SUBMISSION_WILDS),
+        }
+        subs.append(sub)
+    return subs
+
+
+def simulate_ballots(n_players: int, rng: Optional[random.Random] = None) -> List[Ballot]:
+    """
+    6-10 voting rounds, one ranked ballot each: (first, second) as player indices,
+    second None with a single player.
+    """
+    rng = rng or random
+    ballots = []
+    for _ in range(rng.randint(6, 10)):
+        ranked = rng.sample(range(n_players), k=min(4, n_players))
+        if ranked:
+            ballots.append((ranked[0], ranked[1] if len(ranked) >= 2 else None))
+    return ballots
+
+
+def tally_votes(submissions: List[Dict[str, Any]], rng: Optional[random.Random] = None) -> Dict[str, int]:
+    # Simple simulated voting: random points with slight bias toward higher variety
+    tally = {s["player"]: 0 for s in submissions}
+    players = list(tally.keys())
+    for first, second in simulate_ballots(len(players), rng):
+        tally[players[first]] += FIRST_POINTS
+        if second is not None: tally[players[second]] += SECOND_POINTS
+    return tally
+
+
+def random_story_seeds(rng: Optional[random.Random] = None) -> Dict[str, str]:
+    """
+    Instant-mode seed words (Create Direct and the batch CLI when no seeds are given).
+    """
+    rng = rng or random
+    return {
+        "name": rng.choice(["Rowan","Alex","Miri","Jax"]),
+        "profession": rng.choice(["astronomer","baker","tinkerer","ranger"]),
+        "place": rng.choice(["Harborlight","Northbridge","Glimmerfall"]),
+        "adjective": rng.choice(["restless","luminous","sardonic"]),
+        "object": rng.choice(["lantern","ledger","compass"]),
+        "name2": rng.choice(["Riley","Kestrel","Vee"]),
+        "object2": rng.choice(["map","coin","hourglass"]),
+        "place2": rng.choice(["East Gate","Sun Stairs","Old Yard"]),
+        "portal": rng.choice(["ripple","curtain","threshold"]),
+        "tool": rng.choice(["courage","wit","stubbornness"]),
+        "trait": rng.choice(["grace","grit","candor"]),
+    }
+
+
+def seeds_from_concept(txt: str, rng: Optional[random.Random] = None) -> Dict[str, str]:
+    """
+    Storyline seed words: name, profession, place and adjective are lifted from the
+    user's concept when present, the rest are drawn at random.
+    """
+    rng = rng or random
+    words = re.findall(r"[A-Za-z']+", txt)
+    caps = re.findall(r"\b[A-Z][a-z']+\b", txt)
+    name = caps[0] if caps else rng.choice(["Rowan","Alex","Miri","Jax"])
+    professions = ["baker","astronomer","detective","ranger","scribe","cartographer","librarian","sailor","pilot"]
+    prof = None
+    for w in words:
+        if w.lower() in professions:
+            prof = w.lower()
+            break
+        if w.endswith("er") and len(w) > 4:
+            prof = w.lower()
+            break
+    prof = prof or rng.choice(professions)
+    place = None
+    m = re.search(r"\b(in|at|under|inside|near)\s+([A-Za-z][A-Za-z\s']{2,})", txt, flags=re.IGNORECASE)
+    if m:
+        place = m.group(2).strip().split()[0:2]
+        place = " ".join(place)
+    place = place or rng.choice(["Harborlight","Northbridge","Glimmerfall","Dockside"])
+    adjectives = ["restless","luminous","sardonic","tattered","iridescent"]
+    adj = None
+    for w in words:
+        if w.lower() in adjectives:
+            adj = w.lower(); break
+    adj = adj or rng.choice(adjectives)
+    obj = rng.choice(["lantern","ledger","compass","violin","coin","hourglass"])
+    name2 = rng.choice(["Riley","Kestrel","Vee","Nico"])
+    obj2 = rng.choice(["map","key","ticket","note"])
+    place2 = rng.choice(["East Gate","Old Yard","Sun Stairs"])
+    portal = rng.choice(["ripple","threshold","curtain"])
+    tool = rng.choice(["courage","wit","stubbornness"])
+    trait = rng.choice(["grace","grit","candor"])
+    return {
+        "name": name, "profession": prof, "place": place, "adjective": adj, "object": obj,
+        "name2": name2, "object2": obj2, "place2": place2, "portal": portal, "tool": tool, "trait": trait,
+        "wild": rng.choice(["confetti rain","time hiccup","snack-based destiny"]),
+    }
@@ -0,0 +1,185 @@
+# plaidlibs/highlight.py
+# Single-pass **bold** highlighter for user seed words.
+#
+# The story is marked in one left-to-right pass over the text for the whole seed
+# set (instead of one re.sub per word), so already-wrapped text is never re-scanned.
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+_END = ""  # trie key marking "a seed ends here"
+# Non-ASCII characters that re.IGNORECASE matches against ASCII letters but that
+# str.lower() leaves alone (dotless i, long s); their presence disables the fast path.
+_ASCII_ALIASES = ("\u0131", "\u017f")
+_WORD_RUN = re.compile(r"\w+")
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _fold(ch: str) -> str:
+    low = ch.lower()
+    return low if len(low) == 1 else ch
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """
+    Regex for a trie node. Longer continuations come first and the "end here"
+    option is a trailing `?`, so at any position the longest seed is tried first
+    and shorter ones only on backtracking (e.g. when the closing \\b fails).
+    """
+    alts = []
+    for ch in sorted(k for k in node if k != _END):
+        child = node[ch]
+        chunk = [re.escape(ch)]
+        # Path-compress single-child chains (keeps recursion shallow for long seeds)
+        while len(child) == 1 and _END not in child:
+            (nxt, child), = child.items()
+            chunk.append(re.escape(nxt))
+        alts.append("".join(chunk) + _trie_pattern(child))
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    if _END in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class Highlighter:
+    """
+    Matcher for one seed set. Matches keep the old boldify_user_words semantics:
+    case-insensitive, whole words (\\b on both sides), longest seed wins, and the
+    replacement uses the seed's own spelling.
+
+    Strategies:
+      - ASCII seeds: trie regex over the lowercased text. For word seeds (starting
+        and ending with a word character) the first use is a scan of \\w+ runs
+        with a dict lookup instead, so one-off seed sets never pay for a compile;
+      - anything else: the same trie regex with re.IGNORECASE.
+    Regexes are compiled lazily, only for seed sets that need them.
+    """
+
+    def __init__(self, words: Tuple[str, ...]):
+        self.words = words
+        self._ascii = bool(words) and all(w.isascii() for w in words)
+        self._spelling: Dict[str, str] = {}
+        for w in words:
+            self._spelling.setdefault(w.lower() if self._ascii else "".join(_fold(c) for c in w), w)
+        self._by_first: Optional[Dict[str, List[str]]] = None
+        if self._ascii and all(_WORD_CHAR.match(k[0]) and _WORD_CHAR.match(k[-1]) for k in self._spelling):
+            self._by_first = {}
+            for key in self._spelling:  # already longest-first
+                self._by_first.setdefault(_WORD_RUN.match(key).group(0), []).append(key)
+        self._pattern: Optional[Pattern] = None
+        self._ascii_pattern: Optional[Pattern] = None
+        self._uses = 0
+
+    def _source(self) -> str:
+        trie: Dict[str, dict] = {}
+        for key in self._spelling:
+            node = trie
+            for c in key:
+                node = node.setdefault(c, {})
+            node[_END] = {}
+        return r"\b" + _trie_pattern(trie) + r"\b"
+
+    @property
+    def pattern(self) -> Pattern:
+        if self._pattern is None:
+            self._pattern = re.compile(self._source(), re.IGNORECASE)
+        return self._pattern
+
+    @property
+    def ascii_pattern(self) -> Pattern:
+        if self._ascii_pattern is None:
+            self._ascii_pattern = re.compile(self._source())
+        return self._ascii_pattern
+
+    def _seed_for(self, matched: str) -> str:
+        w = self._spelling.get("".join(_fold(c) for c in matched))
+        if w is not None:
+            return w
+        for w in self.words:  # exotic case folds (e.g. ß/SS) the fast lookup can't see
+            if re.fullmatch(re.escape(w), matched, re.IGNORECASE):
+                return w
+        return matched
+
+    def _spans(self, low: str) -> Iterator[Tuple[int, int, str]]:
+        # The token scan costs about as much as one regex compile, so it serves
+        # one-off seed sets (batch runs); a set seen again gets the compiled regex.
+        self._uses += 1
+        if self._by_first is None or self._uses > 1:
+            for m in self.ascii_pattern.finditer(low):
+                yield m.start(), m.end(), m.group(0)
+            return
+        by_first, n, pos = self._by_first, len(low), 0
+        for m in _WORD_RUN.finditer(low):
+            start = m.start()
+            if start < pos:
+                continue
+            for key in by_first.get(m.group(0), ()):
+                end = start + len(key)
+                if low.startswith(key, start) and (end == n or not _WORD_CHAR.match(low, end)):
+                    yield start, end, key
+                    pos = end
+                    break
+
+    def _fast_spans(self, text: str) -> Optional[List[Tuple[int, int, str]]]:
+        # For ASCII seeds, matching the lowercased text exactly is equivalent to
+        # IGNORECASE as long as lowering keeps offsets; None when that doesn't hold.
+        low = text.lower()
+        if self._ascii and len(low) == len(text) and (text.isascii() or not any(a in text for a in _ASCII_ALIASES)):
+            spelling = self._spelling
+            return [(start, end, spelling[key]) for start, end, key in self._spans(low)]
+        return None
+
+    def spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        (start, end, seed as spelled) for every match in text, left to right.
+        """
+        if not self.words:
+            return []
+        spans = self._fast_spans(text)
+        if spans is None:
+            spans = [(m.start(), m.end(), self._seed_for(m.group(0))) for m in self.pattern.finditer(text)]
+        return spans
+
+    def bold(self, text: str) -> str:
+        if not self.words:
+            return text
+        spans = self._fast_spans(text)
+        if spans is None:
+            return self.pattern.sub(lambda m: f"**{self._seed_for(m.group(0))}**", text)
+        return mark_spans(text, spans)
+
+
+def mark_spans(text: str, spans: Iterable[Tuple[int, int, str]]) -> str:
+    """
+    text with each span replaced by **seed**.
+    """
+    out = []
+    pos = 0
+    for start, end, word in spans:
+        out.append(text[pos:start])
+        out.append(f"**{word}**")
+        pos = end
+    if not out:
+        return text
+    out.append(text[pos:])
+    return "".join(out)
+
+
+@lru_cache(maxsize=4096)
+def _compiled(words: Tuple[str, ...]) -> Highlighter:
+    return Highlighter(words)
+
+
+def compile_highlighter(words: Iterable[str]) -> Highlighter:
+    """
+    Cached Highlighter for a seed set (order and duplicates don't matter).
+    """
+    uniq = tuple(sorted({w for w in words if w}, key=lambda x: (-len(x), x)))
+    return _compiled(uniq)
+
+
+def boldify_user_words(text: str, words: Iterable[str]) -> str:
+    return compile_highlighter(words).bold(text)
@@ -0,0 +1,125 @@
+# plaidlibs/history.py
+# Token-budgeted sliding window over PlaidChat history. The last turns are sent
+# verbatim; older turns are folded into one incrementally updated summary message,
+# so the prompt stays bounded no matter how long the chat runs.
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+Message = Dict[str, str]
+Summarizer = Callable[[str, List[Message]], str]
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role + separators, roughly what chat models charge per message
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, dependency-free token estimate (~4 chars per token for English).
+    """
+    return len(text) // 4 + 1
+
+
+def message_tokens(m: Message) -> int:
+    return estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + "…"
+
+
+def extractive_summarizer(max_tokens: int = 300, line_words: int = 18) -> Summarizer:
+    """
+    Offline summarizer: one clipped line per folded message, appended to the running
+    summary; the oldest lines fall off once the summary exceeds max_tokens.
+    """
+    def summarize(previous: str, folded: List[Message]) -> str:
+        lines = previous.splitlines() if previous else []
+        for m in folded:
+            first = re.split(r"(?<=[.!?])\s", m["content"].strip(), maxsplit=1)[0]
+            words = first.split()
+            gist = " ".join(words[:line_words]) + (" …" if len(words) > line_words else "")
+            who = "Quip" if m["role"] == "assistant" else "User"
+            lines.append(f"- {who}: {gist}")
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+    return summarize
+
+
+def llm_summarizer(client: Any, model: str = "gpt-4o-mini", max_tokens: int = 300) -> Summarizer:
+    """
+    Summarizer that asks the model to update the running summary with the newly
+    folded turns (only the delta is sent, never the full transcript).
+    """
+    def summarize(previous: str, folded: List[Message]) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in folded)
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "You maintain a compact running summary of a chat. "
+                                              "Merge the new lines into the summary. Keep names, facts "
+                                              "and open threads; drop small talk."},
+                {"role": "user", "content": f"Summary so far:\n{previous or '(empty)'}\n\nNew lines:\n{transcript}"},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.2,
+        )
+        return clip_to_tokens(response.choices[0].message.content.strip(), max_tokens)
+    return summarize
+
+
+class HistoryWindow:
+    """
+    Per-session view of a chat: window(messages) returns what to send upstream.
+
+    keep_turns    max messages sent verbatim
+    token_budget  max estimated tokens for the verbatim tail
+    fold_slack    once the tail overflows, fold this many extra messages so the
+                  summarizer runs every few turns instead of on every turn
+    """
+
+    def __init__(self, keep_turns: int = 12, token_budget: int = 1500, fold_slack: int = 4,
+                 summary_tokens: int = 300, summarizer: Optional[Summarizer] = None):
+        self.keep_turns = max(1, keep_turns)
+        self.token_budget = token_budget
+        self.fold_slack = max(0, min(fold_slack, self.keep_turns - 1))
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or extractive_summarizer(summary_tokens)
+        self.summary = ""
+        self.folded = 0  # messages[:folded] already live in self.summary
+
+    def reset(self):
+        self.summary = ""
+        self.folded = 0
+
+    def _tail_start(self, messages: List[Message], start: int) -> int:
+        n = len(messages)
+        start = max(start, n - self.keep_turns)
+        tokens = sum(message_tokens(m) for m in messages[start:])
+        while start < n - 1 and tokens > self.token_budget:
+            tokens -= message_tokens(messages[start])
+            start += 1
+        return start
+
+    def window(self, messages: List[Message]) -> List[Message]:
+        if len(messages) < self.folded:
+            self.reset()  # history was replaced (mode reset / trimmed)
+
+        start = self._tail_start(messages, self.folded)
+        if start > self.folded:
+            # Overflowed: fold a little further than needed (hysteresis)
+            start = min(len(messages) - 1, start + self.fold_slack)
+            self.summary = clip_to_tokens(
+                self.summarizer(self.summary, messages[self.folded:start]), self.summary_tokens
+            )
+            self.folded = start
+
+        tail = [dict(m) for m in messages[self.folded:]]
+        if tail and message_tokens(tail[-1]) > self.token_budget:
+            tail[-1]["content"] = clip_to_tokens(tail[-1]["content"], self.token_budget - MESSAGE_OVERHEAD_TOKENS)
+        if not self.summary:
+            return tail
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}] + tail
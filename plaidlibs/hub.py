@@ -0,0 +1,380 @@
+# plaidlibs/hub.py
+# Local multiplayer hub for PlaidPlay: one asyncio process holds every open round
+# in memory as its event log (plaidlibs.rounds) and fans each accepted event out
+# to the round's followers over WebSockets. Streamlit sessions talk to it with
+# the blocking HubClient, headless players with run_bot(). Uses the websockets
+# package, which Streamlit already depends on.
+#
+#   python -m plaidlibs.hub                      # ws://127.0.0.1:8765
+#   python -m plaidlibs.hub --port 9000 --retain 600 --idle-ttl 7200
+#   python -m plaidlibs.hub --db rounds.sqlite3       # survives restarts (plaidlibs.roundstore)
+#
+# Protocol (JSON text frames). Client -> hub, "ref" is echoed back:
+#   {"op": "open", "player": host, "data": {"prompt", "max_players", "invited"}, "ref": 1}
+#   {"op": "follow", "round": id, "since": 0, "ref": 2}
+#   {"op": "join" | "submit" | "vote" | "close", "round": id, "player": name, "data": {...}, "ref": 3}
+# Hub -> client:
+#   {"event": {...}}                                   every follower of the round, sender included
+#   {"ref": 1, "ok": true, "round": id, "seq": 0}      after the event went out (the opener follows)
+#   {"ref": 2, "ok": true, "round": id, "events": [...]}  the log from `since`; live events follow
+#   {"ref": 3, "error": "round closed"}
+# Each event is serialized once and written to all followers with broadcast(),
+# which never waits on a slow socket. Closed rounds stay followable for `retain` seconds;
+# an open round with no event for `idle_ttl` seconds (its host left without closing
+# it) is dropped, so abandoned rounds never fill the hub.
+# With a RoundStore every accepted event is also appended to disk (committed every
+# flush_interval seconds), and a restarted hub picks up the open rounds where they were.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import signal
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from websockets.asyncio.server import ServerConnection, broadcast, serve
+from websockets.exceptions import WebSocketException
+
+from plaidlibs.generators import SUBMISSION_ADJS, SUBMISSION_NOUNS, SUBMISSION_WILDS
+from plaidlibs.rounds import Event, Round
+from plaidlibs.roundstore import RoundStore
+
+DEFAULT_URL = "ws://127.0.0.1:8765"
+
+
+class PlayHub:
+    """
+    Rounds by id plus who follows them. All methods run on the event loop thread.
+    With a store, the rounds it recovers are back in play (their idle time counts
+    from the restart); their logs are read from disk the first time someone
+    follows them. idle_ttl=None keeps open rounds until they close.
+    """
+
+    def __init__(self, max_rounds: int = 100_000, retain: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic, store: Optional[RoundStore] = None,
+                 idle_ttl: Optional[float] = 3600.0):
+        self.max_rounds = max_rounds
+        self.retain = retain
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self.store = store
+        self.rounds: Dict[str, Round] = store.recover(idle_ttl) if store else {}
+        self.logs: Dict[str, List[str]] = {}  # round id -> its events, serialized once
+        self.followers: Dict[str, Set[ServerConnection]] = defaultdict(set)
+        self.closed: "OrderedDict[str, float]" = OrderedDict(  # round id -> when it closed
+            (r.id, self.clock()) for r in self.rounds.values() if r.closed)
+        self.active: "OrderedDict[str, float]" = OrderedDict(  # open round id -> its last event, oldest first
+            (r.id, self.clock()) for r in self.rounds.values() if not r.closed)
+        self.stats = {"connections": 0, "events": 0, "deliveries": 0, "errors": 0, "abandoned": 0}
+
+    def _new_round(self) -> Round:
+        self._expire()
+        if len(self.rounds) >= self.max_rounds:
+            raise ValueError("hub full, try again later")
+        round_id = secrets.token_hex(3).upper()
+        while round_id in self.rounds or (self.store and self.store.known(round_id)):
+            round_id = secrets.token_hex(3).upper()
+        # the log is kept as JSON strings: nothing for the garbage collector to
+        # traverse, and a follow reply is a join instead of a re-serialization
+        r = self.rounds[round_id] = Round(round_id, keep_events=False)
+        self.logs[round_id] = []
+        return r
+
+    def _drop(self, round_id: str) -> Optional[Round]:
+        self.logs.pop(round_id, None)
+        self.followers.pop(round_id, None)
+        return self.rounds.pop(round_id, None)
+
+    def _expire(self):
+        now = self.clock()
+        while self.closed and next(iter(self.closed.values())) <= now - self.retain:
+            self._drop(self.closed.popitem(last=False)[0])
+        if self.idle_ttl is None:
+            return
+        while self.active and next(iter(self.active.values())) <= now - self.idle_ttl:
+            r = self._drop(self.active.popitem(last=False)[0])
+            if r is not None and self.store:
+                self.store.abandon(r)
+            self.stats["abandoned"] += 1
+
+    def _reload(self, round_id: str) -> Optional[Round]:
+        # a round that closed before a restart: followable again for `retain` seconds
+        r = self.store.load(round_id) if self.store else None
+        if r is not None:
+            self.rounds[r.id] = r
+            self.closed[r.id] = self.clock()
+        return r
+
+    def _log(self, r: Round) -> List[str]:
+        log = self.logs.get(r.id)
+        if log is None:  # recovered from the store
+            log = self.logs[r.id] = self.store.log(r.id)
+        return log
+
+    def _publish(self, r: Round, event: Event):
+        wire = json.dumps(event)
+        if self.store:
+            self.store.append(r, wire)
+        if r.id in self.logs:
+            self.logs[r.id].append(wire)
+        followers = self.followers.get(r.id, ())
+        broadcast(followers, '{"event": ' + wire + "}")
+        self.stats["events"] += 1
+        self.stats["deliveries"] += len(followers)
+        if event["kind"] == "close":
+            self.active.pop(r.id, None)
+            self.closed[r.id] = self.clock()
+        else:
+            self.active[r.id] = self.clock()
+            self.active.move_to_end(r.id)
+        self._expire()
+
+    def handle(self, msg: Dict[str, Any], conn: ServerConnection, following: Set[str]) -> str:
+        """
+        Apply one client message; returns the reply for the sender, serialized.
+        """
+        op = msg.get("op")
+        if op == "open":
+            r = self._new_round()
+            try:
+                event = r.apply("open", msg.get("player", ""), msg.get("data"))
+            except Exception:
+                del self.rounds[r.id], self.logs[r.id]
+                raise
+            self.followers[r.id].add(conn)
+            following.add(r.id)
+            self._publish(r, event)
+            return json.dumps({"ok": True, "round": r.id, "seq": event["seq"], "ref": msg.get("ref")})
+        round_id = str(msg.get("round", "")).upper()
+        r = self.rounds.get(round_id) or self._reload(round_id)
+        if r is None:
+            raise ValueError(f"no round {msg.get('round')!r}")
+        if op == "follow":
+            self.followers[r.id].add(conn)
+            following.add(r.id)
+            events = ", ".join(self._log(r)[int(msg.get("since", 0)):])
+            return f'{{"ok": true, "round": "{r.id}", "ref": {json.dumps(msg.get("ref"))}, "events": [{events}]}}'
+        event = r.apply(op, msg.get("player", ""), msg.get("data"))
+        self._publish(r, event)
+        return json.dumps({"ok": True, "round": r.id, "seq": event["seq"], "ref": msg.get("ref")})
+
+    async def serve_connection(self, conn: ServerConnection):
+        following: Set[str] = set()
+        self.stats["connections"] += 1
+        try:
+            async for message in conn:
+                msg: Dict[str, Any] = {}
+                try:
+                    msg = json.loads(message)
+                    reply = self.handle(msg, conn, following)
+                except (ValueError, TypeError, AttributeError, KeyError, OverflowError) as e:
+                    self.stats["errors"] += 1
+                    reply = json.dumps({"error": str(e), "ref": msg.get("ref") if isinstance(msg, dict) else None})
+                # broadcast(), not await send(): the reply stays behind the events already queued
+                broadcast([conn], reply)
+        finally:
+            self.stats["connections"] -= 1
+            for round_id in following:
+                self.followers.get(round_id, set()).discard(conn)
+
+
+async def _flush(store: RoundStore, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        store.flush()
+
+
+async def run_hub(host: str = "127.0.0.1", port: int = 8765, hub: Optional[PlayHub] = None,
+                  ready: Optional[Callable[[int], Any]] = None, flush_interval: float = 0.05):
+    """
+    Serve until cancelled. ready(port) is called once listening (port=0 picks a free one).
+    The hub's store (if any) is committed every flush_interval seconds and closed on the way out.
+    """
+    hub = hub or PlayHub()
+    flusher = asyncio.create_task(_flush(hub.store, flush_interval)) if hub.store else None
+    try:
+        async with serve(hub.serve_connection, host, port, max_size=2**16, compression=None,
+                         ping_interval=20, ping_timeout=20) as server:
+            if ready:
+                ready(server.sockets[0].getsockname()[1])
+            await server.serve_forever()
+    finally:
+        if flusher:
+            flusher.cancel()
+            hub.store.close()
+
+
+def random_entry(rng: random.Random) -> Dict[str, Any]:
+    """
+    A submission's data, drawn like simulate_submissions draws one.
+    """
+    return {
+        "nouns": rng.sample(SUBMISSION_NOUNS, 3),
+        "adjs": rng.sample(SUBMISSION_ADJS, 2),
+        "wild": rng.choice(SUBMISSION_WILDS),
+    }
+
+
+class HubClient:
+    """
+    Blocking client for one Streamlit script run: connect, follow or act on a
+    round, close. Events that arrive while waiting for a reply are kept in events.
+    Hub errors raise ValueError; an unreachable or dropped hub raises ConnectionError.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 5.0):
+        from websockets.sync.client import connect
+
+        self.timeout = timeout
+        self.events: List[Event] = []
+        self._ref = 0
+        try:
+            self._conn = connect(url, open_timeout=timeout, close_timeout=1, compression=None, proxy=None)
+        except (OSError, WebSocketException) as e:
+            raise ConnectionError(f"cannot reach the hub at {url}: {e}") from None
+
+    def __enter__(self) -> "HubClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        self._ref += 1
+        deadline = time.monotonic() + self.timeout
+        try:
+            self._conn.send(json.dumps(dict(fields, op=op, ref=self._ref)))
+            while True:
+                msg = json.loads(self._conn.recv(timeout=max(0.0, deadline - time.monotonic())))
+                if "event" in msg:
+                    self.events.append(msg["event"])
+                elif msg.get("ref") == self._ref:
+                    break
+        except (OSError, WebSocketException) as e:  # TimeoutError is an OSError
+            raise ConnectionError(f"hub connection lost: {e}") from None
+        if "error" in msg:
+            raise ValueError(msg["error"])
+        return msg
+
+    def open(self, host: str, prompt: str, max_players: int = 8, invited: Optional[List[str]] = None) -> str:
+        data = {"prompt": prompt, "max_players": max_players, "invited": invited or []}
+        return self.request("open", player=host, data=data)["round"]
+
+    def follow(self, round_id: str, since: int = 0) -> List[Event]:
+        """
+        The round's events from seq `since` on.
+        """
+        self.events = list(self.request("follow", round=round_id, since=since)["events"])
+        return self.events
+
+    def act(self, op: str, round_id: str, player: str, data: Optional[Dict[str, Any]] = None) -> int:
+        return self.request(op, round=round_id, player=player, data=data or {})["seq"]
+
+
+async def run_bot(url: str, round_id: str, player: str, rng: random.Random, n_players: int,
+                  latencies: Optional[List[float]] = None, host: bool = False, think: float = 0.0,
+                  start: Optional[asyncio.Event] = None, ready: Optional[Callable[[], Any]] = None,
+                  timeout: float = 60.0) -> Round:
+    """
+    One headless player: join, submit once everyone is in, rank two other entries
+    once every entry is in, and (as host) close the round once every ballot is in,
+    waiting up to `think` seconds before each move. With `start`, it connects and
+    follows first (then calls ready()) and only plays once start is set.
+    Delivery latencies (receive time minus the hub's event ts, seconds) go to latencies.
+    """
+    from websockets.asyncio.client import connect
+
+    async with connect(url, max_size=2**16, compression=None, proxy=None,
+                       open_timeout=timeout) as conn:
+        r = Round(round_id)
+        changed = asyncio.Event()
+        ref = 0
+
+        async def read():
+            # runs beside the moves, so think time never delays a delivery
+            async for message in conn:
+                msg = json.loads(message)
+                now = time.time()
+                if "error" in msg:
+                    raise ValueError(f"{player}: {msg['error']}")
+                if "event" in msg:
+                    r.fold(msg["event"])
+                    if latencies is not None:
+                        latencies.append(now - msg["event"]["ts"])
+                for event in msg.get("events", ()):
+                    r.fold(event)
+                changed.set()
+                if r.closed:
+                    return
+
+        async def until(ready_to_move: Callable[[], bool]):
+            while not ready_to_move():
+                if reader.done():
+                    reader.result()  # re-raises a hub error
+                    raise ValueError(f"{player}: round {round_id} ended early")
+                changed.clear()
+                waiter = asyncio.ensure_future(changed.wait())
+                await asyncio.wait([reader, waiter], return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+
+        async def move(op: str, data: Optional[Dict[str, Any]] = None):
+            nonlocal ref
+            if think and op != "follow":
+                await asyncio.sleep(rng.uniform(0, think))
+            ref += 1
+            await conn.send(json.dumps({"op": op, "ref": ref, "round": round_id, "player": player, "data": data}))
+
+        reader = asyncio.create_task(read())
+        await move("follow")
+        if start is not None:
+            if ready:
+                ready()
+            await start.wait()
+        async with asyncio.timeout(timeout):
+            await move("join")
+            await until(lambda: len(r.players) >= n_players)
+            await move("submit", random_entry(rng))
+            await until(lambda: len(r.submissions) >= n_players)
+            others = [p for p in r.submissions if p != player]
+            first, second = rng.sample(others, 2) if len(others) >= 2 else (others[0], None)
+            await move("vote", {"first": first, "second": second})
+            if host:
+                await until(lambda: len(r.ballots) >= n_players)
+                await move("close")
+            await reader
+        return r
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local multiplayer PlaidPlay hub (WebSockets)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765, help="0 picks a free port (printed on start)")
+    ap.add_argument("--max-rounds", type=int, default=100_000)
+    ap.add_argument("--retain", type=float, default=300.0, help="seconds a closed round stays followable")
+    ap.add_argument("--idle-ttl", type=float, default=3600.0,
+                    help="seconds without an event before an open round is dropped (0 keeps them)")
+    ap.add_argument("--db", default=os.environ.get("PLAIDLIBS_HUB_DB"),
+                    help="SQLite file that keeps rounds across restarts (default: $PLAIDLIBS_HUB_DB, else memory only)")
+    ap.add_argument("--snapshot-every", type=int, default=2000, help="events between snapshot passes")
+    args = ap.parse_args()
+    store = RoundStore(args.db, snapshot_every=args.snapshot_every) if args.db else None
+    hub = PlayHub(max_rounds=args.max_rounds, retain=args.retain, store=store, idle_ttl=args.idle_ttl or None)
+    if store and hub.rounds:
+        print(f"recovered {len(hub.rounds):,} rounds from {args.db}", flush=True)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # stop like Ctrl-C: the store gets its last commit
+    try:
+        asyncio.run(run_hub(args.host, args.port, hub,
+                            ready=lambda port: print(f"hub listening on ws://{args.host}:{port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
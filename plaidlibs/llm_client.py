@@ -0,0 +1,117 @@
+# plaidlibs/llm_client.py
+# One warm, pooled OpenAI client per process (keep-alive, bounded pool, timeouts,
+# retry/backoff) plus counters for reused vs. freshly opened connections.
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class ClientSettings:
+    pool_size: int = 20             # max open connections (and keep-alive slots)
+    keepalive_expiry: float = 60.0  # seconds an idle socket stays in the pool
+    timeout: float = 30.0           # overall read/write timeout per request
+    connect_timeout: float = 5.0
+    max_retries: int = 3            # openai retries 429/5xx/connection errors with exponential backoff
+    base_url: Optional[str] = None  # None → OPENAI_BASE_URL or api.openai.com
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        """
+        Read overrides from PLAIDLIBS_LLM_* environment variables.
+        """
+        env = os.environ.get
+        return cls(
+            pool_size=int(env("PLAIDLIBS_LLM_POOL_SIZE", cls.pool_size)),
+            keepalive_expiry=float(env("PLAIDLIBS_LLM_KEEPALIVE", cls.keepalive_expiry)),
+            timeout=float(env("PLAIDLIBS_LLM_TIMEOUT", cls.timeout)),
+            connect_timeout=float(env("PLAIDLIBS_LLM_CONNECT_TIMEOUT", cls.connect_timeout)),
+            max_retries=int(env("PLAIDLIBS_LLM_MAX_RETRIES", cls.max_retries)),
+            base_url=env("PLAIDLIBS_LLM_BASE_URL") or None,
+        )
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters fed by httpcore trace events: every request that did
+    not have to open a TCP connection was served from the keep-alive pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+        elif event_name in ("http11.send_request_headers.started", "http2.send_request_headers.started"):
+            with self._lock:
+                self.requests += 1
+
+    def attach(self, request: Any):
+        # httpx request event hook: runs before the transport, so the trace
+        # callback sees this request's connection acquisition.
+        request.extensions["trace"] = self.trace
+
+    @property
+    def reused_connections(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(0, self.requests - self.new_connections),
+            }
+
+
+class PooledClient:
+    """
+    OpenAI client backed by a single long-lived httpx connection pool.
+    Use .client wherever an OpenAI() was constructed before.
+    """
+
+    def __init__(self, settings: Optional[ClientSettings] = None):
+        import httpx
+        from openai import DefaultHttpxClient, OpenAI
+
+        self.settings = settings or ClientSettings.from_env()
+        self.stats = ConnectionStats()
+        s = self.settings
+        http_client = DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=s.pool_size,
+                max_keepalive_connections=s.pool_size,
+                keepalive_expiry=s.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(s.timeout, connect=s.connect_timeout),
+            event_hooks={"request": [self.stats.attach]},
+        )
+        kwargs = {"http_client": http_client, "max_retries": s.max_retries}
+        if s.base_url:
+            kwargs["base_url"] = s.base_url
+        self.client = OpenAI(**kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+_shared: Optional[PooledClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_client(settings: Optional[ClientSettings] = None) -> PooledClient:
+    """
+    Process-wide PooledClient, created on first use. Later calls ignore settings.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = PooledClient(settings)
+    return _shared
@@ -0,0 +1,115 @@
+# plaidlibs/lobby.py
+# Large-lobby PlaidPlay (classrooms, stream events): submissions and ranked voting
+# for thousands to millions of players as NumPy arrays instead of one dict per
+# player. Submissions are word indices into the generators' vocabulary; a voting
+# round is one ranked ballot per player (2 points for the first pick, 1 for the
+# second, as in tally_votes), accumulated with np.bincount.
+#
+# Imports NumPy at module level: the app only imports this module when a
+# large lobby is actually played.
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from plaidlibs.generators import SUBMISSION_ADJS, SUBMISSION_NOUNS, SUBMISSION_WILDS
+from plaidlibs.tally import FIRST_POINTS, SECOND_POINTS
+
+
+def _distinct(rng: np.random.Generator, n: int, pool: int, k: int) -> np.ndarray:
+    """
+    k distinct indices out of range(pool) per row, uniformly (the first k of a
+    random permutation: argpartition over random keys).
+    """
+    keys = rng.random((n, pool), dtype=np.float32)
+    return np.argpartition(keys, k - 1, axis=1)[:, :k].astype(np.uint8)
+
+
+class LobbySubmissions:
+    """
+    One round's submissions for n players: nouns (n, 3), adjs (n, 2) and wilds (n,)
+    as indices into SUBMISSION_NOUNS / _ADJS / _WILDS. submission(i) gives the
+    same dict simulate_submissions builds, for display.
+    """
+    __slots__ = ("n", "nouns", "adjs", "wilds")
+
+    def __init__(self, nouns: np.ndarray, adjs: np.ndarray, wilds: np.ndarray):
+        self.n = len(wilds)
+        self.nouns, self.adjs, self.wilds = nouns, adjs, wilds
+
+    def submission(self, i: int) -> Dict[str, Any]:
+        return {
+            "player": f"Player {i+1}",
+            "nouns": [SUBMISSION_NOUNS[j] for j in self.nouns[i]],
+            "adjs": [SUBMISSION_ADJS[j] for j in self.adjs[i]],
+            "wild": SUBMISSION_WILDS[self.wilds[i]],
+        }
+
+    def submissions(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [self.submission(i) for i in range(start, min(self.n, self.n if stop is None else stop))]
+
+
+def lobby_rng(seed: int, stream: int = 0) -> np.random.Generator:
+    """
+    Independent NumPy generator per (round seed, stream): 0 submissions, 1 votes.
+    """
+    return np.random.default_rng([seed, stream])
+
+
+def simulate_lobby(n_players: int, rng: np.random.Generator) -> LobbySubmissions:
+    return LobbySubmissions(
+        _distinct(rng, n_players, len(SUBMISSION_NOUNS), 3),
+        _distinct(rng, n_players, len(SUBMISSION_ADJS), 2),
+        rng.integers(0, len(SUBMISSION_WILDS), n_players, dtype=np.uint8),
+    )
+
+
+def lobby_rounds(rng: np.random.Generator) -> int:
+    return int(rng.integers(6, 11))
+
+
+def lobby_round(n_players: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Points per player from one voting round: each player ranks two other players;
+    self-votes are impossible.
+    """
+    if n_players < 2:
+        return np.zeros(n_players, dtype=np.int64)
+    voters = np.arange(n_players, dtype=np.int64)
+    # first pick: uniform over the n-1 others (shift past the voter)
+    first = rng.integers(0, n_players - 1, n_players)
+    first += first >= voters
+    points = FIRST_POINTS * np.bincount(first, minlength=n_players)
+    if n_players >= 3:
+        # second pick: uniform over the n-2 players that are neither voter nor first
+        lo, hi = np.minimum(voters, first), np.maximum(voters, first)
+        second = rng.integers(0, n_players - 2, n_players)
+        second += second >= lo
+        second += second >= hi
+        points += SECOND_POINTS * np.bincount(second, minlength=n_players)
+    return points
+
+
+def lobby_scores(n_players: int, rng: np.random.Generator, rounds: Optional[int] = None) -> np.ndarray:
+    """
+    Points per player after `rounds` voting rounds (lobby_rounds(rng) when None).
+    """
+    if rounds is None:
+        rounds = lobby_rounds(rng)
+    scores = np.zeros(n_players, dtype=np.int64)
+    for _ in range(rounds):
+        scores += lobby_round(n_players, rng)
+    return scores
+
+
+def leaderboard(scores: np.ndarray, k: int = 10) -> List[Tuple[str, int]]:
+    """
+    Top k (player, points), highest first; ties go to the lower player number.
+    """
+    k = min(k, len(scores))
+    if k == 0:
+        return []
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    cand = np.flatnonzero(scores >= kth)  # everyone tied at the cut, too
+    top = cand[np.lexsort((cand, -scores[cand]))[:k]]
+    return [(f"Player {i+1}", int(scores[i])) for i in top]
@@ -0,0 +1,124 @@
+# plaidlibs/menus.py
+# Style and genre menus, drawn once per step and then kept. A Menu is immutable:
+# its options in the order shown, the labels numbered after them (Wild Card,
+# Reshuffle) and the rendered text, so the menu a user reads is exactly the one
+# their answer is checked against.
+#
+# Drawing is O(k): a draw picks k entries of a precomputed index array (one
+# per pool) instead of copying and shuffling a catalog list, and the menu text
+# is joined from lines numbered and formatted once at import.
+#
+# app.py keeps the current step's menus in GLOBAL["MENUS"] via menu_for();
+# plaidlibs.flow drops them when the flow moves to another step, and a
+# Reshuffle answer calls reshuffle() to draw a new one.
+
+import random
+from functools import lru_cache
+from typing import Callable, List, MutableMapping, NamedTuple, Optional, Sequence, Tuple
+
+from plaidlibs.catalog import CORE_GENRES, FLEX_GENRES, PLAIDVERSE, STYLES
+
+Option = Tuple[str, str]  # (name, description)
+
+STYLE_TABLE: Tuple[Option, ...] = tuple(STYLES)
+GENRE_TABLE: Tuple[Option, ...] = tuple(CORE_GENRES + FLEX_GENRES + PLAIDVERSE)
+
+# positions in the tables above, per pool
+_STYLE_IDX = tuple(range(len(STYLE_TABLE)))
+_CORE_IDX = tuple(range(len(CORE_GENRES)))
+_FLEX_IDX = tuple(range(len(CORE_GENRES), len(CORE_GENRES) + len(FLEX_GENRES)))
+_PLAID_IDX = tuple(range(len(CORE_GENRES) + len(FLEX_GENRES), len(GENRE_TABLE)))
+
+
+def _numbered(table: Tuple[Option, ...]) -> Tuple[Tuple[str, ...], ...]:
+    # [menu position][table index] -> "3. Name - description"
+    return tuple(tuple(f"{pos}. {name} - {desc}" for name, desc in table) for pos in range(1, len(table) + 1))
+
+
+_STYLE_LINES = _numbered(STYLE_TABLE)
+_GENRE_LINES = _numbered(GENRE_TABLE)
+
+GENRE_EXTRAS = (("Wild Card", "Surprise genre!"), ("Reshuffle", "Different options"))
+
+
+class Menu(NamedTuple):
+    options: Tuple[Option, ...]
+    extras: Tuple[str, ...]  # labels numbered after the options
+    text: str                # "1. Name - description" lines, extras included
+
+    def pick(self, choice: str) -> Optional[str]:
+        """
+        The option name (or extra label) a typed number stands for; None if it is not on the menu.
+        """
+        if not (choice.isascii() and choice.isdigit()) or choice.startswith("0"):
+            return None
+        i = int(choice) - 1
+        if i < len(self.options):
+            return self.options[i][0]
+        if len(self.options) <= i < len(self.options) + len(self.extras):
+            return self.extras[i - len(self.options)]
+        return None
+
+    def names(self) -> List[str]:
+        return [name for name, _ in self.options]
+
+
+def sample_index(rng: random.Random, pool: Sequence[int], k: int) -> List[int]:
+    """
+    k distinct entries of pool in random order. Draws until k distinct ones come up:
+    fewer than 2k draws on average while k is at most half the pool.
+    """
+    n = len(pool)
+    k = min(k, n)
+    rand = rng.random
+    picked: List[int] = []
+    while len(picked) < k:
+        i = pool[int(rand() * n)]
+        if i not in picked:
+            picked.append(i)
+    return picked
+
+
+@lru_cache(maxsize=None)
+def _extra_lines(extras: Tuple[Option, ...], first: int) -> Tuple[str, ...]:
+    return tuple(f"{n}. {label} - {desc}" if desc else f"{n}. {label}" for n, (label, desc) in enumerate(extras, first))
+
+
+def _menu(table: Tuple[Option, ...], lines: Tuple[Tuple[str, ...], ...], idx: List[int],
+          extras: Tuple[Option, ...]) -> Menu:
+    text = [lines[pos][i] for pos, i in enumerate(idx)]
+    text += _extra_lines(extras, len(idx) + 1)
+    return Menu(tuple([table[i] for i in idx]), tuple([label for label, _ in extras]), "\n".join(text))
+
+
+def draw_styles(rng: Optional[random.Random] = None, n: int = 5, extras: Tuple[Option, ...] = ()) -> Menu:
+    """
+    n styles; extras are (label, description) lines numbered after them ("" for no description).
+    """
+    return _menu(STYLE_TABLE, _STYLE_LINES, sample_index(rng or random, _STYLE_IDX, n), extras)
+
+
+def draw_genres(rng: Optional[random.Random] = None) -> Menu:
+    """
+    3 core + 2 flexible + 1 plaidverse genre, then Wild Card and Reshuffle (7 and 8).
+    """
+    rng = rng or random
+    idx = sample_index(rng, _CORE_IDX, 3) + sample_index(rng, _FLEX_IDX, 2) + sample_index(rng, _PLAID_IDX, 1)
+    return _menu(GENRE_TABLE, _GENRE_LINES, idx, GENRE_EXTRAS)
+
+
+def menu_for(menus: MutableMapping[str, Menu], key: str, draw: Callable[[], Menu]) -> Menu:
+    """
+    The menu kept under key, drawn on first use.
+    """
+    menu = menus.get(key)
+    if menu is None:
+        menu = menus[key] = draw()
+    return menu
+
+
+def reshuffle(menus: MutableMapping[str, Menu], key: str):
+    """
+    Forget the menu under key; the next menu_for() draws a new one.
+    """
+    menus.pop(key, None)
@@ -0,0 +1,266 @@
+# plaidlibs/metrics.py
+# Opt-in rerun instrumentation: wall time, call counts and script exits per
+# (workflow, step), kept in process-wide counters that can be rendered as
+# Prometheus text or appended to a JSONL file, one line per finished rerun.
+#
+# Off unless PLAIDLIBS_METRICS=1 (or PLAIDLIBS_METRICS_JSONL / _PROM is set).
+# When off, rerun() returns a shared no-op object and wrap() returns the
+# function unchanged, so the disabled cost is one attribute check per rerun.
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+Labels = Tuple[str, str, str]  # (span, mode, step)
+
+_current: "contextvars.ContextVar[Optional[RerunSpan]]" = contextvars.ContextVar("plaidlibs_rerun", default=None)
+
+
+def _step_label(step: Any) -> str:
+    # CURRENT_STEP is an int or a half-step float (1.5); keep labels short
+    return str(int(step)) if isinstance(step, float) and step.is_integer() else str(step)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RerunSpan:
+    """
+    One script run, split into phases: it starts in "sidebar", enter() closes the
+    current phase and opens the next, finish() closes the run with how it ended
+    ("complete", "rerun", "stop"). Only the first finish counts.
+    """
+
+    def __init__(self, metrics: "Metrics", mode: str, step: str):
+        self.metrics = metrics
+        self.mode = mode
+        self.step = step
+        self.t0 = self._last = time.perf_counter()
+        self.phase = "sidebar"
+        self.phases: Dict[str, float] = {}
+        self.calls: Dict[str, List[float]] = {}  # name -> [count, seconds]
+        self.done = False
+        self._token = _current.set(self)
+
+    def enter(self, phase: str):
+        now = time.perf_counter()
+        self.phases[self.phase] = now - self._last
+        self.phase, self._last = phase, now
+
+    def finish(self, exit: str = "complete"):
+        if self.done:
+            return
+        self.done = True
+        now = time.perf_counter()
+        self.phases[self.phase] = now - self._last
+        try:
+            _current.reset(self._token)
+        except ValueError:  # finished from another context; nothing to restore
+            pass
+        self.metrics._record_run(self, exit, now - self.t0)
+
+
+class _NullSpan:
+    done = True
+
+    def enter(self, phase: str):
+        pass
+
+    def finish(self, exit: str = "complete"):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """
+    Thread-safe counters. Spans are keyed by (span name, workflow, step); generator
+    calls made outside a rerun (e.g. on the chat executor threads) get empty labels.
+    """
+
+    def __init__(self, enabled: bool = False, jsonl_path: Optional[str] = None, prom_path: Optional[str] = None):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._spans: Dict[Labels, List[float]] = {}          # -> [count, seconds, max seconds]
+        self._exits: Dict[Tuple[str, str, str], int] = {}    # (mode, step, exit) -> count
+        self._wrapped: Dict[Callable, Callable] = {}
+        self._jsonl = None
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        """
+        PLAIDLIBS_METRICS=1 enables; PLAIDLIBS_METRICS_JSONL appends one line per rerun;
+        PLAIDLIBS_METRICS_PROM rewrites a Prometheus textfile after each rerun.
+        """
+        env = os.environ.get
+        jsonl_path = env("PLAIDLIBS_METRICS_JSONL") or None
+        prom_path = env("PLAIDLIBS_METRICS_PROM") or None
+        enabled = env("PLAIDLIBS_METRICS", "").lower() in ("1", "true", "yes", "on")
+        return cls(enabled=enabled or bool(jsonl_path or prom_path), jsonl_path=jsonl_path, prom_path=prom_path)
+
+    def rerun(self, global_state: Mapping[str, Any]):
+        """
+        Start timing a script run for the workflow/step in GLOBAL.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return RerunSpan(self, str(global_state.get("CURRENT_MODE") or ""),
+                         _step_label(global_state.get("CURRENT_STEP", 0)))
+
+    def wrap(self, fn: Callable) -> Callable:
+        """
+        Time every call of fn (generator functions: until the generator is exhausted).
+        Returns fn itself when disabled; wrappers are built once per function.
+        """
+        if not self.enabled:
+            return fn
+        wrapped = self._wrapped.get(fn)
+        if wrapped is not None:
+            return wrapped
+        name = fn.__name__
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapped(*args, **kwargs):
+                run = _current.get()
+                t0 = time.perf_counter()
+                try:
+                    yield from fn(*args, **kwargs)
+                finally:
+                    self._record_call(run, name, time.perf_counter() - t0)
+        else:
+            @functools.wraps(fn)
+            def wrapped(*args, **kwargs):
+                run = _current.get()
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._record_call(run, name, time.perf_counter() - t0)
+
+        with self._lock:
+            return self._wrapped.setdefault(fn, wrapped)
+
+    def _add(self, labels: Labels, seconds: float):
+        # caller holds the lock
+        s = self._spans.get(labels)
+        if s is None:
+            self._spans[labels] = [1, seconds, seconds]
+        else:
+            s[0] += 1
+            s[1] += seconds
+            if seconds > s[2]:
+                s[2] = seconds
+
+    def _record_call(self, run: Optional[RerunSpan], name: str, seconds: float):
+        if run is not None and not run.done:
+            c = run.calls.setdefault(name, [0, 0.0])
+            c[0] += 1
+            c[1] += seconds
+        labels = (name, run.mode, run.step) if run is not None else (name, "", "")
+        with self._lock:
+            self._add(labels, seconds)
+
+    def _record_run(self, run: RerunSpan, exit: str, seconds: float):
+        with self._lock:
+            self._add(("total", run.mode, run.step), seconds)
+            for phase, t in run.phases.items():
+                self._add((phase, run.mode, run.step), t)
+            key = (run.mode, run.step, exit)
+            self._exits[key] = self._exits.get(key, 0) + 1
+            if self.jsonl_path:
+                if self._jsonl is None:
+                    self._jsonl = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+                self._jsonl.write(json.dumps({
+                    "ts": round(time.time(), 3),
+                    "mode": run.mode,
+                    "step": run.step,
+                    "exit": exit,
+                    "ms": round(seconds * 1000, 3),
+                    "phases_ms": {k: round(v * 1000, 3) for k, v in run.phases.items()},
+                    "calls": {k: {"n": c[0], "ms": round(c[1] * 1000, 3)} for k, c in run.calls.items()},
+                }, ensure_ascii=False) + "\n")
+        if self.prom_path:
+            tmp = self.prom_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            os.replace(tmp, self.prom_path)  # textfile collectors must never see a partial file
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        One row per (span, workflow, step), slowest total first; for the sidebar table.
+        """
+        with self._lock:
+            spans = [(k, list(v)) for k, v in self._spans.items()]
+            exits = dict(self._exits)
+        out = []
+        for (span, mode, step), (n, total, peak) in spans:
+            row = {"span": span, "mode": mode, "step": step, "calls": int(n),
+                   "mean_ms": round(total / n * 1000, 2), "max_ms": round(peak * 1000, 2),
+                   "total_ms": round(total * 1000, 1)}
+            if span == "total":
+                row["st.rerun"] = exits.get((mode, step, "rerun"), 0)
+            out.append(row)
+        out.sort(key=lambda r: r["total_ms"], reverse=True)
+        return out
+
+    def prometheus(self) -> str:
+        """
+        Prometheus text exposition format (0.0.4).
+        """
+        with self._lock:
+            spans = sorted((k, list(v)) for k, v in self._spans.items())
+            exits = sorted(self._exits.items())
+        lines = [
+            "# HELP plaidlibs_span_seconds Wall time per rerun phase or generator call.",
+            "# TYPE plaidlibs_span_seconds summary",
+        ]
+        for (span, mode, step), (n, total, _) in spans:
+            labels = f'span="{_escape(span)}",mode="{_escape(mode)}",step="{_escape(step)}"'
+            lines.append(f"plaidlibs_span_seconds_count{{{labels}}} {int(n)}")
+            lines.append(f"plaidlibs_span_seconds_sum{{{labels}}} {total:.6f}")
+        lines += [
+            "# HELP plaidlibs_span_max_seconds Slowest single observation since process start.",
+            "# TYPE plaidlibs_span_max_seconds gauge",
+        ]
+        for (span, mode, step), (_, _, peak) in spans:
+            labels = f'span="{_escape(span)}",mode="{_escape(mode)}",step="{_escape(step)}"'
+            lines.append(f"plaidlibs_span_max_seconds{{{labels}}} {peak:.6f}")
+        lines += [
+            "# HELP plaidlibs_reruns_total Script runs by how they ended (complete, rerun, stop).",
+            "# TYPE plaidlibs_reruns_total counter",
+        ]
+        for (mode, step, exit), n in exits:
+            lines.append(f'plaidlibs_reruns_total{{mode="{_escape(mode)}",step="{_escape(step)}",'
+                         f'exit="{_escape(exit)}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._exits.clear()
+
+
+_shared: Optional[Metrics] = None
+_shared_lock = threading.Lock()
+
+
+def shared_metrics() -> Metrics:
+    """
+    Process-wide Metrics (configured from the environment), created on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = Metrics.from_env()
+    return _shared
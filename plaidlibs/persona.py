@@ -0,0 +1,153 @@
+# plaidlibs/persona.py
+# Offline persona replies for PlaidChat: a small template grammar per Quip built
+# from that Quip's voice lines (greeting, story intro, story outro) plus an
+# optional corpus, and an order-2 word Markov chain over the same sentences for
+# the occasional riff. No network; a reply is a few dict lookups and joins.
+#
+# Corpus file (PLAIDLIBS_PERSONA_CORPUS): UTF-8, one sentence per line, either
+# "<Quip>\t<text>" for one narrator or bare "<text>" for all of them.
+
+import os
+import random
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from plaidlibs.catalog import ALL_GENRES, QUIP_GREETINGS, STYLES
+from plaidlibs.generators import story_intro_line
+from plaidlibs.templates import OUTRO_LINES
+
+Message = Dict[str, str]
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'’-]{3,}")
+_GREETING = re.compile(r"^\s*(hi|hello|hey|yo|howdy|hiya|greetings|good (morning|evening|afternoon))\b", re.I)
+_STOP = frozenset("about after again could from have hello howdy hiya just like make tell thanks that their "
+                  "there these they this what when where which with would your".split())
+_START = ("", "")
+_END = None
+
+
+def sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE.split(text.strip()) if s]
+
+
+def topic_words(said: str, k: int = 3) -> List[str]:
+    """
+    The user's k longest content words (stable order for equal lengths).
+    """
+    return sorted({w for w in _WORD.findall(said) if w.lower() not in _STOP}, key=lambda w: (-len(w), w))[:k]
+
+
+def load_corpus(path: str) -> Dict[str, List[str]]:
+    """
+    Corpus lines per quip; "*" holds the lines meant for every quip.
+    """
+    corpus: Dict[str, List[str]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            quip, sep, text = line.partition("\t")
+            if sep:
+                corpus[quip.strip()].append(text.strip())
+            else:
+                corpus["*"].append(line)
+    return dict(corpus)
+
+
+class PersonaModel:
+    """
+    One Quip's voice. Replies follow a fixed grammar:
+        [opener, on greetings / the first turn] hook [riff] closer
+    openers are the start of the Quip's greeting, closers its last beat and the
+    story outro sentences, the hook is its story_intro_line around the user's
+    topic words, and the riff comes from the corpus or the Markov chain once
+    there are enough sentences to make one.
+    """
+    __slots__ = ("quip", "openers", "closers", "corpus", "chain")
+
+    def __init__(self, quip: str, corpus: Sequence[str] = ()):
+        greeting = sentences(QUIP_GREETINGS.get(quip, QUIP_GREETINGS["MacQuip"]))
+        outro = sentences(OUTRO_LINES.get(quip, OUTRO_LINES["*"]))
+        self.quip = quip
+        self.openers = list(dict.fromkeys((greeting[0], " ".join(greeting[:2]))))
+        self.closers = greeting[-1:] + outro
+        self.corpus = list(corpus)
+        self.chain: Dict[Tuple[str, str], List[Optional[str]]] = defaultdict(list)
+        for line in greeting + outro + self.corpus:
+            self._train(line)
+
+    def _train(self, line: str):
+        state = _START
+        for word in line.split():
+            self.chain[state].append(word)
+            state = (state[1], word)
+        self.chain[state].append(_END)
+
+    def babble(self, rng: random.Random, max_words: int = 24) -> str:
+        words: List[str] = []
+        state = _START
+        while len(words) < max_words:
+            word = rng.choice(self.chain[state])
+            if word is _END:
+                break
+            words.append(word)
+            state = (state[1], word)
+        return " ".join(words)
+
+    def reply(self, said: str, first_turn: bool, rng: random.Random) -> str:
+        parts = []
+        if first_turn or _GREETING.match(said):
+            parts.append(rng.choice(self.openers))
+        style, genre = rng.choice(STYLES)[0], rng.choice(ALL_GENRES)[0]
+        words = topic_words(said)
+        hook = story_intro_line(self.quip, style, genre)
+        parts.append(f"{hook} Starring: {', '.join(words)}." if words else hook)
+        if self.corpus and rng.random() < 0.5:
+            parts.append(rng.choice(self.corpus))
+        elif len(self.corpus) >= 8:
+            parts.append(self.babble(rng))
+        parts.append(rng.choice(self.closers))
+        return " ".join(parts)
+
+
+class PersonaEngine:
+    """
+    PersonaModel per Quip, built on first use. reply() is deterministic for a
+    given (quip, history): the RNG is seeded from the last user line and turn count.
+    """
+
+    def __init__(self, corpus: Optional[Dict[str, List[str]]] = None):
+        self.corpus = corpus or {}
+        self._models: Dict[str, PersonaModel] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "PersonaEngine":
+        """
+        PLAIDLIBS_PERSONA_CORPUS: optional corpus file (see the module header).
+        """
+        path = os.environ.get("PLAIDLIBS_PERSONA_CORPUS")
+        return cls(load_corpus(path) if path else None)
+
+    def model(self, quip: str) -> PersonaModel:
+        m = self._models.get(quip)
+        if m is None:
+            with self._lock:
+                m = self._models.get(quip)
+                if m is None:
+                    lines = self.corpus.get(quip, []) + self.corpus.get("*", [])
+                    m = self._models[quip] = PersonaModel(quip, lines)
+        return m
+
+    def reply(self, quip: str, history: List[Message]) -> str:
+        user_turns = [m["content"] for m in history if m["role"] == "user"]
+        said = user_turns[-1] if user_turns else ""
+        # a summary (system) message means earlier turns were folded away
+        first_turn = len(user_turns) <= 1 and not any(m["role"] == "system" for m in history)
+        rng = random.Random(zlib.crc32(f"{quip}\0{len(user_turns)}\0{said}".encode("utf-8")))
+        return self.model(quip).reply(said, first_turn, rng)
@@ -0,0 +1,121 @@
+# plaidlibs/remix.py
+# Structured stories for the remix steps. A Story is its paragraphs, and each
+# Paragraph records what it was made from: its render plan (which depends on the
+# style, absurdity and narrator only where its template does), the values of
+# the slots the plan reads, the seed words that can be highlighted in it, and
+# the highlight spans. Paragraphs are memoized on exactly those inputs, process
+# wide, so a remix that changes the style, one seed ("dialect spice" on trait)
+# or the absurdity renders and highlights only the paragraphs that change; the
+# rest come from the memo (or straight from the story being remixed).
+#
+# build_story(...).text is the same string as generators.assemble_story(...)
+# and draws the same numbers from rng. assemble_story stays the one-off path
+# (batch runs, fresh seed sets), where memoizing paragraphs would not pay.
+
+import random
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from plaidlibs.highlight import compile_highlighter, mark_spans
+from plaidlibs.templates import PLAIDEMONIUM_FLAIRS, RenderPlan, paragraph_plans, story_plan
+
+_MISSING = object()  # slot value for a seed that isn't set (so its default applies)
+_ASCII_ALIASES = ("\u017f", "\u0131", "\u0130", "\u212a")  # ſ ı İ K (Kelvin): IGNORECASE matches s, i, i, k
+
+Span = Tuple[int, int, str]  # start, end, seed as spelled, in the paragraph's plain text
+
+
+class Paragraph(NamedTuple):
+    plan: RenderPlan
+    values: tuple             # the plan's slot values, in plan.slots order
+    words: Tuple[str, ...]    # seed words that can match in it
+    spans: Tuple[Span, ...]   # highlight spans in plain
+    plain: str
+    text: str                 # with **seed** highlights
+
+
+class Story(NamedTuple):
+    style: str
+    genre: str
+    absurdity: str
+    narrator: str
+    seeds: Dict[str, str]
+    paragraphs: Tuple[Paragraph, ...]
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(p.text for p in self.paragraphs)
+
+    def remix(self, rng: Optional[random.Random] = None, style: Optional[str] = None, genre: Optional[str] = None,
+              absurdity: Optional[str] = None, seeds: Optional[Dict[str, str]] = None,
+              narrator: Optional[str] = None) -> "Story":
+        """
+        This story with some inputs changed; paragraphs whose inputs did not change are reused as they are.
+        """
+        return build_story(style or self.style, genre or self.genre, absurdity or self.absurdity,
+                           narrator or self.narrator, self.seeds if seeds is None else seeds, rng, base=self)
+
+
+@lru_cache(maxsize=8192)
+def _plain(plan: RenderPlan, values: tuple) -> str:
+    seeds = {name: v for name, v in zip(plan.slots, values) if v is not _MISSING and name != "genre"}
+    genre = values[plan.slots.index("genre")] if "genre" in plan.slots else None
+    return plan.render(genre, seeds)
+
+
+@lru_cache(maxsize=8192)
+def _words_in(plain: str, words: Tuple[str, ...]) -> Tuple[str, ...]:
+    # A seed can only match where its text occurs. Non-ASCII seeds may case-fold
+    # into other letters, and under re.IGNORECASE a few non-ASCII letters match
+    # ASCII ones that str.lower() does not map them to (ſ/s, ı/i, İ/i), so those
+    # always count, as does every seed in text containing such a letter.
+    if any(c in plain for c in _ASCII_ALIASES):
+        return words
+    low = plain.lower()
+    return tuple(w for w in words if not w.isascii() or w.lower() in low)
+
+
+@lru_cache(maxsize=8192)
+def _highlight(plain: str, words: Tuple[str, ...]) -> Tuple[Tuple[Span, ...], str]:
+    spans = tuple(compile_highlighter(words).spans(plain))
+    return spans, mark_spans(plain, spans)
+
+
+def _paragraph(plan: RenderPlan, genre: str, seeds: Dict[str, str], words: Tuple[str, ...],
+               old: Optional[Paragraph]) -> Paragraph:
+    values = tuple(genre if name == "genre" else seeds.get(name, _MISSING) for name in plan.slots)
+    plain = _plain(plan, values)
+    mine = _words_in(plain, words)
+    if old is not None and old.plan is plan and old.values == values and old.words == mine:
+        return old
+    spans, text = _highlight(plain, mine)
+    return Paragraph(plan, values, mine, spans, plain, text)
+
+
+def build_story(style: str, genre: str, absurdity: str, narrator: str, seeds: Dict[str, str],
+                rng: Optional[random.Random] = None, base: Optional[Story] = None) -> Story:
+    """
+    The story assemble_story() would produce, paragraph by paragraph. With base,
+    base's paragraphs are reused where nothing they depend on changed.
+    """
+    if absurdity.startswith("Plaidemonium"):
+        (rng or random).choice(PLAIDEMONIUM_FLAIRS)  # the draw assemble_story makes
+    words = tuple(sorted({w for w in seeds.values() if w}))
+    if any("\n" in w for w in words):
+        # a seed could match across a paragraph break: highlight the story as a whole
+        plans: Tuple[RenderPlan, ...] = (story_plan(style, absurdity, narrator),)
+    else:
+        plans = paragraph_plans(style, absurdity, narrator)
+    olds: List[Optional[Paragraph]] = list(base.paragraphs) if base is not None else []
+    olds += [None] * (len(plans) - len(olds))
+    paragraphs = tuple(_paragraph(plan, genre, seeds, words, old) for plan, old in zip(plans, olds))
+    return Story(style, genre, absurdity, narrator, dict(seeds), paragraphs)
+
+
+def memo_stats() -> Dict[str, int]:
+    """
+    Paragraph memo hits and misses (rendering, highlighting) since start-up.
+    """
+    plain, spans = _plain.cache_info(), _highlight.cache_info()
+    return {"render_hits": plain.hits, "render_misses": plain.misses,
+            "highlight_hits": spans.hits, "highlight_misses": spans.misses}
@@ -0,0 +1,190 @@
+# plaidlibs/rounds.py
+# Multiplayer PlaidPlay rounds as an append-only event log. A round is nothing
+# but its events, in order:
+#   open    the host starts the round (prompt, player cap, optional invite list)
+#   join    a player takes a seat
+#   submit  a player's entry: 3 nouns, 2 adjectives, a wildcard
+#   vote    a player's ranked ballot over the other entries (2 points / 1 point)
+#   close   the host ends the round; the results follow from the log
+# Round.apply() validates an event against the state so far, appends it and
+# folds it in; Round.replay() rebuilds the same state from a log, which is how
+# clients (Streamlit sessions, bots) follow a round they only see as events.
+# Round.snapshot() is that state as plain JSON data, so a store can restart from
+# it plus the events after it instead of the whole log.
+#
+# No I/O here; plaidlibs.hub serves these over WebSockets, plaidlibs.roundstore
+# keeps them on disk.
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from plaidlibs.tally import FIRST_POINTS, SECOND_POINTS
+
+EVENT_KINDS = ("open", "join", "submit", "vote", "close")
+MAX_PLAYERS = 64
+
+Event = Dict[str, Any]  # {"round", "seq", "kind", "player", "data", "ts"}; JSON as sent over the hub
+
+
+def _words(data: Dict[str, Any], key: str, n: int) -> List[str]:
+    words = data.get(key)
+    if not isinstance(words, list) or len(words) != n or not all(isinstance(w, str) and w.strip() for w in words):
+        raise ValueError(f"{key} must be {n} non-empty strings")
+    return [w.strip()[:40] for w in words]
+
+
+class Round:
+    """
+    State folded from one round's events. players keeps join order (it is the
+    tie-break for the results); points only counts votes. keep_events=False folds
+    events without keeping them (the hub keeps its log serialized instead).
+    """
+    __slots__ = ("id", "seq", "events", "host", "prompt", "max_players", "invited", "players", "submissions",
+                 "ballots", "points", "closed")
+
+    def __init__(self, round_id: str, keep_events: bool = True):
+        self.id = round_id
+        self.seq = 0  # events folded so far
+        self.events: Optional[List[Event]] = [] if keep_events else None
+        self.host: Optional[str] = None
+        self.prompt = ""
+        self.max_players = MAX_PLAYERS
+        self.invited: Tuple[str, ...] = ()
+        self.players: Dict[str, int] = {}  # name -> seat
+        self.submissions: Dict[str, Dict[str, Any]] = {}
+        self.ballots: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.points: Dict[str, int] = {}
+        self.closed = False
+
+    @classmethod
+    def replay(cls, round_id: str, events: Iterable[Event]) -> "Round":
+        r = cls(round_id)
+        for event in events:
+            r.fold(event)
+        return r
+
+    @classmethod
+    def from_snapshot(cls, state: Dict[str, Any], keep_events: bool = False) -> "Round":
+        """
+        The inverse of snapshot(); events after it can be folded on top.
+        """
+        r = cls(state["round"], keep_events=keep_events)
+        r.seq = state["seq"]
+        r.host, r.prompt = state["host"], state["prompt"]
+        r.max_players, r.invited = state["max_players"], tuple(state["invited"])
+        r.players = {p: seat for seat, p in enumerate(state["players"])}
+        r.submissions = state["submissions"]
+        r.ballots = {p: (first, second) for p, (first, second) in state["ballots"].items()}
+        r.points = state["points"]
+        r.closed = state["closed"]
+        return r
+
+    def apply(self, kind: str, player: str, data: Optional[Dict[str, Any]] = None,
+              ts: Optional[float] = None) -> Event:
+        """
+        Validate and append one event; ValueError (with a message for the client)
+        when it does not fit the round.
+        """
+        if data is not None and not isinstance(data, dict):
+            raise ValueError("data must be an object")
+        data = dict(data or {})
+        player = (player or "").strip()[:40]
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"unknown event {kind!r}")
+        if not player:
+            raise ValueError("player name required")
+        if kind == "open":
+            if self.seq:
+                raise ValueError("round already open")
+            try:
+                cap = int(data.get("max_players", 8))
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError("max_players must be a whole number") from None
+            invited = data.get("invited") or []
+            if not isinstance(invited, list):
+                raise ValueError("invited must be a list of player names")
+            data = {
+                "prompt": str(data.get("prompt", "")).strip()[:200] or "Plaid heist at dawn",
+                "max_players": max(2, min(MAX_PLAYERS, cap)),
+                "invited": [str(p).strip()[:40] for p in invited if str(p).strip()],
+            }
+        else:
+            if not self.seq:
+                raise ValueError("round not open")
+            if self.closed:
+                raise ValueError("round closed")
+            if kind != "join" and player not in self.players:
+                raise ValueError(f"{player} has not joined")
+        if kind == "join":
+            if player in self.players:
+                raise ValueError(f"{player} already joined")
+            if self.invited and player not in self.invited and player != self.host:
+                raise ValueError(f"{player} is not invited")
+            if len(self.players) >= self.max_players:
+                raise ValueError("round full")
+            data = {}
+        elif kind == "submit":
+            if player in self.submissions:
+                raise ValueError(f"{player} already submitted")
+            wild = data.get("wild")
+            if not isinstance(wild, str) or not wild.strip():
+                raise ValueError("wild must be a non-empty string")
+            data = {"nouns": _words(data, "nouns", 3), "adjs": _words(data, "adjs", 2), "wild": wild.strip()[:40]}
+        elif kind == "vote":
+            if player in self.ballots:
+                raise ValueError(f"{player} already voted")
+            first, second = data.get("first"), data.get("second")
+            for pick in (first, second):
+                if pick is not None and pick not in self.submissions:
+                    raise ValueError(f"no entry from {pick}")
+            if first is None or player in (first, second) or first == second:
+                raise ValueError("rank one or two other players' entries")
+            data = {"first": first, "second": second}
+        elif kind == "close":
+            if player != self.host:
+                raise ValueError("only the host can close the round")
+            data = {}
+        event = {"round": self.id, "seq": self.seq, "kind": kind, "player": player, "data": data,
+                 "ts": time.time() if ts is None else ts}
+        self.fold(event)
+        return event
+
+    def fold(self, event: Event):
+        """
+        Append an event that is already known to be valid (apply(), or a replayed log).
+        """
+        kind, player, data = event["kind"], event["player"], event["data"]
+        self.seq += 1
+        if self.events is not None:
+            self.events.append(event)
+        if kind == "open":
+            self.host, self.prompt = player, data["prompt"]
+            self.max_players, self.invited = data["max_players"], tuple(data["invited"])
+        elif kind == "join":
+            self.players[player] = len(self.players)
+            self.points[player] = 0
+        elif kind == "submit":
+            self.submissions[player] = data
+        elif kind == "vote":
+            self.ballots[player] = (data["first"], data["second"])
+            self.points[data["first"]] += FIRST_POINTS
+            if data["second"] is not None:
+                self.points[data["second"]] += SECOND_POINTS
+        elif kind == "close":
+            self.closed = True
+
+    def results(self) -> List[Tuple[str, int]]:
+        """
+        (player, points), highest first; ties go to whoever joined first.
+        """
+        return sorted(self.points.items(), key=lambda kv: (-kv[1], self.players[kv[0]]))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Everything fold() has built, as JSON-ready data (not the events themselves).
+        """
+        return {
+            "round": self.id, "seq": self.seq, "host": self.host, "prompt": self.prompt,
+            "max_players": self.max_players, "invited": list(self.invited), "players": list(self.players),
+            "submissions": self.submissions, "ballots": self.ballots, "points": self.points, "closed": self.closed,
+        }
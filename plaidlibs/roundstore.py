@@ -0,0 +1,192 @@
+# plaidlibs/roundstore.py
+# Durable PlaidPlay rounds for the hub: SQLite (WAL mode) holding
+#   events  the append-only log, every accepted event as the hub serialized it
+#   rounds  one compact snapshot per round (Round.snapshot()) as of the last
+#           snapshot pass, plus its results and winner once it has closed
+#           (closed: 0 open, 1 closed, 2 abandoned)
+#   meta    the checkpoint: the last event id the snapshots cover
+# Appends go into one open transaction that flush() commits (the hub calls it
+# every few tens of milliseconds), and every snapshot_every events a snapshot
+# pass rewrites the rounds those events touched. Recovery reads the open
+# rounds' snapshots and replays only the events past the checkpoint, so a
+# restart costs O(open rounds + snapshot_every), however long the history is.
+# Results and winners are computed once, when a closed round is snapshotted,
+# and read back from then on; a closed round's events are dropped keep_closed
+# seconds later (None keeps them). A round the hub gave up on (idle too long,
+# never closed) is marked abandoned: it is not recovered or followable again,
+# and its events are dropped like a closed round's.
+
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from plaidlibs.rounds import Round
+
+
+class RoundStore:
+    """
+    Single writer: the hub's event loop thread. Reads (log(), results()) see
+    appends that are not committed yet.
+    """
+
+    def __init__(self, path: str, snapshot_every: int = 2000, keep_closed: Optional[float] = 3600.0):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.keep_closed = keep_closed
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY, round TEXT NOT NULL, seq INTEGER NOT NULL, body TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_round ON events(round, seq)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rounds ("
+            " round TEXT PRIMARY KEY, seq INTEGER NOT NULL, closed INTEGER NOT NULL, state TEXT NOT NULL,"
+            " winner TEXT, results TEXT, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS rounds_open ON rounds(closed, updated)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._dirty: Dict[str, Round] = {}  # rounds with events past the checkpoint
+        self._last_id = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        self._since_snapshot = 0
+        self.stats = {"appends": 0, "commits": 0, "snapshots": 0, "snapshot_rounds": 0, "compacted": 0,
+                      "snapshot_ms_max": 0.0}
+
+    def close(self, snapshot: bool = True):
+        if snapshot:
+            self.snapshot()
+        elif self._db.in_transaction:
+            self._db.execute("COMMIT")
+        self._db.close()
+
+    def checkpoint(self) -> int:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        return row[0] if row else 0
+
+    def append(self, r: Round, wire: str):
+        """
+        Log r's latest event (already folded into r), serialized as wire.
+        """
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+        self._last_id = self._db.execute("INSERT INTO events (round, seq, body) VALUES (?, ?, ?)",
+                                         (r.id, r.seq - 1, wire)).lastrowid
+        self._dirty[r.id] = r
+        self._since_snapshot += 1
+        self.stats["appends"] += 1
+
+    def flush(self):
+        """
+        Commit what append() has written; run a snapshot pass when one is due.
+        """
+        if self._db.in_transaction:
+            self._db.execute("COMMIT")
+            self.stats["commits"] += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """
+        Write the touched rounds' state (and, for closed ones, results and winner),
+        move the checkpoint to the last event, drop expired closed rounds' events.
+        """
+        t0, now = time.perf_counter(), time.time()
+        rows = []
+        for r in self._dirty.values():
+            results = r.results() if r.closed else None
+            rows.append((r.id, r.seq, int(r.closed), json.dumps(r.snapshot()), results[0][0] if results else None,
+                         None if results is None else json.dumps(results), now))
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+        self._db.executemany("INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('checkpoint', ?)", (self._last_id,))
+        if self.keep_closed is not None:
+            self.stats["compacted"] += self._db.execute(
+                "DELETE FROM events WHERE id <= ? AND round IN"
+                " (SELECT round FROM rounds WHERE closed != 0 AND updated < ?)",
+                (self._last_id, now - self.keep_closed)).rowcount
+        self._db.execute("COMMIT")
+        self.stats["commits"] += 1
+        self.stats["snapshots"] += 1
+        self.stats["snapshot_rounds"] += len(rows)
+        self.stats["snapshot_ms_max"] = max(self.stats["snapshot_ms_max"], (time.perf_counter() - t0) * 1000)
+        self._dirty.clear()
+        self._since_snapshot = 0
+
+    def recover(self, idle_ttl: Optional[float] = None) -> Dict[str, Round]:
+        """
+        Every round that was open at the checkpoint, or that has events past it,
+        as of the last committed event (closed ones included). With idle_ttl,
+        open rounds without an event for that many seconds are abandoned instead.
+        """
+        rounds, last = {}, {}
+        for state, updated in self._db.execute("SELECT state, updated FROM rounds WHERE closed = 0"):
+            r = Round.from_snapshot(json.loads(state))
+            rounds[r.id], last[r.id] = r, updated  # snapshotted at or after its last event
+        for round_id, seq, body in self._db.execute(
+                "SELECT round, seq, body FROM events WHERE id > ? AND round NOT IN"
+                " (SELECT round FROM rounds WHERE closed = 2) ORDER BY id", (self.checkpoint(),)):
+            r = rounds.get(round_id)
+            if r is None:  # opened after the checkpoint (a closed round takes no events)
+                r = rounds[round_id] = Round(round_id, keep_events=False)
+            if seq == r.seq:
+                event = json.loads(body)
+                r.fold(event)
+                last[round_id] = event["ts"]
+                self._dirty[round_id] = r
+        if idle_ttl is not None:
+            cutoff = time.time() - idle_ttl
+            for round_id in [i for i, r in rounds.items() if not r.closed and last[i] < cutoff]:
+                self.abandon(rounds.pop(round_id))
+            if self._db.in_transaction:
+                self._db.execute("COMMIT")
+        self._since_snapshot = len(self._dirty)
+        return rounds
+
+    def abandon(self, r: Round):
+        """
+        Mark an open round as given up on: it is not recovered again and its
+        events are dropped keep_closed seconds from now.
+        """
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+        self._db.execute("INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?, NULL, NULL, ?)",
+                         (r.id, r.seq, 2, json.dumps(r.snapshot()), time.time()))
+        self._dirty.pop(r.id, None)
+
+    def load(self, round_id: str) -> Optional[Round]:
+        """
+        A closed round that recover() left on disk, while its events are still kept.
+        """
+        row = self._db.execute("SELECT state FROM rounds WHERE round = ? AND closed = 1 AND updated >= ?",
+                               (round_id, time.time() - self.keep_closed if self.keep_closed is not None else 0)
+                               ).fetchone()
+        return Round.from_snapshot(json.loads(row[0])) if row else None
+
+    def known(self, round_id: str) -> bool:
+        """
+        Whether the id was ever used (new rounds must not reuse one).
+        """
+        return round_id in self._dirty or self._db.execute(
+            "SELECT 1 FROM rounds WHERE round = ? UNION ALL SELECT 1 FROM events WHERE round = ? LIMIT 1",
+            (round_id, round_id)).fetchone() is not None
+
+    def log(self, round_id: str, since: int = 0) -> List[str]:
+        """
+        The round's events from seq `since` on, serialized as they were appended.
+        """
+        return [body for (body,) in self._db.execute(
+            "SELECT body FROM events WHERE round = ? AND seq >= ? ORDER BY seq", (round_id, since))]
+
+    def results(self, round_id: str) -> Optional[Tuple[str, List[Tuple[str, int]]]]:
+        """
+        (winner, results) of a closed, snapshotted round, as computed when it closed.
+        """
+        row = self._db.execute("SELECT winner, results FROM rounds WHERE round = ? AND closed = 1",
+                               (round_id,)).fetchone()
+        if row is None:
+            return None
+        return row[0], [tuple(pair) for pair in json.loads(row[1])]
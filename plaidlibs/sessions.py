@@ -0,0 +1,348 @@
+# plaidlibs/sessions.py
+# Per-session memory budgets and a process-wide session registry. A browser tab
+# that stays open keeps its chat history and last story in memory for as long as
+# it lives; touch() (once per script run) trims that session back under its
+# budget, and every so often evicts sessions that have been idle past the TTL.
+# Measuring a session walks its whole state, so touch() does it only every few
+# runs or seconds, outside the registry lock (sessions never wait on each other's walks).
+# A session can also say how to tell that it has ended (its tab closed and the
+# server dropped it); an ended session's files are deleted once a short grace
+# period has passed, without waiting for the idle TTL.
+#
+# Eviction may run on another session's script thread, so it only uses
+# `in`, `[]` and `del` on the session mapping (Streamlit's SafeSessionState
+# supports exactly those, under its own lock).
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, MutableMapping, Optional
+
+from plaidlibs.export import StoryLog
+from plaidlibs.state import STATE_KEYS
+
+# st.session_state keys owned by the app (counted against the budget)
+STORY_KEYS = ("generated_story", "generated_seed")
+SPILL_KEY = "STORY_SPILL"  # path of the spilled story; generated_story is "" meanwhile
+HISTORY_KEY = "STORY_LOG"  # the session's StoryLog (every story it generated, on disk)
+REMIX_KEY = "REMIX_BASE"  # the plaidlibs.remix Story the remix steps start from
+OWNED_KEYS = ("GLOBAL",) + tuple(STATE_KEYS.values()) + STORY_KEYS + (SPILL_KEY, HISTORY_KEY, REMIX_KEY)
+
+_ATOMS = (str, bytes, int, float, bool, type(None))
+
+_private_dir: Optional[str] = None
+_private_lock = threading.Lock()
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Bytes held by obj and everything it references (containers, dataclass slots,
+    instance dicts). Functions and classes are shared code, not session data.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or callable(o):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, _ATOMS):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        else:
+            for cls in type(o).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    if hasattr(o, name):
+                        stack.append(getattr(o, name))
+            if hasattr(o, "__dict__"):
+                stack.append(o.__dict__)
+    return total
+
+
+def session_bytes(session: MutableMapping[str, Any]) -> int:
+    return sum(deep_sizeof(session[key]) for key in OWNED_KEYS if key in session)
+
+
+def story_text(session: MutableMapping[str, Any]) -> str:
+    """
+    The last generated story, read back from disk if it was spilled.
+    """
+    story = session["generated_story"] if "generated_story" in session else ""
+    if story or SPILL_KEY not in session:
+        return story
+    try:
+        with open(session[SPILL_KEY], encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def story_log(session: MutableMapping[str, Any], spill_dir: str) -> StoryLog:
+    """
+    The session's story history, kept next to its spilled story; created on first use.
+    """
+    if HISTORY_KEY not in session:
+        session[HISTORY_KEY] = StoryLog(os.path.join(spill_dir, f"{session['GLOBAL']['SESSION_ID']}.stories.jsonl"))
+    return session[HISTORY_KEY]
+
+
+def private_spill_dir() -> str:
+    """
+    This process's own spill directory (mode 0700, created on first use),
+    removed when the process exits.
+    """
+    global _private_dir
+    if _private_dir is None:
+        with _private_lock:
+            if _private_dir is None:
+                path, pid = tempfile.mkdtemp(prefix="plaidlibs-spill-"), os.getpid()
+                # forked workers inherit the hook; only the creating process cleans up
+                atexit.register(lambda: os.getpid() == pid and shutil.rmtree(path, ignore_errors=True))
+                _private_dir = path
+    return _private_dir
+
+
+class SessionBudget:
+    """
+    max_bytes   per-session budget for the keys in OWNED_KEYS
+    chat_keep   PlaidChat messages kept in memory (older ones are already folded
+                into the history summary, which is what goes upstream)
+    spill_dir   where over-budget sessions spill their last story (and where
+                story histories are kept); default private_spill_dir()
+    idle_ttl    seconds without a script run before a session is evicted
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024, chat_keep: int = 200,
+                 spill_dir: Optional[str] = None, idle_ttl: float = 1800.0):
+        self.max_bytes = max_bytes
+        self.chat_keep = max(1, chat_keep)
+        self.spill_dir = spill_dir or private_spill_dir()
+        self.idle_ttl = idle_ttl
+
+    @classmethod
+    def from_env(cls) -> "SessionBudget":
+        """
+        PLAIDLIBS_SESSION_BYTES / PLAIDLIBS_CHAT_KEEP / PLAIDLIBS_SPILL_DIR / PLAIDLIBS_SESSION_TTL.
+        """
+        env = os.environ.get
+        return cls(
+            max_bytes=int(env("PLAIDLIBS_SESSION_BYTES", 256 * 1024)),
+            chat_keep=int(env("PLAIDLIBS_CHAT_KEEP", 200)),
+            spill_dir=env("PLAIDLIBS_SPILL_DIR") or None,
+            idle_ttl=float(env("PLAIDLIBS_SESSION_TTL", 1800)),
+        )
+
+
+def trim_chat(session: MutableMapping[str, Any], keep: int) -> int:
+    """
+    Keep the last `keep` PlaidChat messages; returns how many were dropped.
+    """
+    key = STATE_KEYS["PlaidChat"]
+    if key not in session:
+        return 0
+    chat = session[key]
+    dropped = len(chat.messages) - keep
+    if dropped <= 0:
+        return 0
+    del chat.messages[:dropped]
+    chat.HISTORY.folded = max(0, chat.HISTORY.folded - dropped)  # indices shifted left
+    return dropped
+
+
+def spill_story(session: MutableMapping[str, Any], spill_dir: str) -> bool:
+    """
+    Move the last generated story to disk (one file per session, overwritten).
+    """
+    story = session["generated_story"] if "generated_story" in session else ""
+    if not story:
+        return False
+    os.makedirs(spill_dir, mode=0o700, exist_ok=True)
+    path = os.path.join(spill_dir, f"{session['GLOBAL']['SESSION_ID']}.story")
+    tmp = path + ".tmp"
+    with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+        f.write(story)
+    os.replace(tmp, path)
+    session[SPILL_KEY] = path
+    session["generated_story"] = ""
+    if REMIX_KEY in session:
+        del session[REMIX_KEY]  # a remix then renders every paragraph again
+    return True
+
+
+def enforce_budget(session: MutableMapping[str, Any], budget: SessionBudget, stats: Dict[str, int]) -> int:
+    """
+    Apply the eviction policies in order until the session fits; returns its size.
+      1. keep the last chat_keep chat messages (always)
+      2. spill the last story to disk (and drop its remix base)
+      3. keep only the chat messages the history window still sends verbatim
+    """
+    stats["trimmed_messages"] += trim_chat(session, budget.chat_keep)
+    size = session_bytes(session)
+    if size > budget.max_bytes and spill_story(session, budget.spill_dir):
+        stats["spilled_stories"] += 1
+        size = session_bytes(session)
+    chat_key = STATE_KEYS["PlaidChat"]
+    if size > budget.max_bytes and chat_key in session:
+        stats["trimmed_messages"] += trim_chat(session, session[chat_key].HISTORY.keep_turns)
+        size = session_bytes(session)
+    if size > budget.max_bytes:
+        stats["over_budget"] += 1
+    return size
+
+
+def release_files(session: MutableMapping[str, Any]):
+    """
+    Delete the session's spilled story and story history from disk.
+    """
+    if SPILL_KEY in session:
+        try:
+            os.remove(session[SPILL_KEY])
+        except OSError:
+            pass
+        del session[SPILL_KEY]
+    if HISTORY_KEY in session:
+        session[HISTORY_KEY].remove()
+        del session[HISTORY_KEY]
+
+
+def evict_session(session: MutableMapping[str, Any]):
+    """
+    Drop everything but GLOBAL (and the session's files); the current workflow
+    starts over at step 1 on the next run and GLOBAL["EVICTED"] tells the app to say so.
+    """
+    release_files(session)
+    for key in OWNED_KEYS[1:]:
+        if key in session:
+            del session[key]
+    g = session["GLOBAL"]
+    g["CURRENT_STEP"] = 1
+    g["WAITING_FOR"] = ""
+    g["EVICTED"] = True
+
+
+class SessionRegistry:
+    """
+    Sessions seen by this process: session id -> (mapping, bytes when last
+    measured, last run time, runs since measured, when measured). touch()
+    enforces the budget for one session; sweep() evicts sessions idle longer
+    than budget.idle_ttl, and forgets sessions that have ended (their alive()
+    returned False) once ended_grace seconds have passed since their last run.
+
+    measure_every / measure_interval: a session is measured (and spilled or
+    trimmed to fit) on its first run, then after that many runs or seconds,
+    whichever comes first; runs in between only cap the chat at chat_keep.
+    """
+
+    def __init__(self, budget: Optional[SessionBudget] = None, clock: Callable[[], float] = time.monotonic,
+                 measure_every: int = 8, measure_interval: float = 5.0, ended_grace: float = 120.0):
+        self.budget = budget or SessionBudget()
+        self.clock = clock
+        self.measure_every = max(1, measure_every)
+        self.measure_interval = measure_interval
+        self.ended_grace = ended_grace
+        self.sweep_every = max(1.0, min(self.budget.idle_ttl, ended_grace) / 4)
+        self._sessions: Dict[str, list] = {}  # id -> [session, bytes, last_seen, runs, measured_at, alive]
+        self._last_sweep = clock()
+        self._lock = threading.Lock()
+        self.stats = {"trimmed_messages": 0, "spilled_stories": 0, "over_budget": 0, "evicted_idle": 0,
+                      "ended": 0, "measured": 0}
+
+    def touch(self, session_id: str, session: MutableMapping[str, Any],
+              alive: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Record a script run for this session and bring it under budget; returns
+        its size (as last measured). alive, if given, returns False once the
+        session has ended; sweep() then forgets it.
+        """
+        now = self.clock()
+        with self._lock:  # marked seen first, so a concurrent sweep() won't evict it mid-run
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] is not session:
+                entry = self._sessions[session_id] = [session, 0, now, 0, None, alive]
+            entry[2] = now
+            entry[3] += 1
+            measure = entry[4] is None or entry[3] >= self.measure_every or now - entry[4] >= self.measure_interval
+            if measure:
+                entry[3], entry[4] = 0, now
+        stats = {"trimmed_messages": 0, "spilled_stories": 0, "over_budget": 0}
+        if measure:
+            entry[1] = enforce_budget(session, self.budget, stats)
+            stats["measured"] = 1
+        else:
+            stats["trimmed_messages"] = trim_chat(session, self.budget.chat_keep)
+        with self._lock:
+            for key, n in stats.items():
+                self.stats[key] += n
+        if now - self._last_sweep >= self.sweep_every:
+            self.sweep(now)
+        return entry[1]
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Forget ended sessions past the grace period and evict idle ones; returns
+        how many sessions were let go.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            quiet = [(sid, entry[5]) for sid, entry in self._sessions.items()
+                     if entry[5] is not None and now - entry[2] > self.ended_grace]
+        ended = [sid for sid, alive in quiet if not alive()]  # outside the lock: alive() may take the server's
+        for sid in ended:
+            self.forget(sid)
+        with self._lock:
+            self.stats["ended"] += len(ended)
+            idle = [sid for sid, entry in self._sessions.items() if now - entry[2] > self.budget.idle_ttl]
+            for sid in idle:
+                session = self._sessions.pop(sid)[0]
+                try:
+                    evict_session(session)
+                except (KeyError, RuntimeError):
+                    pass  # the session's state is already gone
+            self.stats["evicted_idle"] += len(idle)
+        return len(ended) + len(idle)
+
+    def forget(self, session_id: str):
+        """
+        Stop tracking a session that has ended, deleting its files.
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            try:
+                release_files(entry[0])
+            except (KeyError, RuntimeError):
+                pass  # the session's state is already gone
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.stats)
+            out["sessions"] = len(self._sessions)
+            out["bytes"] = sum(entry[1] for entry in self._sessions.values())
+        return out
+
+
+_shared: Optional[SessionRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def shared_sessions() -> SessionRegistry:
+    """
+    Process-wide SessionRegistry (budget from the environment), created on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SessionRegistry(SessionBudget.from_env())
+    return _shared
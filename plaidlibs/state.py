@@ -0,0 +1,241 @@
+# plaidlibs/state.py
+# Session state per workflow. app.py keeps one slotted dataclass per workflow in
+# st.session_state, created when the user first enters that workflow and
+# released again when they switch away; the helpers here take that mapping as an
+# argument (any MutableMapping works), so they are defined once per process
+# rather than on every rerun, and stay usable without Streamlit.
+
+import random
+import uuid
+from dataclasses import MISSING, dataclass, field
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+from plaidlibs.generators import fresh_seed, quip_greeting
+from plaidlibs.history import HistoryWindow
+
+# workflow name -> st.session_state key
+STATE_KEYS = {
+    "Lib-Ate": "LIBATE",
+    "Create Direct": "CREATEDIRECT",
+    "Storyline": "STORYLINE",
+    "PlaidPic": "PLAIDPIC",
+    "PlaidMagGen": "PLAIDMAG",
+    "PlaidPlay": "PLAIDPLAY",
+    "PlaidChat": "PLAIDCHAT",
+}
+
+
+class WorkflowState:
+    """
+    Base for the per-workflow state dataclasses below (slotted: no per-instance
+    __dict__). Defaults are declared once, on the fields. reset() restores them in
+    place: plain defaults are reassigned and owned containers (default_factory) are
+    emptied, so a reset allocates nothing. Sequences the app only ever replaces
+    wholesale default to () for the same reason.
+    """
+    __slots__ = ()
+
+    def reset(self):
+        for f in self.__dataclass_fields__.values():
+            if f.default_factory is MISSING:
+                setattr(self, f.name, f.default)
+            else:
+                value = getattr(self, f.name)
+                if isinstance(value, (dict, list)):
+                    value.clear()
+                else:
+                    value.reset()
+
+
+@dataclass(slots=True)
+class LibAteState(WorkflowState):
+    QUIP_SELECTED: str = "MacQuip"
+    STYLE_SELECTED: Optional[str] = None
+    GENRE_SELECTED: Optional[str] = None
+    ABSURDITY_SELECTED: Optional[str] = None
+    PROMPTS_NEEDED: int = 0
+    PROMPTS_COLLECTED: int = 0
+    COLLECTED: Dict[str, str] = field(default_factory=dict)
+    teaser: str = ""
+
+
+@dataclass(slots=True)
+class CreateDirectState(WorkflowState):
+    QUIP_SELECTED: str = "MacQuip"
+    STYLE_SELECTED: Optional[str] = None
+    GENRE_SELECTED: Optional[str] = None
+    ABSURDITY_SELECTED: Optional[str] = None
+
+
+@dataclass(slots=True)
+class StorylineState(WorkflowState):
+    USER_STORYLINE: str = ""
+    QUIP_SELECTED: str = "MacQuip"
+    STYLE_SELECTED: Optional[str] = None
+    ABSURDITY_SELECTED: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PlaidPicState(WorkflowState):
+    IMAGE_UPLOADED: bool = False
+    IMAGE_ANALYSIS: Dict[str, str] = field(default_factory=dict)
+    QUIP_SELECTED: str = "MacQuip"
+    STYLE_SELECTED: Optional[str] = None
+    GENRE_SELECTED: Optional[str] = None
+    ABSURDITY_SELECTED: Optional[str] = None
+    TEXT_DESC: str = ""
+
+
+@dataclass(slots=True)
+class PlaidMagState(WorkflowState):
+    FORMAT_SELECTED: Optional[str] = None
+    STYLE_SELECTED: Optional[str] = None
+    PROMPT_COLLECTED: str = ""
+    ENHANCEMENT_TAGS: Sequence[str] = ()
+    QUIP_SELECTED: str = "MacQuip"
+
+
+@dataclass(slots=True)
+class PlaidPlayState(WorkflowState):
+    QUIP_SELECTED: str = "MacQuip"
+    STYLE_SELECTED: Optional[str] = None
+    GENRE_SELECTED: Optional[str] = None
+    ABSURDITY_SELECTED: Optional[str] = None
+    PLAYER_EMAILS: Sequence[str] = ()
+    SUBMISSIONS: Sequence[Dict[str, Any]] = ()
+    VOTE_TALLY: Dict[str, int] = field(default_factory=dict)
+    SUBMISSIONS_RECEIVED: int = 0
+    MASTER_PROMPT: str = ""
+    N_PLAYERS: int = 0
+    LARGE_LOBBY: bool = False
+    ROUND_SEED: Optional[int] = None
+    TALLY: Any = None           # plaidlibs.tally.LiveTally, from the moment voting opens
+    VOTE_RNG: Any = None        # large lobbies: NumPy generator for the rounds still to come
+    VOTE_ROUNDS: int = 0
+    VOTES_OPENED: float = 0.0   # time.monotonic() when voting opened
+    ONLINE: bool = False        # played on a multiplayer hub (plaidlibs.hub) instead of simulated
+    HUB_URL: str = ""
+    ROUND_ID: str = ""
+    PLAYER: str = ""            # this session's player name in the hub round
+    EVENTS: Sequence[Dict[str, Any]] = ()  # the hub round's event log as seen so far
+
+
+def _greeting() -> List[Dict[str, str]]:
+    return [{"role": "assistant", "content": quip_greeting("MacQuip")}]
+
+
+@dataclass(slots=True)
+class PlaidChatState(WorkflowState):
+    QUIP_SELECTED: str = "MacQuip"
+    messages: List[Dict[str, str]] = field(default_factory=_greeting)
+    HISTORY: HistoryWindow = field(default_factory=HistoryWindow)  # what actually gets sent upstream
+    PENDING: Optional[Dict[str, str]] = None                       # in-flight turn: {"turn": hash, "cache_key": key}
+    FAILED: Optional[str] = None                                   # last turn's error, shown once
+
+    def reset(self):
+        WorkflowState.reset(self)
+        self.messages.append({"role": "assistant", "content": quip_greeting("MacQuip")})
+
+
+# workflow name -> state class
+WORKFLOW_STATES = {
+    "Lib-Ate": LibAteState,
+    "Create Direct": CreateDirectState,
+    "Storyline": StorylineState,
+    "PlaidPic": PlaidPicState,
+    "PlaidMagGen": PlaidMagState,
+    "PlaidPlay": PlaidPlayState,
+    "PlaidChat": PlaidChatState,
+}
+
+
+def workflow_state(mode: str) -> WorkflowState:
+    """
+    Fresh state for one workflow.
+    """
+    return WORKFLOW_STATES[mode]()
+
+
+def init_session(session: MutableMapping[str, Any], seed: Optional[int] = None):
+    """
+    Create GLOBAL (mode, step, session id, seed + RNG) if missing. Workflow state
+    is not created here: see workflow() and reset_workflow().
+    """
+    if "GLOBAL" not in session:
+        seed = fresh_seed() if seed is None else seed
+        session["GLOBAL"] = {
+            "CURRENT_MODE": None,          # one of the 7 workflows
+            "CURRENT_STEP": 0,             # step counter per workflow
+            "WAITING_FOR": "",             # description of expected input
+            "SESSION_ID": uuid.uuid4().hex,  # stable per browser session
+            "SEED": seed,                  # shown in the sidebar
+            "RNG": random.Random(seed),    # menus, wild cards and per-request seeds
+            "RUNS": 0,                     # script executions this session
+            "STORIES": 0,                  # completed stories / specs / rounds (plaidlibs.flow)
+            "MENUS": {},                   # menus the current step drew (plaidlibs.menus)
+        }
+
+
+def workflow(session: MutableMapping[str, Any], mode: str) -> WorkflowState:
+    """
+    State for one workflow, created on first use.
+    """
+    key = STATE_KEYS[mode]
+    state = session.get(key)
+    if state is None:
+        state = session[key] = workflow_state(mode)
+    return state
+
+
+def release_workflow(session: MutableMapping[str, Any], mode: str):
+    """
+    Drop a workflow's state (chat messages, image analysis, collected words, ...).
+    The next workflow() call starts it fresh.
+    """
+    session.pop(STATE_KEYS[mode], None)
+
+
+def reset_workflow(session: MutableMapping[str, Any], mode: str):
+    # Reset GLOBAL + per-workflow minimal fields
+    g = session["GLOBAL"]
+    prev = g["CURRENT_MODE"]
+    if prev != mode and prev in STATE_KEYS:
+        # Switching away: re-entry resets it anyway, so nothing in it is needed
+        release_workflow(session, prev)
+    g["CURRENT_MODE"] = mode
+    g["CURRENT_STEP"] = 1
+    g["WAITING_FOR"] = ""  # set by first step renderer
+    g["MENUS"].clear()
+    if mode in STATE_KEYS:
+        state = session.get(STATE_KEYS[mode])
+        if state is None:
+            workflow(session, mode)
+        else:
+            state.reset()
+
+
+def selected_quip(session: MutableMapping[str, Any], mode: Optional[str] = None) -> str:
+    """
+    The selected quip for the given mode or for the current global mode.
+    """
+    key = STATE_KEYS.get(mode or session["GLOBAL"].get("CURRENT_MODE"))
+    state = session.get(key) if key else None
+    return state.QUIP_SELECTED if state is not None else "MacQuip"
+
+
+def request_rng(session: MutableMapping[str, Any]) -> Tuple[int, random.Random]:
+    """
+    Seed + dedicated RNG for one generated output, drawn from the session RNG.
+    The same seed and inputs reproduce the output exactly.
+    """
+    seed = session["GLOBAL"]["RNG"].getrandbits(32)
+    return seed, random.Random(seed)
+
+
+def with_seed_note(text: str, seed: Optional[int]) -> str:
+    """
+    Download payload for a story, with its seed appended.
+    """
+    if text and seed is not None:
+        return f"{text}\n\n[PlaidLibs seed {seed}]\n"
+    return text
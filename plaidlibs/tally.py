@@ -0,0 +1,116 @@
+# plaidlibs/tally.py
+# Running PlaidPlay vote tallies. Votes arrive one ballot at a time (small
+# lobbies) or as a voting round's per-player points at once (large lobbies,
+# NumPy arrays from plaidlibs.lobby), and the top-k leaderboard is kept current
+# as they come in: a min-heap of the k leaders whose root is the score to beat.
+# snapshot() reads those k entries only, never the whole lobby.
+#
+# Points live in one array("q") per tally (8 bytes a player), so a tally can sit
+# in session state between reruns while a live leaderboard fills in.
+
+import heapq
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FIRST_POINTS = 2
+SECOND_POINTS = 1
+
+Ballot = Tuple[int, Optional[int]]  # (first pick, second pick or None), as player indices
+
+
+class LiveTally:
+    """
+    Points for players 0..n-1 plus their top k. A player's heap key is
+    (points, -player): more points first, ties to the lower player number (as
+    max() over a tally dict). Points only grow, so a heap entry whose score no
+    longer matches _top is stale and is dropped when it reaches the root.
+    """
+    __slots__ = ("k", "names", "points", "ballots", "_heap", "_top")
+
+    def __init__(self, n_players: int, k: int = 10, names: Optional[Sequence[str]] = None):
+        self.k = max(1, k)
+        self.names = names
+        self.points = array("q", bytes(8 * n_players))
+        self.ballots = 0
+        # the first k players lead at 0 points until someone outscores them
+        self._top: Dict[int, int] = {p: 0 for p in range(min(self.k, n_players))}
+        self._heap: List[Tuple[int, int]] = [(0, -p) for p in self._top]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def name(self, player: int) -> str:
+        return self.names[player] if self.names else f"Player {player+1}"
+
+    def add(self, player: int, points: int):
+        if points <= 0:
+            return
+        score = self.points[player] + points
+        self.points[player] = score
+        self._offer(player, score)
+
+    def ballot(self, first: int, second: Optional[int] = None):
+        self.add(first, FIRST_POINTS)
+        if second is not None:
+            self.add(second, SECOND_POINTS)
+        self.ballots += 1
+
+    def add_ballots(self, ballots: Iterable[Ballot]):
+        for first, second in ballots:
+            self.ballot(first, second)
+
+    def add_counts(self, counts: Any, ballots: int = 0):
+        """
+        Add a batch of per-player points: a NumPy int array of length n_players (one
+        voting round's np.bincount). Only the players the batch touches are looked
+        at, and of those only the batch's best k can displace a leader.
+        """
+        import numpy as np  # large lobbies only; counts is already a NumPy array
+
+        points = np.frombuffer(self.points, dtype=np.int64)
+        touched = np.flatnonzero(counts)
+        points[touched] += counts[touched]
+        self.ballots += ballots
+        for p, score in list(self._top.items()):
+            if points[p] != score:
+                self._offer(p, int(points[p]))
+        if len(touched) > self.k:
+            scores = points[touched]
+            kth = np.partition(scores, len(scores) - self.k)[len(scores) - self.k]
+            touched = touched[scores >= kth]
+            touched = touched[np.lexsort((touched, -points[touched]))[:self.k]]
+        for p in touched.tolist():
+            if p not in self._top:
+                self._offer(p, int(points[p]))
+
+    def _offer(self, player: int, score: int):
+        top, heap = self._top, self._heap
+        if player in top:
+            top[player] = score
+            heapq.heappush(heap, (score, -player))  # its previous entry is now stale
+            if len(heap) > 4 * self.k:
+                self._heap = [(s, -p) for p, s in top.items()]
+                heapq.heapify(self._heap)
+        elif len(top) < self.k:
+            top[player] = score
+            heapq.heappush(heap, (score, -player))
+        elif score >= heap[0][0]:  # the root is at most the true minimum, stale or not
+            while top.get(-heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            if (score, -player) > heap[0]:
+                _, loser = heapq.heapreplace(heap, (score, -player))
+                del top[-loser]
+                top[player] = score
+
+    def snapshot(self) -> List[Tuple[str, int]]:
+        """
+        The leaderboard, highest first: (name, points) for the top k.
+        """
+        ranked = sorted(self._top.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [(self.name(p), s) for p, s in ranked]
+
+    def leader(self) -> Optional[str]:
+        if not self._top:
+            return None
+        return self.name(min(self._top.items(), key=lambda kv: (-kv[1], kv[0]))[0])
@@ -0,0 +1,187 @@
+# plaidlibs/templates.py
+# Story templates as data + a tiny compiler. Each (style, absurdity, narrator)
+# combination is compiled once into a render plan: the template text turned into
+# one generated f-string function (see RenderPlan), so rendering a story is a
+# single call. paragraph_plans() compiles the same templates per paragraph, for
+# plaidlibs.remix; paragraphs with the same text share one plan.
+#
+# Slot syntax inside template text:
+#   {name}            value of `name` (compile-time constant or seed)
+#   {name=default}    seeds.get(name, default)      — default only when missing
+#   {name|default}    value or default              — default when falsy
+#   {name?prefix}     prefix + value if value else ""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+INTRO_LINES: Dict[str, str] = {
+    "MacQuip": "As your tartan-tongued narrator, I’ll spin a {style}{genre? } so tight it squeaks.",
+    "DJ Q'Wip": "Check it—{style} vibes incoming, genre on lock: {genre|Freestyle}!",
+    "SoQuip": "Hush now—let’s tell a {style} {genre|} story with a tender hand.",
+    "DonQuip": "Here’s the arrangement: a {style} {genre|}. We do it clean.",
+    "ErrQuip": "Loading {style}::{genre|Undefined} … compiling feelings … OK-ish.",
+    "McQuip": "Right! A {style} {genre|}! Wait—what’s that? No, I’m ready.",
+    "*": "A {style} {genre|} begins.",
+}
+
+OUTRO_LINES: Dict[str, str] = {
+    "MacQuip": "There—we’ve tied the bow, probably around a hedgehog. Stylish, if prickly.",
+    "DJ Q'Wip": "And that’s a WRAP—bars, beats, and brave hearts!",
+    "SoQuip": "Sweet mercy, look at that: a little courage goes a long way, sugar.",
+    "DonQuip": "It’s done. Keep it between us, capisce?",
+    "ErrQuip": "Story terminated(0). Memory leak: emotions not freed.",
+    "McQuip": "We made it! I think? I think!",
+    "*": "Fin.",
+}
+
+PLAIDEMONIUM_FLAIRS = [
+    "Maximum Plaidemonium™", "Beyond Maximum Plaidemonium™",
+    "Abandon-All-Logic Plaidemonium™", "Logic.exe has crashed",
+]
+
+# Paragraphs in order. Keys:
+#   text                template, or {narrator: template} with "*" as fallback
+#   absurdity           {exact absurdity: suffix}, "*" = any other value
+#   absurdity_contains  [(needle or None, suffix)], first match wins, None = else
+#   style_contains      [(needle, "append" | "replace", text)], applied in order
+STORY_PARAGRAPHS: List[dict] = [
+    {"text": INTRO_LINES},
+    {
+        "text": "In the town of {place=Somewhere}, under a {adjective=restless} sky, "
+                "a {profession=person} named {name=Alex} discovered a {object=mystery} "
+                "that hummed like an argument about destiny.",
+        "absurdity": {
+            "Mild": " The logic behaved, mostly.",
+            "Moderate": " The physics negotiated but charged a small fee.",
+            "*": " The laws of reality put on plaid trousers and called it a casual Friday.",
+        },
+    },
+    {
+        "text": "Rumors spread like marmalade—sticky, bright, and impossible to ignore. "
+                "{name2=Riley} whispered of a map folded into the {object2=dawn}, "
+                "while the old clock in {place2=East Gate} kept time in polite disagreements.",
+        "style_contains": [
+            ("Ballads", "append", " The town sang rhymes soft as thistle-down."),
+            ("Breaking News", "replace", "BREAKING: Local calm disrupted by anomalous plaid event; sources contradict sources."),
+        ],
+    },
+    {
+        "text": "At last, our {profession=hero} chose: step through the {portal=ripple} "
+                "or stitch the day back together with {tool=courage} and {trait=grace}.",
+        "absurdity_contains": [
+            ("Plaidemonium", " They stepped. The world cheered in tartan."),
+            (None, " They breathed. The page turned itself politely."),
+        ],
+    },
+    {"text": OUTRO_LINES},
+]
+
+_SLOT = re.compile(r"\{(\w+)(?:([=|?])([^}]*))?\}")
+
+
+def _slot_expr(name: str, op: Optional[str], const: str) -> str:
+    """
+    Python expression for one slot; `const` names the slot's default/prefix constant.
+    """
+    value = "genre" if name == "genre" else f"get({name!r})"
+    if op == "=":
+        return value if name == "genre" else f"get({name!r}, {const})"
+    if op == "|":
+        return f"({value} or {const})"
+    if op == "?":
+        return f"({const} + {value} if {value} else '')"
+    return value
+
+
+class RenderPlan:
+    """
+    Compiled template: the text is turned into one generated f-string function,
+    so rendering costs about the same as the hand-written f-strings it replaced.
+    Literals and defaults are passed in as constants, never spliced into source.
+    `slots` names what render() reads ("genre" and seed names), in order.
+    """
+    __slots__ = ("text", "render", "slots")
+
+    def __init__(self, text: str, constants: Dict[str, str]):
+        consts: Dict[str, str] = {}
+        fields: List[str] = []
+        slots: Dict[str, None] = {}
+
+        def const(value: str) -> str:
+            name = f"_c{len(consts)}"
+            consts[name] = value
+            return name
+
+        pos = 0
+        for m in _SLOT.finditer(text):
+            if m.start() > pos:
+                fields.append(const(text[pos:m.start()]))
+            name, op, arg = m.group(1), m.group(2), m.group(3) or ""
+            if name in constants:  # baked in at compile time
+                fields.append(const(constants[name]))
+            else:
+                fields.append(_slot_expr(name, op, const(arg)))
+                slots[name] = None
+            pos = m.end()
+        if pos < len(text):
+            fields.append(const(text[pos:]))
+
+        body = "".join("{" + f + "}" for f in fields)
+        src = f"def render(genre, seeds):\n    get = seeds.get\n    return f{body!r}\n"
+        namespace = dict(consts)
+        exec(compile(src, "<plaidlibs.templates>", "exec"), namespace)
+        self.text = text
+        self.render: Callable[[Optional[str], Dict[str, str]], str] = namespace["render"]
+        self.slots: Tuple[str, ...] = tuple(slots)
+
+
+def _paragraph_text(par: dict, style: str, absurdity: str, narrator: str) -> str:
+    text = par["text"]
+    if isinstance(text, dict):
+        text = text.get(narrator, text["*"])
+    if "absurdity" in par:
+        table = par["absurdity"]
+        text += table.get(absurdity, table["*"])
+    for needle, suffix in par.get("absurdity_contains", ()):
+        if needle is None or needle in absurdity:
+            text += suffix
+            break
+    for needle, op, extra in par.get("style_contains", ()):
+        if needle in style:
+            text = text + extra if op == "append" else extra
+    return text
+
+
+@lru_cache(maxsize=2048)
+def story_plan(style: str, absurdity: str, narrator: str) -> RenderPlan:
+    """
+    Render plan for one (style, absurdity, narrator) combination, compiled on first use.
+    """
+    text = "\n\n".join(_paragraph_text(p, style, absurdity, narrator) for p in STORY_PARAGRAPHS)
+    return RenderPlan(text, {"style": style})
+
+
+@lru_cache(maxsize=512)
+def intro_plan(quip: str, style: str) -> RenderPlan:
+    return RenderPlan(INTRO_LINES.get(quip, INTRO_LINES["*"]), {"style": style})
+
+
+@lru_cache(maxsize=1024)
+def _paragraph_plan(text: str, style: Optional[str]) -> RenderPlan:
+    return RenderPlan(text, {"style": style} if style is not None else {})
+
+
+@lru_cache(maxsize=2048)
+def paragraph_plans(style: str, absurdity: str, narrator: str) -> Tuple[RenderPlan, ...]:
+    """
+    story_plan() split into one plan per paragraph. A paragraph whose text does
+    not change with the style, absurdity or narrator gets the same plan object
+    for every combination.
+    """
+    plans = []
+    for par in STORY_PARAGRAPHS:
+        text = _paragraph_text(par, style, absurdity, narrator)
+        uses_style = any(m.group(1) == "style" for m in _SLOT.finditer(text))
+        plans.append(_paragraph_plan(text, style if uses_style else None))
+    return tuple(plans)
@@ -0,0 +1,145 @@
+# plaidlibs/turns.py
+# Background chat-turn executor. Persona replies run on an asyncio loop owned by a
+# daemon thread, not on the Streamlit script thread, and in-flight turns are
+# de-duplicated per (session, history hash): a double-submit or a rerun that lands
+# mid-request attaches to the pending turn instead of calling upstream again.
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TurnKey = Tuple[str, str]
+
+
+def history_hash(messages: List[Dict[str, str]]) -> str:
+    raw = json.dumps([(m["role"], m["content"]) for m in messages], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TurnJob:
+    """
+    One upstream reply being produced. Text deltas accumulate in .parts; readers
+    poll with wait() and text(), and the job stays readable after it finishes
+    until the owner discards it.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def push(self, delta: str):
+        with self._cond:
+            self.parts.append(delta)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        """
+        Block until more than `seen` parts exist or the job finishes; returns the part count.
+        """
+        with self._cond:
+            if not self.done and len(self.parts) <= seen:
+                self._cond.wait(timeout)
+            return len(self.parts)
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+class TurnExecutor:
+    """
+    submit() returns the existing job for the same (session_id, turn_hash) if one
+    is pending or finished-but-unclaimed; otherwise it schedules make_stream()
+    (a callable returning an iterable of text deltas) on the background loop.
+    """
+
+    def __init__(self, max_concurrency: int = 32, retention: float = 300.0):
+        self.retention = retention  # finished, unclaimed jobs are dropped after this many seconds
+        self.stats = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0}
+        self._jobs: Dict[TurnKey, TurnJob] = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="plaidlibs-turns", daemon=True)
+        self._thread.start()
+        self._sem = asyncio.run_coroutine_threadsafe(self._make_semaphore(max_concurrency), self._loop).result()
+
+    @staticmethod
+    async def _make_semaphore(n: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(n)
+
+    def submit(self, session_id: str, turn_hash: str, make_stream: Callable[[], Iterable[str]]) -> TurnJob:
+        key = (session_id, turn_hash)
+        with self._lock:
+            self._prune(time.time())
+            job = self._jobs.get(key)
+            if job is not None and job.error is None:
+                self.stats["coalesced"] += 1
+                return job
+            job = TurnJob()
+            self._jobs[key] = job
+            self.stats["submitted"] += 1
+        asyncio.run_coroutine_threadsafe(self._run(job, make_stream), self._loop)
+        return job
+
+    def get(self, session_id: str, turn_hash: str) -> Optional[TurnJob]:
+        with self._lock:
+            return self._jobs.get((session_id, turn_hash))
+
+    def discard(self, session_id: str, turn_hash: str):
+        with self._lock:
+            self._jobs.pop((session_id, turn_hash), None)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.done)
+
+    async def _run(self, job: TurnJob, make_stream: Callable[[], Iterable[str]]):
+        async with self._sem:
+            try:
+                await asyncio.to_thread(self._drain, job, make_stream)
+            except Exception as e:  # surfaced to the UI via job.error
+                with self._lock:
+                    self.stats["failed"] += 1
+                job.finish(e)
+            else:
+                with self._lock:
+                    self.stats["completed"] += 1
+                job.finish()
+
+    @staticmethod
+    def _drain(job: TurnJob, make_stream: Callable[[], Iterable[str]]):
+        for delta in make_stream():
+            job.push(delta)
+
+    def _prune(self, now: float):
+        stale = [k for k, j in self._jobs.items() if j.done and now - j.finished_at > self.retention]
+        for k in stale:
+            del self._jobs[k]
+
+
+_shared: Optional[TurnExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def shared_executor() -> TurnExecutor:
+    """
+    Process-wide TurnExecutor, created on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = TurnExecutor()
+    return _shared
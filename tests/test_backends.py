@@ -0,0 +1,140 @@
+# tests/test_backends.py
+# FallbackBackend routing: casual turns and a slow or failing primary go to the
+# local backend (cancelling the primary's request), max_failures slow/failed
+# turns in a row open the circuit for cooldown seconds, and each locally served
+# reply is kept out of the primary's response cache exactly once.
+
+import threading
+
+import pytest
+
+from plaidlibs.backends import ChatBackend, FallbackBackend
+from plaidlibs.chat import persona_cache_key
+
+LONG = "tell me the whole story of the plaid heist please"
+
+
+class Primary(ChatBackend):
+    """
+    Streams "primary reply" after `delay` seconds, or raises when fail is set.
+    cancel() ends a pending wait at once.
+    """
+    name = "primary"
+    model = "primary-model"
+
+    def __init__(self):
+        self.delay, self.fail = 0.0, False
+        self.calls = self.cancelled = 0
+        self.ended = threading.Event()
+
+    def open_stream(self, quip, history):
+        self.calls += 1
+        self.ended.clear()
+        wake = threading.Event()
+
+        def replies():
+            try:
+                if wake.wait(self.delay):
+                    raise ConnectionError("cancelled")
+                if self.fail:
+                    raise ConnectionError("primary down")
+                yield "primary "
+                yield "reply"
+            finally:
+                self.ended.set()
+
+        def cancel():
+            self.cancelled += 1
+            wake.set()
+
+        return replies(), cancel
+
+
+class Local(ChatBackend):
+    name = "local"
+    model = "local-model"
+
+    def reply(self, quip, history):
+        return "local reply"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def backend():
+    return FallbackBackend(Primary(), Local(), first_token_timeout=0.2, casual_words=3, max_failures=3,
+                           cooldown=30.0, clock=Clock())
+
+
+def say(backend, line):
+    history = [{"role": "user", "content": line}]
+    return "".join(backend.stream("MacQuip", history)), history
+
+
+def test_casual_turns_stay_local(backend):
+    assert say(backend, "hi there") == ("local reply", [{"role": "user", "content": "hi there"}])
+    assert backend.primary.calls == 0
+    assert say(backend, LONG)[0] == "primary reply"
+    assert backend.stats == {"primary": 1, "casual": 1, "slow": 0, "failed": 0, "circuit_open": 0}
+
+
+def test_slow_primary_is_cancelled(backend):
+    backend.primary.delay = 10.0
+    assert say(backend, LONG)[0] == "local reply"
+    assert backend.primary.cancelled == 1
+    assert backend.primary.ended.wait(2.0)  # the primary's request ended; nothing is left reading it
+    assert backend.stats["slow"] == 1 and backend.failures == 1
+
+
+def test_failure_before_the_first_token(backend):
+    backend.primary.fail = True
+    assert say(backend, LONG)[0] == "local reply"
+    assert backend.stats["failed"] == 1 and backend.failures == 1
+    backend.primary.fail = False
+    assert say(backend, LONG)[0] == "primary reply"
+    assert backend.failures == 0  # a good turn resets the count
+
+
+def test_circuit_opens_and_closes(backend):
+    backend.primary.fail = True
+    for _ in range(3):
+        assert say(backend, LONG)[0] == "local reply"
+    assert backend.primary.calls == 3
+    assert backend.open_until == 130.0
+    backend.primary.fail = False
+    backend.clock.now = 129.9
+    assert say(backend, LONG)[0] == "local reply"
+    assert backend.primary.calls == 3  # open: the primary isn't asked
+    assert backend.stats["circuit_open"] == 1
+    assert "circuit open" in backend.status()[-1]
+    backend.clock.now = 130.0
+    assert say(backend, LONG)[0] == "primary reply"
+    assert backend.primary.calls == 4
+    assert backend.status()[-1].endswith("circuit closed")
+
+
+def test_circuit_needs_failures_in_a_row(backend):
+    for fail in (True, True, False, True, True):
+        backend.primary.fail = fail
+        say(backend, LONG)
+    assert backend.clock() >= backend.open_until
+    assert backend.failures == 2
+
+
+def test_locally_served_keys_are_not_cacheable_once(backend):
+    _, casual = say(backend, "hi")
+    backend.primary.fail = True
+    _, failed = say(backend, LONG + " again")
+    backend.primary.fail = False
+    _, served = say(backend, LONG)
+    for history in (casual, failed):
+        key = persona_cache_key("MacQuip", history, model=backend.model)
+        assert backend.cacheable(key) is False
+        assert backend.cacheable(key) is True
+    assert backend.cacheable(persona_cache_key("MacQuip", served, model=backend.model)) is True
@@ -0,0 +1,92 @@
+# tests/test_cache.py
+# ResponseCache evicts least recently used entries past max_entries and expires
+# entries ttl seconds after they were stored; response_key() gives the same key
+# to histories that differ only in case, spacing and edge punctuation.
+
+import pytest
+
+from plaidlibs import cache
+from plaidlibs.cache import ResponseCache, normalize_text, response_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(cache, "time", c)
+    return c
+
+
+def test_lru_eviction(clock):
+    c = ResponseCache(max_entries=3, ttl=60.0)
+    for k in "abc":
+        c.set(k, k.upper())
+    assert c.get("a") == "A"  # a is now the most recently used
+    c.set("d", "D")
+    assert c.get("b") is None
+    assert [c.get(k) for k in "acd"] == ["A", "C", "D"]
+    c.set("c", "C2")  # replacing an entry refreshes it and evicts nothing
+    c.set("e", "E")
+    assert c.get("a") is None and c.get("c") == "C2"
+    assert c.snapshot()["evictions"] == 2 and c.snapshot()["entries"] == 3
+
+
+def test_ttl_expiry(clock):
+    c = ResponseCache(max_entries=10, ttl=60.0)
+    c.set("a", "A")
+    clock.now += 30
+    c.set("b", "B")
+    clock.now += 29.9
+    assert c.get("a") == "A"  # reading does not extend its life
+    clock.now += 0.1
+    assert c.get("a") is None
+    assert c.get("b") == "B"
+    clock.now += 30
+    assert c.get("b") is None
+    s = c.snapshot()
+    assert (s["hits"], s["misses"], s["expired"], s["entries"]) == (2, 2, 2, 0)
+
+
+def test_disk_tier_expiry_and_promotion(clock, tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(ttl=60.0, sqlite_path=path).set("a", "A")
+    other = ResponseCache(max_entries=1, ttl=60.0, sqlite_path=path)  # another worker
+    assert other.get("a") == "A" and other.snapshot()["disk_hits"] == 1
+    assert other.get("a") == "A" and other.snapshot()["disk_hits"] == 1  # promoted into memory
+    clock.now += 60
+    assert ResponseCache(ttl=60.0, sqlite_path=path).get("a") is None
+
+
+@pytest.mark.parametrize("a,b", [("  Hi!! ", "hi"), ("Tell me\n\tmore", "tell  me more"), ("¿Qué?", "qué"),
+                                 ("STRASSE", "straße"), ("...plaid...", "plaid")])
+def test_normalize_text(a, b):
+    assert normalize_text(a) == normalize_text(b)
+
+
+def key(messages, **kw):
+    args = dict(quip="MacQuip", system_prompt="You are MacQuip.", model="m", temperature=0.7, last_k=2)
+    args.update(kw)
+    return response_key(args.pop("quip"), args.pop("system_prompt"), messages, **args)
+
+
+def test_response_key_normalizes_the_tail():
+    history = [{"role": "user", "content": "Hello there!"}, {"role": "assistant", "content": "Aye."},
+               {"role": "user", "content": "Tell me  a STORY?"}]
+    same = [{"role": "user", "content": "something else entirely"}, {"role": "assistant", "content": " aye "},
+            {"role": "user", "content": "tell me a story"}]
+    assert key(history) == key(same)  # only the last two messages count
+    assert key(history) != key(same, last_k=3)
+    assert key(history) == key(history, temperature=0.74)  # same temperature bucket
+    assert key(history) != key(history, temperature=0.8)
+    for changed in ({"quip": "Quiplet"}, {"system_prompt": "You are Quiplet."}, {"model": "n"}):
+        assert key(history) != key(history, **changed)
+    swapped = same[:-1] + [{"role": "assistant", "content": "tell me a story"}]
+    assert key(history) != key(swapped)  # roles are part of the key
+    assert key(history, last_k=0) == key([], last_k=0)
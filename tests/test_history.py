@@ -0,0 +1,80 @@
+# tests/test_history.py
+# HistoryWindow must keep what it sends verbatim within keep_turns messages and
+# token_budget tokens, and fold everything older into the summary exactly once,
+# running the summarizer only when the tail overflows (every few turns).
+
+import random
+
+import pytest
+
+from plaidlibs.history import HistoryWindow, message_tokens
+
+
+class Recorder:
+    """
+    Summarizer that remembers every batch it was asked to fold.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, previous, folded):
+        self.batches.append(list(folded))
+        return (previous + " " if previous else "") + f"{len(folded)} folded"
+
+
+def chat(rng, n):
+    return [{"role": ("user", "assistant")[i % 2], "content": f"m{i} " + "plaid " * rng.randint(0, 60)}
+            for i in range(n)]
+
+
+@pytest.mark.parametrize("keep_turns,token_budget,fold_slack", [(12, 1500, 4), (6, 200, 2), (4, 60, 0), (1, 50, 4)])
+def test_tail_stays_within_bounds(keep_turns, token_budget, fold_slack):
+    rng = random.Random(keep_turns * token_budget)
+    messages = chat(rng, 120)
+    summarize = Recorder()
+    h = HistoryWindow(keep_turns, token_budget, fold_slack, summarizer=summarize)
+    for n in range(1, len(messages) + 1):
+        sent = h.window(messages[:n])
+        tail = sent[1:] if h.summary else sent
+        assert 1 <= len(tail) <= keep_turns
+        assert tail[-1]["content"].startswith(f"m{n-1} ")  # the newest message always goes
+        if len(tail) > 1:
+            assert sum(message_tokens(m) for m in tail) <= token_budget
+        assert message_tokens(tail[-1]) <= token_budget + 1  # clipped, plus the ellipsis
+        assert tail[:-1] == messages[h.folded:n - 1]
+        assert sent[0]["role"] == "system" if h.summary else h.folded == 0
+    # every message older than the tail was folded once, in order
+    assert [m for batch in summarize.batches for m in batch] == messages[:h.folded]
+
+
+def test_summarizer_runs_only_on_overflow():
+    messages = [{"role": "user", "content": "x" * 36}] * 40  # 10 tokens each
+    summarize = Recorder()
+    h = HistoryWindow(keep_turns=8, token_budget=10_000, fold_slack=3, summarizer=summarize)
+    runs = []
+    for n in range(1, len(messages) + 1):
+        h.window(messages[:n])
+        runs.append(len(summarize.batches))
+    # nothing until the 9th message; then one fold of 1 + fold_slack messages every fold_slack + 1 turns
+    assert runs[:8] == [0] * 8
+    assert runs[8] == 1 and summarize.batches[0] == messages[:4]
+    assert runs[8:] == [1 + i // 4 for i in range(32)]
+    assert all(len(batch) == 4 for batch in summarize.batches)
+
+
+def test_token_budget_folds_before_keep_turns():
+    messages = [{"role": "user", "content": "y" * 396}] * 6  # 104 tokens each
+    h = HistoryWindow(keep_turns=12, token_budget=300, fold_slack=0, summarizer=Recorder())
+    sent = h.window(messages)
+    assert h.folded == 4 and len(sent) == 3 and sent[0]["role"] == "system"
+
+
+def test_replaced_history_resets_the_summary():
+    rng = random.Random(3)
+    h = HistoryWindow(keep_turns=4, token_budget=1500, fold_slack=1, summarizer=Recorder())
+    h.window(chat(rng, 20))
+    assert h.summary and h.folded
+    fresh = chat(rng, 2)
+    assert h.window(fresh) == fresh
+    assert h.summary == "" and h.folded == 0
@@ -0,0 +1,33 @@
+# tests/test_remix.py
+# build_story() must produce exactly what assemble_story() does, including for
+# text where re.IGNORECASE matches ASCII seed letters against non-ASCII ones.
+
+import random
+
+import pytest
+
+from plaidlibs.generators import assemble_story, random_story_seeds
+from plaidlibs.remix import build_story
+
+# (ASCII seed, seed whose text matches it case-insensitively at a word boundary)
+ALIASED = [("sun", "ſun-day"), ("kit", "Kit-bag"), ("ink", "ınk well"), ("ink", "İnk well")]
+
+
+@pytest.mark.parametrize("word,alias", ALIASED)
+def test_aliasing_letters_match_assemble_story(word, alias):
+    rng = random.Random(25)
+    for _ in range(200):
+        seeds = random_story_seeds(rng)
+        a, b = rng.sample(list(seeds), 2)
+        seeds[a], seeds[b] = word, alias
+        args = (rng.choice(["Noir", "Ballads", "Scriptlets"]), "Mystery", "Mild", "MacQuip", seeds)
+        assert build_story(*args).text == assemble_story(*args)
+
+
+def test_remix_matches_assemble_story():
+    rng = random.Random(7)
+    story = build_story("Noir", "Mystery", "Mild", "MacQuip", random_story_seeds(rng))
+    for style, absurdity in (("Ballads", "Mild"), ("Ballads", "Plaidemonium™"), ("Noir", "Moderate")):
+        seeds = dict(story.seeds, name="ſam", name2="sam")
+        story = story.remix(random.Random(1), style=style, absurdity=absurdity, seeds=seeds)
+        assert story.text == assemble_story(style, "Mystery", absurdity, "MacQuip", seeds, random.Random(1))
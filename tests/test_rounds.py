@@ -0,0 +1,173 @@
+# tests/test_rounds.py
+# Round.apply() must reject events that don't fit the round without changing
+# it, and a RoundStore must rebuild every round from its snapshot plus the
+# events logged after the checkpoint, exactly as the live round stood.
+
+import json
+import random
+
+import pytest
+
+from plaidlibs.rounds import Round
+from plaidlibs.roundstore import RoundStore
+
+ENTRY = {"nouns": ["kilt", "bagpipe", "scone"], "adjs": ["plaid", "soggy"], "wild": "haggis"}
+
+
+def make_round(**open_data) -> Round:
+    """
+    Ann hosts; Ann, Bob and Cy have joined and submitted; Ann has voted.
+    """
+    r = Round("r1")
+    r.apply("open", "Ann", open_data or None)
+    for p in ("Ann", "Bob", "Cy"):
+        r.apply("join", p)
+    for p in ("Ann", "Bob", "Cy"):
+        r.apply("submit", p, ENTRY)
+    r.apply("vote", "Ann", {"first": "Bob", "second": "Cy"})
+    return r
+
+
+def state(r: Round):
+    return json.loads(json.dumps(r.snapshot()))
+
+
+REJECTED = [
+    # (kind, player, data, message)
+    ("open", "Ann", None, "round already open"),
+    ("shout", "Ann", None, "unknown event"),
+    ("join", "  ", None, "player name required"),
+    ("join", "Bob", None, "Bob already joined"),
+    ("submit", "Bob", ENTRY, "Bob already submitted"),
+    ("submit", "Dee", ENTRY, "Dee has not joined"),
+    ("vote", "Dee", {"first": "Bob"}, "Dee has not joined"),
+    ("close", "Dee", None, "Dee has not joined"),
+    ("vote", "Ann", {"first": "Cy"}, "Ann already voted"),
+    ("vote", "Bob", {"first": "Dee"}, "no entry from Dee"),
+    ("vote", "Bob", {"first": "Bob"}, "rank one or two other players' entries"),
+    ("vote", "Bob", {"first": "Cy", "second": "Cy"}, "rank one or two other players' entries"),
+    ("vote", "Bob", {"second": "Cy"}, "rank one or two other players' entries"),
+    ("vote", "Bob", ["Cy"], "data must be an object"),
+    ("close", "Bob", None, "only the host can close the round"),
+]
+
+
+@pytest.mark.parametrize("kind,player,data,message", REJECTED)
+def test_rejected_events_leave_the_round_unchanged(kind, player, data, message):
+    r = make_round()
+    before = state(r)
+    with pytest.raises(ValueError, match=message):
+        r.apply(kind, player, data)
+    assert state(r) == before
+    assert len(r.events) == r.seq
+
+
+@pytest.mark.parametrize("kind,data", [("join", None), ("submit", ENTRY), ("vote", {"first": "Bob"}),
+                                       ("close", None)])
+def test_nothing_but_open_before_the_round_opens(kind, data):
+    r = Round("r1")
+    with pytest.raises(ValueError, match="round not open"):
+        r.apply(kind, "Ann", data)
+    assert r.seq == 0
+
+
+@pytest.mark.parametrize("kind,player,data", [("join", "Dee", None), ("submit", "Bob", ENTRY),
+                                              ("vote", "Bob", {"first": "Cy"}), ("close", "Ann", None)])
+def test_nothing_after_the_round_closes(kind, player, data):
+    r = make_round()
+    r.apply("close", "Ann")
+    with pytest.raises(ValueError, match="round closed"):
+        r.apply(kind, player, data)
+
+
+@pytest.mark.parametrize("data,message", [
+    ({"nouns": ["a", "b"], "adjs": ["c", "d"], "wild": "e"}, "nouns must be 3 non-empty strings"),
+    ({"nouns": ["a", "b", " "], "adjs": ["c", "d"], "wild": "e"}, "nouns must be 3 non-empty strings"),
+    ({"nouns": ["a", "b", "c"], "adjs": "cd", "wild": "e"}, "adjs must be 2 non-empty strings"),
+    ({"nouns": ["a", "b", "c"], "adjs": ["c", "d"], "wild": 5}, "wild must be a non-empty string"),
+])
+def test_malformed_submissions(data, message):
+    r = Round("r1")
+    r.apply("open", "Ann")
+    r.apply("join", "Ann")
+    with pytest.raises(ValueError, match=message):
+        r.apply("submit", "Ann", data)
+    assert "Ann" not in r.submissions
+
+
+def test_invites_and_player_cap():
+    r = Round("r1")
+    with pytest.raises(ValueError, match="max_players must be a whole number"):
+        r.apply("open", "Ann", {"max_players": "lots"})
+    with pytest.raises(ValueError, match="invited must be a list of player names"):
+        r.apply("open", "Ann", {"invited": "Bob"})
+    r.apply("open", "Ann", {"max_players": 2, "invited": ["Bob", "Cy"]})
+    r.apply("join", "Ann")  # the host needs no invite
+    with pytest.raises(ValueError, match="Dee is not invited"):
+        r.apply("join", "Dee")
+    r.apply("join", "Bob")
+    with pytest.raises(ValueError, match="round full"):
+        r.apply("join", "Cy")
+    assert list(r.players) == ["Ann", "Bob"]
+
+
+def play(rng: random.Random, r: Round, players):
+    """
+    One random event for r, tried until one is accepted; returns it.
+    """
+    while True:
+        kind = rng.choice(["join", "submit", "vote", "vote", "close"] if r.seq > 12 else ["join", "submit", "vote"])
+        player = rng.choice(players)
+        others = [p for p in r.submissions if p != player]
+        data = {"submit": ENTRY, "vote": {"first": rng.choice(others) if others else None,
+                                          "second": rng.choice(others + [None]) if others else None}}.get(kind)
+        try:
+            return r.apply(kind, player, data, ts=1000.0 + r.seq)
+        except ValueError:
+            pass
+
+
+def test_store_recovers_rounds_from_snapshot_and_log(tmp_path):
+    rng = random.Random(21)
+    path = str(tmp_path / "rounds.db")
+    store = RoundStore(path, snapshot_every=25, keep_closed=None)
+    players = ["Ann", "Bob", "Cy", "Dee", "Eve"]
+    live = {}
+    for i in range(6):
+        r = live[f"r{i}"] = Round(f"r{i}", keep_events=False)
+        store.append(r, json.dumps(r.apply("open", players[i % 5], ts=1000.0)))
+    for _ in range(300):
+        open_rounds = [r for r in live.values() if not r.closed]
+        if not open_rounds:
+            break
+        r = rng.choice(open_rounds)
+        store.append(r, json.dumps(play(rng, r, players)))
+        if rng.random() < 0.2:
+            store.flush()  # commits, and now and then a snapshot pass
+    store.flush()
+    assert store.stats["snapshots"] > 0 and store.checkpoint() > 0
+    store.close(snapshot=False)  # the events since the last snapshot are only in the log
+
+    store = RoundStore(path, snapshot_every=25, keep_closed=None)
+    recovered = store.recover()
+    expected = {i for i, r in live.items() if not r.closed} | set(recovered)
+    assert set(recovered) == expected
+    for round_id, r in recovered.items():
+        assert state(r) == state(live[round_id])
+    for round_id, r in live.items():  # the full log replays to the same state as well
+        events = [json.loads(body) for body in store.log(round_id)]
+        assert state(Round.replay(round_id, events)) == state(r)
+    store.close()
+
+
+def test_recover_abandons_idle_rounds(tmp_path):
+    path = str(tmp_path / "rounds.db")
+    store = RoundStore(path)
+    for round_id, ts in (("old", 1.0), ("new", None)):
+        r = Round(round_id, keep_events=False)
+        store.append(r, json.dumps(r.apply("open", "Ann", ts=ts)))
+    store.close(snapshot=False)  # a snapshot would count as activity: its time is the round's last
+    store = RoundStore(path)
+    assert set(store.recover(idle_ttl=60.0)) == {"new"}
+    store.close()
+    assert set(RoundStore(path).recover()) == {"new"}
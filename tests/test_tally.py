@@ -0,0 +1,101 @@
+# tests/test_tally.py
+# LiveTally's top-k leaderboard must always equal a brute-force ranking of every
+# player's points: most points first, ties to the lower player number.
+
+import random
+
+import numpy as np
+import pytest
+
+from plaidlibs.tally import LiveTally
+
+
+def brute_top(points, k):
+    ranked = sorted(range(len(points)), key=lambda p: (-points[p], p))[:k]
+    return [(f"Player {p+1}", points[p]) for p in ranked]
+
+
+def check(tally, points):
+    assert list(tally.points) == points
+    assert tally.snapshot() == brute_top(points, tally.k)
+    assert tally.leader() == (brute_top(points, 1)[0][0] if points else None)
+
+
+@pytest.mark.parametrize("n,k", [(1, 1), (5, 3), (40, 5), (200, 10)])
+def test_ballots_match_brute_force(n, k):
+    rng = random.Random(n * 31 + k)
+    tally, points = LiveTally(n, k), [0] * n
+    check(tally, points)
+    for _ in range(4 * n):
+        first = rng.randrange(n)
+        second = rng.choice([None] + [p for p in range(n) if p != first])
+        tally.ballot(first, second)
+        points[first] += 2
+        if second is not None:
+            points[second] += 1
+        check(tally, points)
+    assert tally.ballots == 4 * n
+
+
+def test_ties_go_to_the_lower_player():
+    tally, points = LiveTally(6, 3), [0] * 6
+    for p in (5, 4, 3, 2, 1, 0):  # everyone ends up on 2, the higher numbers first
+        tally.add(p, 2)
+        points[p] += 2
+        check(tally, points)
+    assert [name for name, _ in tally.snapshot()] == ["Player 1", "Player 2", "Player 3"]
+    tally.add(5, 1)
+    points[5] += 1
+    check(tally, points)
+    assert tally.leader() == "Player 6"
+
+
+def test_decrements_are_ignored():
+    rng = random.Random(3)
+    tally, points = LiveTally(30, 4), [0] * 30
+    for _ in range(500):
+        p, delta = rng.randrange(30), rng.randint(-3, 3)
+        tally.add(p, delta)
+        points[p] += max(0, delta)  # points only grow: a vote can't be taken back
+        check(tally, points)
+
+
+def test_leaders_scores_keep_changing():
+    # the same few players keep scoring, so the heap fills with stale entries
+    tally, points = LiveTally(50, 3), [0] * 50
+    rng = random.Random(9)
+    for i in range(2000):
+        p = rng.randrange(4) if i % 10 else rng.randrange(50)
+        tally.add(p, 1)
+        points[p] += 1
+        check(tally, points)
+    assert len(tally._heap) <= 4 * tally.k + 1
+
+
+@pytest.mark.parametrize("n,k", [(0, 5), (2, 5), (4, 4), (7, 100)])
+def test_k_larger_than_the_lobby(n, k):
+    tally, points = LiveTally(n, k), [0] * n
+    check(tally, points)
+    assert len(tally.snapshot()) == n
+    for p in reversed(range(n)):
+        tally.ballot(p)
+        points[p] += 2
+        check(tally, points)
+
+
+@pytest.mark.parametrize("n,k", [(3, 10), (100, 5), (2000, 10)])
+def test_add_counts_matches_brute_force(n, k):
+    rng = np.random.default_rng(n + k)
+    tally, points = LiveTally(n, k), [0] * n
+    for _ in range(20):
+        counts = np.zeros(n, dtype=np.int64)
+        voters = rng.integers(0, n, size=rng.integers(0, 3 * n + 1))
+        np.add.at(counts, voters, rng.integers(1, 3, size=len(voters)))
+        tally.add_counts(counts, ballots=len(voters))
+        points = [a + int(b) for a, b in zip(points, counts)]
+        check(tally, points)
+        if rng.random() < 0.5:  # single ballots between batches
+            p = int(rng.integers(n))
+            tally.ballot(p)
+            points[p] += 2
+            check(tally, points)